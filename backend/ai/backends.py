@@ -0,0 +1,258 @@
+"""
+Model Serving Backends for SANJIVANI 2.0
+Interchangeable Keras (.h5) and TFLite (.tflite) forward passes
+
+TensorFlow is imported on first use rather than at module import: it
+takes seconds to load, and the API should start serving metadata
+endpoints while the model loads in the background.
+"""
+import queue
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from .dataset_config_v2 import MODEL_CONFIG, SERVING_CONFIG
+
+
+def compile_forward(model, jit_compile: bool = False):
+    """
+    Wrap a Keras model in a traced inference-only tf.function
+
+    Unlike model.predict(), calling the result skips the per-call data
+    adapter and callback setup, and is safe to share between threads.
+    """
+    import tensorflow as tf
+
+    signature = [tf.TensorSpec(shape=(None, *MODEL_CONFIG["input_size"]), dtype=tf.float32)]
+
+    @tf.function(input_signature=signature, jit_compile=jit_compile, reduce_retracing=True)
+    def forward(images):
+        return model(images, training=False)
+
+    return forward
+
+
+def configure_tf_threads():
+    """
+    Apply the configured TF intra-/inter-op thread counts
+
+    Must run before TensorFlow executes its first op; afterwards the
+    runtime's thread pools exist and the setting can no longer change.
+    """
+    import tensorflow as tf
+
+    intra = SERVING_CONFIG["tf_intra_op_threads"]
+    inter = SERVING_CONFIG["tf_inter_op_threads"]
+    try:
+        if intra:
+            tf.config.threading.set_intra_op_parallelism_threads(intra)
+        if inter:
+            tf.config.threading.set_inter_op_parallelism_threads(inter)
+    except RuntimeError:
+        pass  # Runtime already initialised (e.g. a hot swap); keep the current pools
+
+
+def batch_buckets(max_batch_size: int) -> List[int]:
+    """Powers of two up to (and including) max_batch_size: 1, 2, 4, ..., N"""
+    sizes = []
+    size = 1
+    while size < max_batch_size:
+        sizes.append(size)
+        size *= 2
+    sizes.append(max_batch_size)
+    return sizes
+
+
+class KerasBackend:
+    """
+    Full TensorFlow/Keras model loaded from the .h5 file
+
+    By default the forward pass is a compiled tf.function warmed up at
+    load time. With XLA enabled every new input shape triggers a compile,
+    so batches are zero-padded up to a fixed set of bucket sizes.
+    """
+    name = "keras"
+
+    def __init__(
+        self,
+        model_path: str,
+        compiled: Optional[bool] = None,
+        jit_compile: Optional[bool] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        self.model_path = model_path
+        self.model = None
+        self.compiled = SERVING_CONFIG["keras_compiled"] if compiled is None else compiled
+        self.jit_compile = SERVING_CONFIG["keras_jit_compile"] if jit_compile is None else jit_compile
+        self.buckets = batch_buckets(max_batch_size or SERVING_CONFIG["max_batch_size"])
+        self._forward = None
+        self._lock = threading.Lock()  # Keras predict() is not re-entrant
+
+    def load(self):
+        import tensorflow as tf
+
+        configure_tf_threads()
+        self.model = tf.keras.models.load_model(str(self.model_path))
+        if self.compiled:
+            self._forward = compile_forward(self.model, self.jit_compile)
+            self.warmup()
+
+    def warmup(self):
+        """Trace (and with XLA, compile) every bucket size before serving traffic"""
+        import tensorflow as tf
+
+        for size in self.buckets:
+            self._forward(tf.zeros((size, *MODEL_CONFIG["input_size"]), dtype=tf.float32))
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (N, 224, 224, 3) float32 batch"""
+        if self.model is None:
+            raise RuntimeError(f"Model {self.model_path} is not loaded")
+        if self._forward is None:
+            with self._lock:
+                return self.model.predict(batch, verbose=0)
+
+        n = len(batch)
+        if self.jit_compile and n <= self.buckets[-1]:
+            padded_size = next(size for size in self.buckets if size >= n)
+            if padded_size != n:
+                padding = np.zeros((padded_size - n, *batch.shape[1:]), dtype=batch.dtype)
+                batch = np.concatenate([batch, padding], axis=0)
+
+        return self._forward(np.ascontiguousarray(batch, dtype=np.float32)).numpy()[:n]
+
+    def unload(self):
+        """Drop the model so its weights can be freed (after a hot swap)"""
+        self._forward = None
+        self.model = None
+
+
+class _PooledInterpreter:
+    """
+    One allocated interpreter plus cached accessors to its I/O buffers
+
+    Full-integer models take and return int8/uint8 tensors; inputs are
+    quantized and outputs dequantized here with the tensors' own scale and
+    zero point, so callers always deal in float32.
+    """
+
+    def __init__(self, model_content: bytes, num_threads: int):
+        import tensorflow as tf
+
+        self.interpreter = tf.lite.Interpreter(model_content=model_content, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+
+        # tensor() returns a callable giving a view into the interpreter's own buffer
+        self.input_view = self.interpreter.tensor(input_details["index"])
+        self.output_view = self.interpreter.tensor(output_details["index"])
+        self.input_dtype = input_details["dtype"]
+        self.output_dtype = output_details["dtype"]
+        self.input_quantization = input_details["quantization"]
+        self.output_quantization = output_details["quantization"]
+        self.quantized_input = np.issubdtype(self.input_dtype, np.integer)
+        self.quantized_output = np.issubdtype(self.output_dtype, np.integer)
+
+    def run(self, row: np.ndarray, out: np.ndarray):
+        """Run one image and copy the probabilities into `out`"""
+        if self.quantized_input:
+            scale, zero_point = self.input_quantization
+            info = np.iinfo(self.input_dtype)
+            self.input_view()[0] = np.clip(np.round(row / scale + zero_point), info.min, info.max)
+        else:
+            self.input_view()[0] = row
+        self.interpreter.invoke()
+        if self.quantized_output:
+            scale, zero_point = self.output_quantization
+            np.multiply(self.output_view()[0].astype(np.float32) - zero_point, scale, out=out)
+        else:
+            out[:] = self.output_view()[0]
+
+
+class TFLiteBackend:
+    """
+    TFLite model served from a pool of pre-allocated interpreters
+
+    A tf.lite.Interpreter is not thread-safe, so each worker thread checks
+    one out of the pool for the duration of a call. The pool is sized to
+    the inference executor, so in practice every worker has its own.
+    """
+    name = "tflite"
+
+    def __init__(self, model_path: str, pool_size: Optional[int] = None, num_threads: Optional[int] = None):
+        self.model_path = model_path
+        self.pool_size = max(1, pool_size or SERVING_CONFIG["executor_workers"])
+        self.num_threads = num_threads or SERVING_CONFIG["tflite_num_threads"]
+        self.num_classes = None
+        self._pool: "queue.Queue[_PooledInterpreter]" = queue.Queue()
+        self._loaded = False
+
+    def load(self):
+        with open(self.model_path, "rb") as f:
+            model_content = f.read()
+
+        for _ in range(self.pool_size):
+            self._pool.put(_PooledInterpreter(model_content, self.num_threads))
+
+        probe = self._pool.queue[0]
+        self.num_classes = probe.output_view().shape[-1]
+        self._loaded = True
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (N, 224, 224, 3) float32 batch"""
+        out = np.empty((len(batch), self.num_classes), dtype=np.float32)
+        pooled = self._checkout()
+        try:
+            # Interpreters are allocated for batch 1; resizing per call would reallocate
+            for i in range(len(batch)):
+                pooled.run(batch[i], out[i])
+        finally:
+            if self._loaded:
+                self._pool.put(pooled)
+        return out
+
+    def _checkout(self) -> "_PooledInterpreter":
+        """Take an interpreter from the pool; raises instead of waiting forever once unloaded"""
+        while True:
+            if not self._loaded:
+                raise RuntimeError(f"Model {self.model_path} is not loaded")
+            try:
+                return self._pool.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def unload(self):
+        """Drop the pooled interpreters so their buffers can be freed (after a hot swap)"""
+        self._loaded = False
+        while not self._pool.empty():
+            self._pool.get_nowait()
+
+
+def resolve_backend_name(h5_path: Path) -> str:
+    """
+    Pick the serving backend from config
+
+    "auto" uses TFLite when the exported .tflite sits next to the .h5 and
+    no GPU is visible, since it is the faster path on small CPU instances.
+    """
+    name = SERVING_CONFIG["inference_backend"]
+    if name != "auto":
+        return name
+    import tensorflow as tf
+
+    if h5_path.with_suffix(".tflite").exists() and not tf.config.list_physical_devices("GPU"):
+        return "tflite"
+    return "keras"
+
+
+def create_backend(h5_path: Path):
+    """Build (but don't load) the configured backend for a model file"""
+    name = resolve_backend_name(h5_path)
+    if name == "tflite":
+        return TFLiteBackend(str(h5_path.with_suffix(".tflite")))
+    if name == "keras":
+        return KerasBackend(str(h5_path))
+    raise ValueError(f"Unknown inference backend: {name}")
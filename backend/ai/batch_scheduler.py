@@ -0,0 +1,187 @@
+"""
+Micro-batching Scheduler for SANJIVANI 2.0
+Coalesces concurrent predict calls into a single forward pass
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from .dataset_config_v2 import SERVING_CONFIG
+from .executor import InferenceExecutor, InferenceQueueFull, get_inference_executor
+
+
+class _PendingRequest:
+    """A queued image waiting for a batch slot"""
+    __slots__ = ("image_bytes", "future", "enqueued_at")
+
+    def __init__(self, image_bytes: bytes, future: asyncio.Future):
+        self.image_bytes = image_bytes
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchScheduler:
+    """
+    Collects predict calls arriving within a short window and runs them
+    through InferenceEngine.predict_batch together, on the inference
+    executor so the event loop stays free.
+
+    A batch is dispatched as soon as it reaches max_batch_size, or when the
+    oldest request has waited max_batch_wait_ms, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[InferenceExecutor] = None,
+        max_batch_size: Optional[int] = None,
+        max_batch_wait_ms: Optional[float] = None
+    ):
+        self._executor = executor
+        self.max_batch_size = max(1, max_batch_size or SERVING_CONFIG["max_batch_size"])
+        self.max_batch_wait_ms = (
+            max_batch_wait_ms if max_batch_wait_ms is not None
+            else SERVING_CONFIG["max_batch_wait_ms"]
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatches = set()
+        self._collecting: List[_PendingRequest] = []  # Batch being filled, not yet dispatched
+
+        # Counters
+        self.total_requests = 0
+        self.total_batches = 0
+        self.max_observed_batch = 0
+
+    @property
+    def executor(self) -> InferenceExecutor:
+        return self._executor or get_inference_executor()
+
+    @property
+    def max_pending(self) -> int:
+        """Images allowed to wait for a batch slot before rejecting"""
+        return self.executor.capacity * self.max_batch_size
+
+    async def submit(self, image_bytes: bytes) -> Dict:
+        """
+        Queue an image for the next batch and wait for its result
+
+        Returns:
+            Prediction dict from the engine, with queue_wait_ms and
+            batch_size added to its metadata
+        """
+        self._ensure_worker()
+        if self._queue.qsize() >= self.max_pending:
+            raise InferenceQueueFull(f"Batch queue full ({self._queue.qsize()} images waiting)")
+
+        future = self._loop.create_future()
+        self._queue.put_nowait(_PendingRequest(image_bytes, future))
+        return await future
+
+    def _ensure_worker(self):
+        """Start (or restart) the batching task on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self):
+        """Worker loop: gather a batch and hand it off, so batches can overlap"""
+        while True:
+            batch = await self._collect_batch()
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _collect_batch(self) -> List[_PendingRequest]:
+        """Wait for the first request, then fill the batch until full or timed out"""
+        self._collecting = batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_batch_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already waiting without yielding
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        self._collecting = []
+        return batch
+
+    async def _dispatch(self, batch: List[_PendingRequest]):
+        """Run a single forward pass for the batch and deliver results"""
+        dispatched_at = time.perf_counter()
+        batch_size = len(batch)
+
+        self.total_batches += 1
+        self.total_requests += batch_size
+        self.max_observed_batch = max(self.max_observed_batch, batch_size)
+
+        try:
+            results = await self.executor.predict_batch(
+                [req.image_bytes for req in batch],
+                return_exceptions=True
+            )
+        except Exception as e:
+            results = [e] * batch_size
+
+        for req, result in zip(batch, results):
+            if req.future.done():
+                # Caller went away (e.g. client disconnected)
+                continue
+            if isinstance(result, Exception):
+                req.future.set_exception(result)
+                continue
+            result["metadata"]["queue_wait_ms"] = round((dispatched_at - req.enqueued_at) * 1000, 2)
+            result["metadata"]["batch_size"] = batch_size
+            req.future.set_result(result)
+
+    async def close(self):
+        """Stop the worker task; callers not yet dispatched are cancelled, dispatched ones finish"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+        pending, self._collecting = self._collecting, []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for req in pending:
+            req.future.cancel()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    def get_stats(self) -> Dict:
+        """Get batching statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_batch_wait_ms": self.max_batch_wait_ms,
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "avg_batch_size": round(self.total_requests / self.total_batches, 2) if self.total_batches else 0,
+            "max_observed_batch": self.max_observed_batch,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0
+        }
+
+
+# Global instance (singleton pattern)
+_batch_scheduler = None
+
+def get_batch_scheduler() -> BatchScheduler:
+    """Get or create global batch scheduler instance"""
+    global _batch_scheduler
+    if _batch_scheduler is None:
+        _batch_scheduler = BatchScheduler()
+    return _batch_scheduler
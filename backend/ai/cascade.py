@@ -0,0 +1,84 @@
+"""
+Model Cascade for SANJIVANI 2.0
+A small model answers when it is confident; everything else escalates
+to the full plant_disease_v2 model
+
+The small model lives next to the full one as plant_disease_v2_small.h5
+(and/or .tflite), takes the same (224, 224, 3) input and outputs the same
+classes. Any lower working resolution is a Resizing layer inside it, so
+preprocessing is shared by both stages.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+SMALL_MODEL_SUFFIX = "_small"
+DEFAULT_THRESHOLD = 0.90
+
+
+def small_model_path(h5_path: Path) -> Path:
+    """plant_disease_v2.h5 -> plant_disease_v2_small.h5 in the same directory"""
+    h5_path = Path(h5_path)
+    return h5_path.with_name(f"{h5_path.stem}{SMALL_MODEL_SUFFIX}{h5_path.suffix}")
+
+
+def cascade_outcome(small_probs: np.ndarray, large_probs: np.ndarray, labels: np.ndarray, threshold: float) -> Dict:
+    """Accuracy and escalation rate of the cascade at one threshold"""
+    answered = small_probs.max(axis=1) >= threshold
+    predicted = np.where(answered, small_probs.argmax(axis=1), large_probs.argmax(axis=1))
+    return {
+        "threshold": float(threshold),
+        "accuracy": float(np.mean(predicted == labels)),
+        "escalation_rate": float(1 - answered.mean())
+    }
+
+
+def choose_threshold(
+    small_probs: np.ndarray,
+    large_probs: np.ndarray,
+    labels: np.ndarray,
+    target_accuracy: Optional[float] = None,
+    max_accuracy_drop: float = 0.005
+) -> Dict:
+    """
+    Lowest early-exit threshold that still meets the accuracy target
+
+    A lower threshold lets the small model answer more requests, so the
+    lowest one meeting the target escalates the least.
+
+    Args:
+        small_probs: (N, C) small-model probabilities on validation data
+        large_probs: (N, C) full-model probabilities on the same images
+        labels: (N,) integer class labels
+        target_accuracy: Minimum cascade accuracy; defaults to the full
+            model's accuracy minus max_accuracy_drop
+
+    Returns:
+        The chosen threshold (None if no threshold meets the target) with its
+        accuracy and escalation rate, plus the accuracies of the two models
+        alone and the target used
+    """
+    large_accuracy = float(np.mean(large_probs.argmax(axis=1) == labels))
+    small_accuracy = float(np.mean(small_probs.argmax(axis=1) == labels))
+    if target_accuracy is None:
+        target_accuracy = large_accuracy - max_accuracy_drop
+
+    # Candidate thresholds: every distinct small-model confidence, lowest first
+    chosen = None
+    for threshold in np.unique(small_probs.max(axis=1)):
+        outcome = cascade_outcome(small_probs, large_probs, labels, threshold)
+        if outcome["accuracy"] >= target_accuracy:
+            chosen = outcome
+            break
+    if chosen is None:
+        # No early exit meets the target: the small model should never answer
+        chosen = {"threshold": None, "accuracy": large_accuracy, "escalation_rate": 1.0}
+
+    return {
+        **chosen,
+        "target_accuracy": float(target_accuracy),
+        "small_accuracy": small_accuracy,
+        "large_accuracy": large_accuracy,
+        "samples": int(len(labels))
+    }
@@ -2,6 +2,7 @@
 Dataset Configuration
 Defines the scope, classes, and preprocessing parameters for the AI model
 """
+import os
 
 # Expanded Scope: Tomato, Potato, Corn, Cotton, Wheat
 DISEASE_MAPPING = {
@@ -129,6 +130,48 @@ PERFORMANCE_THRESHOLDS = {
 # Confidence Safeguards
 CONFIDENCE_THRESHOLD = 0.60
 
+# Serving Parameters (overridable via environment)
+SERVING_CONFIG = {
+    "max_batch_size": int(os.getenv("BATCH_MAX_SIZE", "8")),  # Requests coalesced per forward pass
+    "max_batch_wait_ms": float(os.getenv("BATCH_MAX_WAIT_MS", "5")),  # Max time the first request waits for company
+    "executor_kind": os.getenv("INFERENCE_EXECUTOR", "thread"),  # "thread" or "process"
+    "executor_workers": int(os.getenv("INFERENCE_WORKERS", "2")),  # Concurrent inference jobs
+    "executor_max_queue": int(os.getenv("INFERENCE_MAX_QUEUE", "16")),  # Jobs allowed to wait before rejecting
+    "model_path": os.getenv("MODEL_PATH"),  # Path to the .h5 (the .tflite is expected alongside)
+    "model_registry_dir": os.getenv("MODEL_REGISTRY_DIR", "models/registry"),  # One subdirectory per model version
+    "model_version": os.getenv("MODEL_VERSION"),  # Registry version to serve at startup (unset: MODEL_PATH / default)
+    "inference_backend": os.getenv("INFERENCE_BACKEND", "auto"),  # "auto", "tflite" or "keras"
+    "tflite_num_threads": int(os.getenv("TFLITE_NUM_THREADS", "1")),  # Threads per pooled interpreter
+    "tf_intra_op_threads": int(os.getenv("TF_INTRA_OP_THREADS", "0")),  # Threads inside one TF op (0: TF default)
+    "tf_inter_op_threads": int(os.getenv("TF_INTER_OP_THREADS", "0")),  # TF ops run concurrently (0: TF default)
+    "keras_compiled": os.getenv("KERAS_COMPILED", "1") == "1",  # tf.function forward pass instead of model.predict
+    "keras_jit_compile": os.getenv("KERAS_JIT_COMPILE", "0") == "1",  # XLA-compile the forward pass
+    "cascade": os.getenv("CASCADE", "0") == "1",  # Small model answers first when plant_disease_v2_small.* exists
+    "cascade_threshold": float(os.environ["CASCADE_THRESHOLD"]) if os.getenv("CASCADE_THRESHOLD") else None,  # Early-exit confidence (unset: tuned value from model metadata; 0 always exits early)
+    "adaptive_tta": os.getenv("ADAPTIVE_TTA", "0") == "1",  # Re-score low-confidence images on augmented views
+    "tta_views": int(os.getenv("TTA_VIEWS", "4")),  # Augmented views per uncertain image (max 5)
+    "tta_budget_ms": float(os.getenv("TTA_BUDGET_MS", "200")),  # Max estimated extra forward time per batch
+    "fast_decode": os.getenv("FAST_DECODE", "1") == "1",  # JPEG draft decode + bilinear instead of full LANCZOS
+    "prediction_cache_size": int(os.getenv("PREDICTION_CACHE_SIZE", "512")),  # Cached responses (0 disables)
+    "prediction_cache_ttl_s": float(os.getenv("PREDICTION_CACHE_TTL_S", "3600")),  # Cached response lifetime
+    "phash_radius": int(os.getenv("PHASH_RADIUS", "4")),  # Max Hamming distance (of 64 bits) to count as near-duplicate
+    "phash_index_size": int(os.getenv("PHASH_INDEX_SIZE", "1024")),  # Recent hashes remembered (0 disables)
+    "phash_max_age_s": float(os.getenv("PHASH_MAX_AGE_S", "600")),  # How long a prediction may be reused
+    "search_min_score": float(os.getenv("SEARCH_MIN_SCORE", "1.5")),  # Top BM25 score below which search asks Gemini
+    "knowledge_reload_interval_s": float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL_S", "5")),  # Knowledge file poll period (0 disables hot reload)
+    "llm_cache_size": int(os.getenv("LLM_CACHE_SIZE", "256")),  # Gemini outputs kept in memory (0: disk tier only)
+    "llm_cache_ttl_s": float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600))),  # Cached Gemini output lifetime
+    "llm_cache_path": os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3"),  # Persistent tier (empty: memory only)
+    "llm_max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "4")),  # Gemini calls in flight per worker
+    "llm_max_queue": int(os.getenv("LLM_MAX_QUEUE", "32")),  # Calls allowed to wait for a slot before 503
+    "llm_timeout_s": float(os.getenv("LLM_TIMEOUT_S", "15")),  # Per-call limit (then fall back)
+    "llm_base_url": os.getenv("LLM_BASE_URL", ""),  # Gemini REST endpoint (proxy or fake server); empty: SDK
+    "metadata_max_age_s": int(os.getenv("METADATA_MAX_AGE_S", "60")),  # Cache-Control max-age for /meta and /alerts (then revalidate by ETag)
+    "max_upload_bytes": int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024))),  # Per-image size cap
+    "batch_busy_wait_s": float(os.getenv("BATCH_BUSY_WAIT_S", "10")),  # How long a /predict/batch chunk backs off from a full executor
+    "max_image_pixels": int(os.getenv("MAX_IMAGE_PIXELS", str(64_000_000))),  # Rejected from the header, before decode
+}
+
 def get_crop_from_class(class_name: str) -> str:
     return DISEASE_MAPPING.get(class_name, {}).get("crop", "Unknown")
 
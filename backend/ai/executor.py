@@ -0,0 +1,186 @@
+"""
+Inference Executor for SANJIVANI 2.0
+Runs decode + model forward passes off the asyncio event loop
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from .dataset_config_v2 import SERVING_CONFIG
+from .inference_engine import get_inference_engine
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the executor already holds its maximum number of jobs"""
+    pass
+
+
+def _init_process_worker(model_path: Optional[str] = None, model_version: Optional[str] = None):
+    """Load the parent's active model once per worker process"""
+    if model_version:
+        SERVING_CONFIG["model_version"] = model_version
+        SERVING_CONFIG["model_path"] = None
+    elif model_path:
+        SERVING_CONFIG["model_path"] = model_path
+    get_inference_engine()
+
+
+def _worker_predict_batch(images: List[bytes], return_exceptions: bool = False) -> List:
+    """Picklable entry point for process workers"""
+    return get_inference_engine().predict_batch(images, return_exceptions=return_exceptions)
+
+
+class InferenceExecutor:
+    """
+    Bounded thread or process pool for CPU-heavy inference work
+
+    At most `max_workers` jobs run at once and at most `max_queue` more
+    may wait; anything beyond that is rejected with InferenceQueueFull so
+    callers can shed load instead of piling up behind a slow image.
+    """
+
+    def __init__(
+        self,
+        kind: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None
+    ):
+        self.kind = kind or SERVING_CONFIG["executor_kind"]
+        if self.kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {self.kind}")
+        self.max_workers = max(1, max_workers or SERVING_CONFIG["executor_workers"])
+        self.max_queue = max(0, max_queue if max_queue is not None else SERVING_CONFIG["executor_max_queue"])
+
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._in_flight = 0
+        self.total_jobs = 0
+        self.total_rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        # spawn: forking a process that already initialised TF is unsafe
+                        engine = get_inference_engine()
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=_init_process_worker,
+                            initargs=(engine.model_path, engine.registry_version)
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="inference"
+                        )
+        return self._pool
+
+    async def predict_batch(self, images: List[bytes], return_exceptions: bool = False) -> List:
+        """Run InferenceEngine.predict_batch in the pool"""
+        if self._in_flight >= self.capacity:
+            self.total_rejected += 1
+            raise InferenceQueueFull(
+                f"Inference queue full ({self._in_flight}/{self.capacity} jobs)"
+            )
+
+        self._in_flight += 1
+        self.total_jobs += 1
+        try:
+            loop = asyncio.get_running_loop()
+            if self.kind == "process":
+                results = await loop.run_in_executor(
+                    self._get_pool(), _worker_predict_batch, images, return_exceptions
+                )
+                # Timings were recorded in the worker; mirror them for /health
+                engine = get_inference_engine()
+                forward_ms = None
+                tta_ms, tta_applied, tta_rescued, tta_skipped = 0.0, 0, 0, 0
+                cascade = {"small": 0, "full": 0}
+                for result in results:
+                    if isinstance(result, dict):
+                        metadata = result["metadata"]
+                        engine.record_preprocess_times(metadata["decode_ms"], metadata["resize_ms"])
+                        engine.record_inference_time(metadata["inference_time_ms"])
+                        if not metadata["near_duplicate"]:
+                            forward_ms = metadata["forward_ms"]
+                        if metadata.get("cascade_stage"):
+                            cascade[metadata["cascade_stage"]] += 1
+                        tta = metadata.get("tta")
+                        if tta and tta["views"]:
+                            tta_ms = tta["tta_ms"]
+                            tta_applied += 1
+                            tta_rescued += tta["rescued"]
+                        elif tta:
+                            tta_skipped += 1
+                if forward_ms is not None and engine.model is not None:
+                    engine.record_forward_time(forward_ms)
+                if tta_applied or tta_skipped:
+                    engine.record_tta(tta_ms, tta_applied, tta_rescued, tta_skipped)
+                if cascade["small"] or cascade["full"]:
+                    engine.record_cascade(**cascade)
+                return results
+
+            engine = get_inference_engine()
+            return await loop.run_in_executor(
+                self._get_pool(), engine.predict_batch, images, return_exceptions
+            )
+        finally:
+            self._in_flight -= 1
+
+    async def predict(self, image_bytes: bytes) -> Dict:
+        """Run a single prediction in the pool"""
+        return (await self.predict_batch([image_bytes]))[0]
+
+    def restart_workers(self):
+        """
+        Replace process workers so they load the newly active model
+
+        Jobs already submitted finish on the old workers; new jobs go to a
+        fresh pool. Thread workers share the engine, so nothing to do.
+        """
+        if self.kind != "process":
+            return
+        with self._pool_lock:
+            old_pool, self._pool = self._pool, None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        """Shut down the worker pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def get_stats(self) -> Dict:
+        """Get executor statistics"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "total_jobs": self.total_jobs,
+            "total_rejected": self.total_rejected
+        }
+
+
+# Global instance (singleton pattern)
+_inference_executor = None
+_inference_executor_lock = threading.Lock()
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get or create global inference executor instance"""
+    global _inference_executor
+    if _inference_executor is None:
+        with _inference_executor_lock:
+            if _inference_executor is None:
+                _inference_executor = InferenceExecutor()
+    return _inference_executor
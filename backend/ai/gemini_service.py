@@ -1,9 +1,10 @@
-import os
-import google.generativeai as genai
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 import logging
 
+from services.llm_cache import BAND_DESCRIPTIONS, confidence_band, fingerprint, get_llm_cache, normalize_label
+from .llm_client import MODEL_NAME, LLMError, LLMOverloaded, get_llm_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,27 +13,39 @@ class GeminiService:
     """Service for interacting with Google's Gemini AI"""
     
     def __init__(self):
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-        else:
+        self.client = get_llm_client()
+        if not self.client.available:
             logger.warning("GEMINI_API_KEY not found. Gemini service disabled.")
-            self.model = None
 
-    def generate_disease_analysis(self, crop: str, disease: str, confidence: float) -> Dict:
+    @property
+    def available(self) -> bool:
+        return self.client.available
+
+    async def generate_disease_analysis(self, crop: str, disease: str, confidence: float) -> Dict:
         """
         Generate detailed disease analysis using Gemini
         
         Returns:
             Dict containing explanation, treatment plan, and economic impact
         """
-        if not self.model:
-            return None
+        return (await self.analyze(crop, disease, confidence))[0]
+    
+    async def analyze(self, crop: str, disease: str, confidence: float) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Disease analysis through the LLM cache
+        
+        Returns:
+            (analysis or None on failure, cache info or None if Gemini is disabled)
+
+        Raises:
+            LLMOverloaded: too many Gemini calls already queued
+        """
+        if not self.available:
+            return None, None
 
         prompt = f"""
         You are an expert agricultural plant pathologist. 
-        A farmer has scanned a {crop} plant detecting '{disease}' with {confidence*100:.1f}% confidence.
+        A farmer has scanned a {normalize_label(crop).title()} plant detecting '{normalize_label(disease).title()}' with {BAND_DESCRIPTIONS[confidence_band(confidence)]} confidence.
         
         Provide a detailed JSON response with the following structure:
         {{
@@ -50,9 +63,13 @@ class GeminiService:
         Ensure the output is valid JSON. Do not include markdown formatting like ```json.
         """
 
+        key = fingerprint("analysis", MODEL_NAME, prompt)
+        return await get_llm_cache().get_or_generate_async(key, lambda: self._generate(prompt))
+    
+    async def _generate(self, prompt: str) -> Optional[Dict]:
+        """Call Gemini and parse its JSON; None on failure so the error is not cached"""
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text.strip()
+            text = (await self.client.generate(prompt)).strip()
             # Clean up markdown if present
             if text.startswith("```json"):
                 text = text[7:]
@@ -60,7 +77,9 @@ class GeminiService:
                 text = text[:-3]
             
             return json.loads(text)
-        except Exception as e:
+        except LLMOverloaded:
+            raise
+        except (LLMError, ValueError) as e:
             logger.error(f"Gemini generation failed: {e}")
             return None
 
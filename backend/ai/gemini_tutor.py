@@ -3,40 +3,60 @@ Gemini Tutor Module
 Provides "Explain Why" functionality using Google's Gemini 1.5 Flash model.
 Acts as a responsible educational layer, not a doctor.
 """
-import os
-import google.generativeai as genai
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
-# Configure API Key
-API_KEY = os.getenv("GEMINI_API_KEY")
-if API_KEY:
-    genai.configure(api_key=API_KEY)
+from services.llm_cache import BAND_DESCRIPTIONS, confidence_band, fingerprint, get_llm_cache, normalize_label
+from .llm_client import MODEL_NAME, LLMError, LLMOverloaded, get_llm_client
 
-def get_explanation(disease_name: str, confidence: float, crop_name: str, language: str = "en") -> str:
-    """
-    Asks Gemini to explain a diagnosis in simple terms.
-    """
-    if not API_KEY:
-        return "Gemini API Key not configured. (Mock Explanation: This looks like Early Blight because of the concentric rings on the leaves.)"
+FALLBACK_EXPLANATION = "Unable to generate explanation at this time. Please consult the standard treatment guide."
 
+
+async def _generate(prompt: str) -> Optional[str]:
+    """Call Gemini; None on failure or timeout so the error is not cached (LLMOverloaded propagates)"""
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        prompt = f"""
-        You are an expert agricultural tutor. A farmer has scanned a {crop_name} plant.
-        The AI system detected '{disease_name}' with {confidence*100:.1f}% confidence.
-        
-        Task: Explain WHY this diagnosis is likely correct and provide 1 simple, organic tip.
-        Constraints:
-        - Be concise (max 3 sentences).
-        - Use simple language suitable for a farmer.
-        - Do NOT prescribe chemical medication (leave that to the main system).
-        - Output in {language} language.
-        """
-        
-        response = model.generate_content(prompt)
-        return response.text.strip()
-        
-    except Exception as e:
+        return (await get_llm_client().generate(prompt)).strip()
+    except LLMOverloaded:
+        raise
+    except LLMError as e:
         print(f"Gemini Error: {e}")
-        return "Unable to generate explanation at this time. Please consult the standard treatment guide."
+        return None
+
+
+async def explain(disease_name: str, confidence: float, crop_name: str, language: str = "en") -> Tuple[str, Optional[Dict]]:
+    """
+    Asks Gemini to explain a diagnosis in simple terms, through the LLM cache.
+
+    The prompt is built from normalized names and a coarse confidence
+    level, so repeat taps on similar results are answered from the cache.
+
+    Returns:
+        (explanation, cache info from LLMCache.get_or_generate, or None if Gemini was not called)
+
+    Raises:
+        LLMOverloaded: too many Gemini calls already queued
+    """
+    if not get_llm_client().available:
+        return "Gemini API Key not configured. (Mock Explanation: This looks like Early Blight because of the concentric rings on the leaves.)", None
+
+    prompt = f"""
+    You are an expert agricultural tutor. A farmer has scanned a {normalize_label(crop_name).title()} plant.
+    The AI system detected '{normalize_label(disease_name).title()}' with {BAND_DESCRIPTIONS[confidence_band(confidence)]} confidence.
+
+    Task: Explain WHY this diagnosis is likely correct and provide 1 simple, organic tip.
+    Constraints:
+    - Be concise (max 3 sentences).
+    - Use simple language suitable for a farmer.
+    - Do NOT prescribe chemical medication (leave that to the main system).
+    - Output in {language.strip().lower()} language.
+    """
+
+    key = fingerprint("explain", MODEL_NAME, prompt)
+    text, cache_info = await get_llm_cache().get_or_generate_async(key, lambda: _generate(prompt))
+    return (text if text is not None else FALLBACK_EXPLANATION), cache_info
+
+
+async def get_explanation(disease_name: str, confidence: float, crop_name: str, language: str = "en") -> str:
+    """
+    Asks Gemini to explain a diagnosis in simple terms.
+    """
+    return (await explain(disease_name, confidence, crop_name, language))[0]
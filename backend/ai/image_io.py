@@ -0,0 +1,111 @@
+"""
+Image I/O helpers for SANJIVANI 2.0
+Format sniffing, header-only inspection and zero-copy decoding
+from upload buffers
+"""
+import io
+from typing import Optional, Tuple, Union
+
+from PIL import Image
+
+# Leading bytes of the formats the model pipeline accepts
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+)
+
+ImageBuffer = Union[bytes, bytearray, memoryview]
+
+
+def sniff_format(head: ImageBuffer) -> Optional[str]:
+    """Identify an image format from its first bytes, or None if unsupported"""
+    head = bytes(head[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    for signature, image_format in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    return None
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Read-only, seekable file over a memoryview
+
+    io.BytesIO copies anything that isn't an immutable bytes object, so a
+    bytearray upload buffer would be duplicated before decoding. This hands
+    Pillow only the slices it asks for.
+    """
+
+    def __init__(self, data: ImageBuffer):
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        # Drop our export so the underlying bytearray can be resized again
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def open_image(data: ImageBuffer) -> Image.Image:
+    """Lazily open an image from an upload buffer without copying it"""
+    if isinstance(data, bytes):
+        return Image.open(io.BytesIO(data))  # BytesIO shares immutable bytes
+    return Image.open(BufferReader(data))
+
+
+def read_header(data: ImageBuffer) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """
+    Format and (width, height) from the image header, without decoding pixels
+
+    Returns None if the header isn't complete yet (e.g. a partial upload).
+    Raises Image.DecompressionBombError for headers PIL refuses outright
+    (over twice Image.MAX_IMAGE_PIXELS).
+    """
+    fp = io.BytesIO(data) if isinstance(data, bytes) else BufferReader(data)
+    try:
+        with Image.open(fp) as img:
+            return img.format, img.size
+    except Image.DecompressionBombError:
+        raise
+    except Exception:
+        return None
+    finally:
+        fp.close()
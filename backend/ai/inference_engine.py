@@ -3,14 +3,123 @@ AI Inference Engine for SANJIVANI 2.0
 Isolated module for image classification with performance tracking
 """
 import time
-from typing import Tuple, Optional, Dict
+import copy
+import threading
+from typing import Tuple, Optional, Dict, List
 import numpy as np
-from PIL import Image
-import io
-import tensorflow as tf
+from PIL import Image, ImageOps
 from pathlib import Path
 
-from .dataset_config_v2 import CLASS_NAMES, MODEL_CONFIG, get_crop_from_class, get_disease_from_class, get_severity_from_class
+from .dataset_config_v2 import CLASS_NAMES, CONFIDENCE_THRESHOLD, MODEL_CONFIG, SERVING_CONFIG, get_crop_from_class, get_disease_from_class, get_severity_from_class
+from .backends import create_backend
+from .phash_index import PHashIndex, dhash
+from .image_io import open_image
+from .latency import get_latency_tracker
+from .model_registry import ModelRegistry, UnknownModelVersion
+from .tta import VIEWS, augment
+from .cascade import DEFAULT_THRESHOLD, small_model_path
+
+
+class ModelNotReady(Exception):
+    """Raised when a prediction arrives before the model has finished loading"""
+    pass
+
+
+class ClassLabels:
+    """
+    Index-aligned label tables for the model's output classes
+
+    Built once so decoding a prediction is array indexing rather than a
+    DISEASE_MAPPING lookup and string formatting per class per request.
+    """
+    
+    def __init__(self, class_names: List[str]):
+        self.class_names = np.array(class_names, dtype=object)
+        self.crops = np.array([get_crop_from_class(name) for name in class_names], dtype=object)
+        self.disease_keys = np.array([get_disease_from_class(name) for name in class_names], dtype=object)
+        self.display_names = np.array([key.replace("_", " ").title() for key in self.disease_keys], dtype=object)
+        self.severities = np.array([get_severity_from_class(name) for name in class_names], dtype=object)
+    
+    def __len__(self) -> int:
+        return len(self.class_names)
+
+
+def top_k(probs: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and probabilities of the k most likely classes per row, best first
+    
+    argpartition selects the k candidates in linear time; only those k are
+    then sorted, instead of sorting every class of every row.
+    """
+    k = min(k, probs.shape[1])
+    candidates = np.argpartition(probs, -k, axis=1)[:, -k:]
+    candidate_probs = np.take_along_axis(probs, candidates, axis=1)
+    order = np.argsort(-candidate_probs, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_probs, order, axis=1)
+
+
+class LoadedModel:
+    """
+    A serving backend together with its metadata and version
+    
+    Swapped in and out of the engine as one unit, so a request never mixes
+    one model's backend with another's metadata. Tracks in-flight requests
+    so a replaced model is only unloaded once they have finished.
+    
+    With the cascade enabled, small_backend is the version's early-exit
+    model and cascade_threshold the confidence at which it answers alone.
+    """
+    
+    def __init__(self, backend=None, metadata: Optional[Dict] = None, version: Optional[str] = None, model_path: Optional[str] = None,
+                 small_backend=None, cascade_threshold: Optional[float] = None):
+        self.backend = backend  # KerasBackend / TFLiteBackend, None in mock mode
+        self.metadata = metadata or {}
+        self.version = version or self.metadata.get("version", "2.0.0")
+        self.model_path = model_path
+        self.small_backend = small_backend
+        self.cascade_threshold = cascade_threshold
+        self._in_flight = 0
+        self._retired = False
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+    
+    def acquire(self) -> bool:
+        """Pin the model for a request; False once it has been retired by a swap"""
+        with self._lock:
+            if self._retired:
+                return False
+            self._in_flight += 1
+            self._idle.clear()
+            return True
+    
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                if self._retired:
+                    self._unload_backends()  # Last request on a replaced model
+                self._idle.set()
+    
+    def _unload_backends(self):
+        if self.backend is not None:
+            self.backend.unload()
+        if self.small_backend is not None:
+            self.small_backend.unload()
+    
+    def unload(self, timeout: float = 60.0) -> bool:
+        """
+        Retire the model and drop its backends once no request is using it
+        
+        Waits up to `timeout` for in-flight requests. If some are still
+        running, returns False and the last one to finish unloads instead.
+        """
+        with self._lock:
+            self._retired = True
+            if self._in_flight == 0:
+                self._unload_backends()
+                return True
+        return self._idle.wait(timeout)
 
 
 class InferenceEngine:
@@ -19,68 +128,252 @@ class InferenceEngine:
     Completely isolated from business logic and knowledge base
     """
     
-    def __init__(self, model_path: Optional[str] = None):
-        self.model = None
+    def __init__(self, model_path: Optional[str] = None, load: bool = True):
+        self.active = LoadedModel()  # Replaced atomically by load_model / swap_model
+        self.registry = ModelRegistry()
+        self.swap_status = {"state": "idle", "version": None, "error": None}
+        self._swap_lock = threading.Lock()
+        self._active_lock = threading.Lock()  # Reading and pinning self.active vs replacing it
         # Robust path handling: check local 'models' or 'backend/models'
         default_path = "models/plant_disease_v2.h5" 
-        if not Path(default_path).exists():
+        if not Path(default_path).parent.exists():
             default_path = "backend/models/plant_disease_v2.h5"
             
-        self.model_path = model_path or default_path
-        self.model_metadata = {}
-        self.inference_times = []  # Track performance
+        # MODEL_VERSION picks a registry version when no explicit path is given
+        self.registry_version = None
+        if not model_path and not SERVING_CONFIG["model_path"] and SERVING_CONFIG["model_version"]:
+            try:
+                model_path = str(self.registry.get_model_path(SERVING_CONFIG["model_version"]))
+                self.registry_version = SERVING_CONFIG["model_version"]
+            except UnknownModelVersion as e:
+                print(f"⚠️ {e}, falling back to the default model")
+        self.model_path = model_path or SERVING_CONFIG["model_path"] or default_path
+        self.latency = get_latency_tracker()  # Per-stage latency histograms
+        self.phash_index = PHashIndex()  # Recent predictions by perceptual hash
+        self.labels = ClassLabels(CLASS_NAMES)  # Lookup tables for decoding predictions
+        self.tta_stats = {"applied": 0, "rescued": 0, "skipped": 0}  # Adaptive TTA outcomes, per image
+        self._stats_lock = threading.Lock()
+        self.cascade_stats = {"small": 0, "full": 0}  # Images answered by each cascade stage
+        self.ready = threading.Event()  # Set once load_model has finished (model or mock)
+        self.load_time_ms = None
+        
+        # Load model on initialization (or later, see start_background_load)
+        if load:
+            self.load_model()
+    
+    @property
+    def backend(self):
+        """Serving backend of the active model (None means mock mode)"""
+        return self.active.backend
+    
+    @property
+    def model(self):
+        """Loaded serving backend (kept under the old name; None means mock mode)"""
+        return self.active.backend
+    
+    @property
+    def model_metadata(self) -> Dict:
+        return self.active.metadata
+    
+    @property
+    def state(self) -> str:
+        """Model lifecycle: 'loading' until load_model has finished, then 'ready'"""
+        return "ready" if self.ready.is_set() else "loading"
+    
+    @property
+    def model_version(self) -> str:
+        """Version of the model currently serving predictions"""
+        return self.active.version
+    
+    def _load_backend(self, model_file: Path):
+        """Create, load and warm up the configured backend for one model file"""
+        backend = create_backend(model_file)
+        if not Path(backend.model_path).exists():
+            raise FileNotFoundError(f"Model not found at {backend.model_path}")
+        backend.load()
+        # First call allocates buffers / traces graphs; keep it off live traffic
+        backend.predict(np.zeros((1, *MODEL_CONFIG["input_size"]), dtype=np.float32))
+        return backend
+    
+    def _load(self, model_path: str, version: Optional[str] = None) -> LoadedModel:
+        """Load and warm up a model without touching the active one"""
+        model_file = Path(model_path)
+        backend = self._load_backend(model_file)
+        
+        # Load metadata if available
+        metadata = {}
+        metadata_path = model_file.parent / "model_metadata.json"
+        if metadata_path.exists():
+            import json
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
         
-        # Load model on initialization
-        self.load_model()
+        # Early-exit model of the same version, if the cascade is on and one was exported
+        small_backend, threshold = None, None
+        small_file = small_model_path(model_file)
+        if SERVING_CONFIG["cascade"] and (small_file.exists() or small_file.with_suffix(".tflite").exists()):
+            tuned = metadata.get("cascade")
+            configured = SERVING_CONFIG["cascade_threshold"]
+            if configured is not None:
+                threshold = configured
+            else:
+                threshold = tuned["threshold"] if tuned else DEFAULT_THRESHOLD
+            if threshold is None:
+                print("⚠️ Tuned cascade threshold is unset (no early exit meets the target), cascade disabled")
+            else:
+                if not tuned and configured is None:
+                    print(f"⚠️ No tuned cascade threshold in model metadata, using {threshold}")
+                small_backend = self._load_backend(small_file)
+                print(f"✅ Cascade enabled: {small_backend.model_path} answers at confidence >= {threshold}")
+        return LoadedModel(backend, metadata, version, str(model_file), small_backend, threshold)
     
     def load_model(self):
-        """Load the trained model from disk"""
+        """Load the trained model from disk using the configured backend"""
+        start_time = time.time()
         try:
-            model_file = Path(self.model_path)
-            if model_file.exists():
-                self.model = tf.keras.models.load_model(str(model_file))
-                print(f"✅ Model loaded successfully from {self.model_path}")
-                
-                # Load metadata if available
-                metadata_path = model_file.parent / "model_metadata.json"
-                if metadata_path.exists():
-                    import json
-                    with open(metadata_path, 'r') as f:
-                        self.model_metadata = json.load(f)
-            else:
-                print(f"⚠️ Model not found at {self.model_path}, using mock mode")
-                self.model = None
+            self.active = self._load(self.model_path, self.registry_version)
+            self.phash_index.clear()  # Old model's predictions must not be reused
+            print(f"✅ Model loaded successfully from {self.backend.model_path} ({self.backend.name} backend)")
+        except FileNotFoundError as e:
+            print(f"⚠️ {e}, using mock mode")
+            self.active = LoadedModel(version=self.registry_version)
         except Exception as e:
             print(f"❌ Error loading model: {e}")
-            self.model = None
+            self.active = LoadedModel(version=self.registry_version)
+        finally:
+            self.load_time_ms = round((time.time() - start_time) * 1000, 2)
+            self.ready.set()
+    
+    def swap_model(self, version: str) -> Dict:
+        """
+        Load a registry version, warm it up and make it the active model
+        
+        Runs alongside live traffic: requests already running keep the
+        model they started with, and the old model is unloaded once they
+        have finished. Safe to call from a worker thread.
+        
+        Raises:
+            UnknownModelVersion: if the version is not in the registry
+            RuntimeError: if another swap is already running
+        """
+        model_path = self.registry.get_model_path(version)
+        if not self._swap_lock.acquire(blocking=False):
+            raise RuntimeError(f"A model swap to {self.swap_status['version']} is already in progress")
+        
+        try:
+            self.swap_status = {"state": "loading", "version": version, "error": None}
+            start_time = time.time()
+            try:
+                loaded = self._load(str(model_path), version)
+            except Exception as e:
+                self.swap_status = {"state": "failed", "version": version, "error": str(e)}
+                print(f"❌ Model swap to {version} failed: {e}")
+                raise
+            
+            with self._active_lock:
+                previous, self.active = self.active, loaded
+            self.model_path = str(model_path)
+            self.registry_version = version
+            self.phash_index.clear()
+            load_ms = (time.time() - start_time) * 1000
+            print(f"✅ Model {version} active ({loaded.backend.name} backend, loaded in {load_ms:.0f} ms)")
+            
+            self.swap_status = {"state": "draining", "version": version, "error": None}
+            if not previous.unload():
+                print(f"⚠️ Model {previous.version} still has requests in flight; it will be unloaded when they finish")
+            self.swap_status = {"state": "idle", "version": version, "error": None}
+            return {
+                "version": version,
+                "previous_version": previous.version,
+                "backend": loaded.backend.name,
+                "load_ms": round(load_ms, 2)
+            }
+        finally:
+            self._swap_lock.release()
     
-    def preprocess_image(self, image_bytes: bytes) -> np.ndarray:
+    def preprocess_image(self, image_bytes: bytes, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Preprocess image for model input
         
         Args:
             image_bytes: Raw image bytes from upload
+            out: Optional preallocated (1, 224, 224, 3) float32 array to fill
             
         Returns:
             Preprocessed numpy array ready for inference
         """
+        if out is None:
+            out = np.empty((1, *MODEL_CONFIG["input_size"]), dtype=np.float32)
+        self._preprocess(image_bytes, out)
+        return out
+    
+    def _preprocess(self, image_bytes: bytes, out: np.ndarray) -> Tuple[Optional[int], Dict]:
+        """
+        Fill `out` with the model input
+        
+        Returns:
+            (perceptual hash, timings) where timings has decode_ms, resize_ms
+            and peak_bytes, the estimated memory held for this image (upload
+            buffer, decoded pixels and the input row)
+        """
+        start_time = time.perf_counter()
+        if SERVING_CONFIG["fast_decode"]:
+            img, decoded_bytes = self._decode_fast(image_bytes)
+            decoded_time = time.perf_counter()
+            # reducing_gap does a box reduce() first when the image is still much larger
+            img = img.resize(MODEL_CONFIG["input_size"][:2], Image.BILINEAR, reducing_gap=2.0)
+        else:
+            img, decoded_bytes = self._decode_lanczos(image_bytes)
+            decoded_time = time.perf_counter()
+            img = img.resize(MODEL_CONFIG["input_size"][:2], Image.LANCZOS)
+        
+        # Normalize to [0, 1] straight from the uint8 pixels into the float32 buffer
+        np.multiply(np.asarray(img, dtype=np.uint8), np.float32(1 / 255.0), out=out[0])
+        timings = {
+            "decode_ms": (decoded_time - start_time) * 1000,
+            "resize_ms": (time.perf_counter() - decoded_time) * 1000,
+            "peak_bytes": len(image_bytes) + decoded_bytes + out[0].nbytes
+        }
+        
+        # Hash the already-resized 224x224 image; costs a few microseconds
+        return (dhash(img) if self.phash_index.enabled else None), timings
+    
+    def _decode_fast(self, image_bytes: bytes) -> Tuple[Image.Image, int]:
+        """
+        Decode at reduced resolution
+        
+        For JPEGs, draft() lets libjpeg scale by 1/2, 1/4 or 1/8 in the DCT
+        domain, so a 12 MP photo is never fully materialised. Other formats
+        get a fast integer reduce() in the resize step instead.
+        
+        Returns:
+            (decoded RGB image, bytes of the decoded pixels)
+        """
+        img = open_image(image_bytes)
+        
+        # Must happen before load(); keeps the decoded size >= input_size
+        img.draft('RGB', MODEL_CONFIG["input_size"][:2])
+        img.load()
+        decoded_bytes = img.width * img.height * len(img.getbands())
+        
+        # Phone photos are often stored sideways with an EXIF rotation tag
+        img = ImageOps.exif_transpose(img)
+        
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img, decoded_bytes
+    
+    def _decode_lanczos(self, image_bytes: bytes) -> Tuple[Image.Image, int]:
+        """Full-resolution decode for the LANCZOS path (original path, FAST_DECODE=0)"""
         # Load image from bytes
-        img = Image.open(io.BytesIO(image_bytes))
+        img = open_image(image_bytes)
+        img.load()
+        decoded_bytes = img.width * img.height * len(img.getbands())
         
         # Convert to RGB if needed
         if img.mode != 'RGB':
             img = img.convert('RGB')
-        
-        # Resize to model input size
-        input_size = MODEL_CONFIG["input_size"][:2]  # (224, 224)
-        img = img.resize(input_size, Image.LANCZOS)
-        
-        # Convert to array and normalize
-        img_array = tf.keras.preprocessing.image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)  # Add batch dimension
-        img_array = img_array / 255.0  # Normalize to [0, 1]
-        
-        return img_array
+        return img, decoded_bytes
     
     def predict(self, image_bytes: bytes) -> Dict:
         """
@@ -92,66 +385,230 @@ class InferenceEngine:
         Returns:
             Dict with crop, disease, confidence, and metadata
         """
-        # Start timing
-        start_time = time.time()
+        return self.predict_batch([image_bytes])[0]
+    
+    def predict_batch(self, images: List[bytes], return_exceptions: bool = False) -> List:
+        """
+        Run inference on several images with a single forward pass
+        
+        Args:
+            images: List of raw image bytes
+            return_exceptions: If True, images that fail preprocessing yield
+                their exception in place of a result instead of failing the batch
+            
+        Returns:
+            List of prediction dicts (same shape as predict), in input order
+        """
+        if not self.ready.is_set():
+            raise ModelNotReady("Model is still loading, please retry shortly")
+        
+        # Pin the model for the whole call; a concurrent swap won't affect it
+        active = self._pin_active()
+        try:
+            return self._predict_batch(active, images, return_exceptions)
+        finally:
+            active.release()
+    
+    def _pin_active(self) -> LoadedModel:
+        """Acquire the active model, never one a swap has already retired"""
+        while True:
+            with self._active_lock:
+                active = self.active
+                if active.acquire():
+                    return active
+    
+    def _predict_batch(self, active: LoadedModel, images: List[bytes], return_exceptions: bool) -> List:
+        results: List = [None] * len(images)
+        batch = np.empty((len(images), *MODEL_CONFIG["input_size"]), dtype=np.float32)
+        positions = []
+        preprocess_ms = []
+        timings = []
+        hashes = []
+        
+        # Preprocess each image on its own so one bad upload can't sink the batch
+        for i, image_bytes in enumerate(images):
+            start_time = time.time()
+            row = len(positions)
+            try:
+                phash, image_timings = self._preprocess(image_bytes, out=batch[row:row + 1])
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[i] = e
+                continue
+            self.record_preprocess_times(image_timings["decode_ms"], image_timings["resize_ms"])
+            
+            # Near-identical image seen recently: reuse its prediction, skip the model
+            reused = self.phash_index.lookup(phash) if phash is not None else None
+            if reused is not None:
+                inference_time_ms = (time.time() - start_time) * 1000
+                self.record_inference_time(inference_time_ms)
+                result = copy.deepcopy(reused)
+                result["metadata"] = self._build_metadata(active, inference_time_ms, 0.0, image_timings, near_duplicate=True)
+                results[i] = result
+                continue
+            
+            positions.append(i)
+            hashes.append(phash)
+            timings.append(image_timings)
+            preprocess_ms.append((time.time() - start_time) * 1000)
         
-        # Preprocess image
-        img_array = self.preprocess_image(image_bytes)
+        if not positions:
+            return results
         
         # Run inference
-        if self.model is None:
+        inputs = batch[:len(positions)]
+        stages: Optional[List[str]] = None
+        tta_rows: Dict[int, Dict] = {}
+        tta_ms = 0.0
+        start_time = time.time()
+        if active.backend is None:
             # Mock mode for development/testing
-            result = self._mock_prediction()
+            predictions = [self._mock_prediction() for _ in positions]
+            forward_ms = (time.time() - start_time) * 1000
         else:
-            result = self._real_prediction(img_array)
+            if active.small_backend is not None:
+                probs, stages = self._cascade_forward(active, inputs)
+            else:
+                probs = active.backend.predict(inputs)
+            forward_ms = (time.time() - start_time) * 1000
+            if stages is None:
+                self.record_forward_time(forward_ms)
+            if SERVING_CONFIG["adaptive_tta"]:
+                probs, tta_rows, tta_ms = self._apply_tta(active.backend, inputs, probs, forward_ms)
+            predictions = self._decode_predictions(probs)
         
-        # End timing
-        inference_time_ms = (time.time() - start_time) * 1000
-        self.inference_times.append(inference_time_ms)
+        for row, (i, prep_ms, image_timings, phash, result) in enumerate(zip(positions, preprocess_ms, timings, hashes, predictions)):
+            # The TTA pass delays every image of the batch, not only the re-scored ones
+            inference_time_ms = prep_ms + forward_ms + tta_ms
+            self.record_inference_time(inference_time_ms)
+            if phash is not None and self.active is active:
+                self.phash_index.insert(phash, copy.deepcopy(result))
+            
+            # Add metadata
+            result["metadata"] = self._build_metadata(
+                active, inference_time_ms, forward_ms, image_timings,
+                tta=tta_rows.get(row), cascade_stage=stages[row] if stages else None
+            )
+            results[i] = result
         
-        # Add metadata
-        result["metadata"] = {
-            "model_version": self.model_metadata.get("version", "2.0.0"),
-            "inference_time_ms": round(inference_time_ms, 2),
-            "model_architecture": self.model_metadata.get("architecture", "MobileNetV2")
-        }
+        return results
+    
+    def _cascade_forward(self, active: LoadedModel, inputs: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        """
+        Small model first; rows below the cascade threshold go to the full model
+        
+        Returns:
+            (probs, stage per row: "small" or "full")
+        """
+        start_time = time.time()
+        probs = np.array(active.small_backend.predict(inputs), dtype=np.float32)
+        self.latency.record("small_forward", (time.time() - start_time) * 1000)
+        
+        escalate = np.flatnonzero(probs.max(axis=1) < active.cascade_threshold)
+        if len(escalate):
+            start_time = time.time()
+            probs[escalate] = active.backend.predict(inputs[escalate])
+            self.record_forward_time((time.time() - start_time) * 1000)
         
-        return result
+        self.record_cascade(small=len(inputs) - len(escalate), full=len(escalate))
+        stages = ["small"] * len(inputs)
+        for row in escalate:
+            stages[row] = "full"
+        return probs, stages
     
-    def _real_prediction(self, img_array: np.ndarray) -> Dict:
-        """Execute real model prediction"""
-        # Get predictions
-        predictions = self.model.predict(img_array, verbose=0)
+    def _apply_tta(self, backend, inputs: np.ndarray, probs: np.ndarray, forward_ms: float) -> Tuple[np.ndarray, Dict[int, Dict], float]:
+        """
+        Re-score low-confidence rows by averaging over augmented views
         
-        # Get top prediction
-        class_idx = np.argmax(predictions[0])
-        confidence = float(predictions[0][class_idx])
+        All views of all uncertain rows go through one extra batched forward
+        pass. Its estimated cost (the first pass's per-image time x images x
+        views) must fit in tta_budget_ms, since every request in the batch
+        waits for it; the view count is reduced, or TTA skipped, to fit.
         
-        # Map to class name
-        class_name = CLASS_NAMES[class_idx]
-        crop = get_crop_from_class(class_name)
-        disease = get_disease_from_class(class_name)
-        severity = get_severity_from_class(class_name)
+        Returns:
+            (probs, {row: tta metadata}, extra pass ms)
+        """
+        first_pass = probs.max(axis=1)
+        low = np.flatnonzero(first_pass < CONFIDENCE_THRESHOLD)
+        if not len(low):
+            return probs, {}, 0.0
         
-        # Get top 3 predictions for context
-        top_3_idx = np.argsort(predictions[0])[-3:][::-1]
-        alternatives = [
-            {
-                "disease": get_disease_from_class(CLASS_NAMES[idx]),
-                "confidence": float(predictions[0][idx])
-            }
-            for idx in top_3_idx[1:]  # Skip first (main prediction)
-        ]
+        per_image_ms = max(forward_ms / len(inputs), 1e-3)
+        affordable = int(SERVING_CONFIG["tta_budget_ms"] // (per_image_ms * len(low)))
+        num_views = min(SERVING_CONFIG["tta_views"], len(VIEWS), affordable)
+        if num_views < 1:
+            self.record_tta(0.0, applied=0, rescued=0, skipped=len(low))
+            return probs, {
+                int(row): {"views": 0, "tta_ms": 0.0, "first_pass_confidence": float(first_pass[row]), "rescued": False}
+                for row in low
+            }, 0.0
+        
+        start_time = time.time()
+        views = backend.predict(augment(inputs[low], num_views)).reshape(len(low), num_views, -1)
+        tta_ms = (time.time() - start_time) * 1000
+        
+        probs = np.array(probs, dtype=np.float32)
+        probs[low] = (probs[low] + views.sum(axis=1)) / (num_views + 1)
+        rescued = probs[low].max(axis=1) >= CONFIDENCE_THRESHOLD
+        self.record_tta(tta_ms, applied=len(low), rescued=int(rescued.sum()), skipped=0)
         
+        return probs, {
+            int(row): {
+                "views": num_views,
+                "tta_ms": round(tta_ms, 2),
+                "first_pass_confidence": float(first_pass[row]),
+                "rescued": bool(was_rescued)
+            }
+            for row, was_rescued in zip(low, rescued)
+        }, tta_ms
+    
+    def _build_metadata(self, active: LoadedModel, inference_time_ms: float, forward_ms: float, timings: Dict, near_duplicate: bool = False,
+                        tta: Optional[Dict] = None, cascade_stage: Optional[str] = None) -> Dict:
+        """Per-prediction model and timing metadata"""
         return {
-            "crop": crop,
-            "disease": disease.replace("_", " ").title(),
-            "disease_key": disease,
-            "severity": severity,
-            "confidence": confidence,
-            "alternatives": alternatives
+            "model_version": active.version,
+            "inference_time_ms": round(inference_time_ms, 2),
+            "model_architecture": active.metadata.get("architecture", "MobileNetV2"),
+            "backend": active.backend.name if active.backend is not None else "mock",
+            "forward_ms": round(forward_ms, 2),
+            "near_duplicate": near_duplicate,
+            "decode_ms": round(timings["decode_ms"], 2),
+            "resize_ms": round(timings["resize_ms"], 2),
+            "peak_memory_mb": round(timings["peak_bytes"] / 2**20, 2),
+            "tta": tta,
+            "cascade_stage": cascade_stage
         }
     
+    def _decode_predictions(self, probs: np.ndarray) -> List[Dict]:
+        """Map (N, num_classes) probabilities to structured results, top 3 per row"""
+        top_idx, top_probs = top_k(np.asarray(probs), 3)
+        labels = self.labels
+        
+        # One fancy-index per table for the whole batch, then plain Python lists
+        best = top_idx[:, 0]
+        crops = labels.crops[best].tolist()
+        disease_keys = labels.disease_keys[best].tolist()
+        display_names = labels.display_names[best].tolist()
+        severities = labels.severities[best].tolist()
+        alternative_keys = labels.disease_keys[top_idx[:, 1:]].tolist()
+        confidences = top_probs.tolist()
+        
+        return [
+            {
+                "crop": crops[row],
+                "disease": display_names[row],
+                "disease_key": disease_keys[row],
+                "severity": severities[row],
+                "confidence": confidences[row][0],
+                "alternatives": [
+                    {"disease": key, "confidence": confidence}
+                    for key, confidence in zip(alternative_keys[row], confidences[row][1:])
+                ]
+            }
+            for row in range(len(best))
+        ]
+    
     def _mock_prediction(self) -> Dict:
         """Mock prediction for testing without trained model"""
         return {
@@ -165,24 +622,72 @@ class InferenceEngine:
             ]
         }
     
+    def record_inference_time(self, inference_time_ms: float):
+        """Record one inference duration (safe to call from worker threads)"""
+        self.latency.record("inference", inference_time_ms)
+    
+    def record_forward_time(self, forward_ms: float):
+        """Record one backend forward pass (a batch counts once)"""
+        self.latency.record("forward", forward_ms)
+    
+    def record_preprocess_times(self, decode_ms: float, resize_ms: float):
+        """Record the decode and resize stages of one image"""
+        self.latency.record("decode", decode_ms)
+        self.latency.record("resize", resize_ms)
+    
+    def record_tta(self, tta_ms: float, applied: int, rescued: int, skipped: int):
+        """Record one adaptive TTA pass (a batch counts once) and its per-image outcomes"""
+        if applied:
+            self.latency.record("tta", tta_ms)
+        with self._stats_lock:
+            self.tta_stats["applied"] += applied
+            self.tta_stats["rescued"] += rescued
+            self.tta_stats["skipped"] += skipped
+    
+    def record_cascade(self, small: int, full: int):
+        """Record how many images each cascade stage answered"""
+        with self._stats_lock:
+            self.cascade_stats["small"] += small
+            self.cascade_stats["full"] += full
+    
     def get_performance_stats(self) -> Dict:
         """Get inference performance statistics"""
-        if not self.inference_times:
+        stages = self.latency.get_stats()
+        inference = stages["inference"]["all_time"]
+        
+        if not inference["count"]:
             return {"message": "No inferences performed yet"}
         
+        with self._stats_lock:
+            tta_stats, cascade_stats = dict(self.tta_stats), dict(self.cascade_stats)
+        
         return {
-            "total_inferences": len(self.inference_times),
-            "avg_inference_ms": round(np.mean(self.inference_times), 2),
-            "min_inference_ms": round(np.min(self.inference_times), 2),
-            "max_inference_ms": round(np.max(self.inference_times), 2),
-            "std_inference_ms": round(np.std(self.inference_times), 2)
+            "total_inferences": inference["count"],
+            "avg_inference_ms": round(inference["mean_ms"], 2),
+            "min_inference_ms": round(inference["min_ms"], 2),
+            "max_inference_ms": round(inference["max_ms"], 2),
+            "std_inference_ms": round(inference["std_ms"], 2),
+            "backend": self.backend.name if self.backend is not None else "mock",
+            "avg_forward_ms": round(stages["forward"]["all_time"]["mean_ms"], 2) if stages["forward"]["all_time"]["count"] else None,
+            **self.phash_index.get_stats(),
+            "tta_applied": tta_stats["applied"],
+            "tta_rescued": tta_stats["rescued"],
+            "tta_skipped": tta_stats["skipped"],
+            "cascade_small": cascade_stats["small"],
+            "cascade_full": cascade_stats["full"],
+            "stages": stages
         }
     
     def get_model_info(self) -> Dict:
         """Get model information and metadata"""
         return {
             "loaded": self.model is not None,
+            "state": self.state,
+            "load_time_ms": self.load_time_ms,
             "model_path": self.model_path,
+            "version": self.model_version,
+            "backend": self.backend.name if self.backend is not None else "mock",
+            "cascade_threshold": self.active.cascade_threshold,
             "metadata": self.model_metadata,
             "performance": self.get_performance_stats(),
             "class_count": len(CLASS_NAMES),
@@ -192,10 +697,30 @@ class InferenceEngine:
 
 # Global instance (singleton pattern)
 _inference_engine = None
+_inference_engine_lock = threading.Lock()
 
 def get_inference_engine() -> InferenceEngine:
-    """Get or create global inference engine instance"""
+    """Get or create global inference engine instance (thread-safe)"""
     global _inference_engine
     if _inference_engine is None:
-        _inference_engine = InferenceEngine()
+        with _inference_engine_lock:
+            if _inference_engine is None:
+                _inference_engine = InferenceEngine()
+    return _inference_engine
+
+
+def start_background_load() -> InferenceEngine:
+    """
+    Create the global engine without blocking and load its model in a thread
+    
+    Until loading finishes the engine reports state "loading" and
+    predictions raise ModelNotReady, while every other endpoint serves.
+    """
+    global _inference_engine
+    with _inference_engine_lock:
+        if _inference_engine is not None:
+            return _inference_engine
+        _inference_engine = InferenceEngine(load=False)
+    
+    threading.Thread(target=_inference_engine.load_model, name="model-loader", daemon=True).start()
     return _inference_engine
@@ -0,0 +1,178 @@
+"""
+Latency Histograms for SANJIVANI 2.0
+Fixed-memory, log-bucketed latency histograms per pipeline stage,
+with all-time and sliding-window percentiles
+"""
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Buckets grow by 2^(1/16) (~4.4%), so any reported percentile is within
+# ~2.2% of the true value. 0.01 ms .. 10 min takes 415 buckets.
+MIN_MS = 0.01
+MAX_MS = 600_000.0
+BUCKETS_PER_OCTAVE = 16
+NUM_BUCKETS = math.ceil(math.log2(MAX_MS / MIN_MS) * BUCKETS_PER_OCTAVE) + 1
+
+# Geometric midpoint of each bucket, the value reported for it
+_BUCKET_VALUES = MIN_MS * 2 ** ((np.arange(NUM_BUCKETS) + 0.5) / BUCKETS_PER_OCTAVE)
+
+# Sliding windows are built from 30-second slots
+SLOT_SECONDS = 30
+WINDOWS = {"last_1m": 60, "last_15m": 15 * 60}
+NUM_SLOTS = max(WINDOWS.values()) // SLOT_SECONDS + 1
+
+PERCENTILES = {"p50_ms": 0.50, "p90_ms": 0.90, "p99_ms": 0.99, "p999_ms": 0.999}
+
+# Pipeline stages tracked by the serving path
+STAGES = ("decode", "resize", "small_forward", "forward", "tta", "inference", "knowledge", "db_write", "total")
+
+
+def bucket_index(ms: float) -> int:
+    """Histogram bucket for a duration, clamped to the tracked range"""
+    if ms <= MIN_MS:
+        return 0
+    return min(int(math.log2(ms / MIN_MS) * BUCKETS_PER_OCTAVE), NUM_BUCKETS - 1)
+
+
+def _summarize(counts: np.ndarray, total_ms: float) -> Dict:
+    """Count, mean and percentiles of one merged histogram"""
+    count = int(counts.sum())
+    summary = {"count": count, "mean_ms": round(total_ms / count, 3) if count else None}
+    if not count:
+        return {**summary, **{name: None for name in PERCENTILES}}
+
+    cumulative = np.cumsum(counts)
+    for name, q in PERCENTILES.items():
+        index = int(np.searchsorted(cumulative, math.ceil(q * count)))
+        summary[name] = round(float(_BUCKET_VALUES[index]), 3)
+    return summary
+
+
+class StageHistogram:
+    """
+    Latency histogram for one stage
+
+    Keeps an all-time histogram plus a ring of per-slot histograms for the
+    sliding windows. Memory is fixed at (NUM_SLOTS + 1) * NUM_BUCKETS
+    counters no matter how many samples are recorded. A window covers the
+    current partial slot plus the preceding full ones, so "last_1m" spans
+    between 60 and 90 seconds.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(NUM_BUCKETS, dtype=np.int64)
+        self.total_ms = 0.0
+        self.total_sq_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+        self.slot_counts = np.zeros((NUM_SLOTS, NUM_BUCKETS), dtype=np.int32)
+        self.slot_totals = np.zeros(NUM_SLOTS, dtype=np.float64)
+        self.slot_ids = np.full(NUM_SLOTS, -1, dtype=np.int64)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def record(self, ms: float, now: float):
+        index = bucket_index(ms)
+        self.counts[index] += 1
+        self.total_ms += ms
+        self.total_sq_ms += ms * ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+
+        slot = int(now // SLOT_SECONDS)
+        position = slot % NUM_SLOTS
+        if self.slot_ids[position] != slot:
+            self.slot_counts[position] = 0
+            self.slot_totals[position] = 0.0
+            self.slot_ids[position] = slot
+        self.slot_counts[position, index] += 1
+        self.slot_totals[position] += ms
+
+    def window(self, seconds: int, now: float) -> Dict:
+        """Summary of the samples recorded in roughly the last `seconds`"""
+        oldest = int(now // SLOT_SECONDS) - seconds // SLOT_SECONDS
+        live = self.slot_ids >= oldest
+        return _summarize(self.slot_counts[live].sum(axis=0), float(self.slot_totals[live].sum()))
+
+    def get_stats(self, now: float) -> Dict:
+        count = self.count
+        all_time = _summarize(self.counts, self.total_ms)
+        if count:
+            variance = max(self.total_sq_ms / count - (self.total_ms / count) ** 2, 0.0)
+            # A bucket's midpoint can fall outside what was actually observed
+            for name in PERCENTILES:
+                all_time[name] = round(min(max(all_time[name], self.min_ms), self.max_ms), 3)
+            all_time.update(
+                min_ms=round(self.min_ms, 3),
+                max_ms=round(self.max_ms, 3),
+                std_ms=round(math.sqrt(variance), 3)
+            )
+        return {
+            "all_time": all_time,
+            **{name: self.window(seconds, now) for name, seconds in WINDOWS.items()}
+        }
+
+
+class LatencyTracker:
+    """Thread-safe set of per-stage latency histograms"""
+
+    def __init__(self, stages=STAGES):
+        self._stages: Dict[str, StageHistogram] = {stage: StageHistogram() for stage in stages}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, ms: float):
+        """Record one duration in milliseconds (unknown stages are added on first use)"""
+        now = time.time()
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = StageHistogram()
+            histogram.record(ms, now)
+
+    def count(self, stage: str) -> int:
+        with self._lock:
+            histogram = self._stages.get(stage)
+            return histogram.count if histogram is not None else 0
+
+    def get_stage_stats(self, stage: str) -> Optional[Dict]:
+        """All-time and windowed summary for one stage, or None if unknown"""
+        now = time.time()
+        with self._lock:
+            histogram = self._stages.get(stage)
+            return histogram.get_stats(now) if histogram is not None else None
+
+    def get_stats(self, stages: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """All-time and windowed summaries for every stage (or the given ones)"""
+        now = time.time()
+        with self._lock:
+            return {
+                stage: histogram.get_stats(now)
+                for stage, histogram in self._stages.items()
+                if stages is None or stage in stages
+            }
+
+    def reset(self):
+        with self._lock:
+            for stage in self._stages:
+                self._stages[stage] = StageHistogram()
+
+
+# Global instance
+_latency_tracker = None
+_latency_tracker_lock = threading.Lock()
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get or create global latency tracker instance"""
+    global _latency_tracker
+    if _latency_tracker is None:
+        with _latency_tracker_lock:
+            if _latency_tracker is None:
+                _latency_tracker = LatencyTracker()
+    return _latency_tracker
@@ -0,0 +1,225 @@
+"""
+LLM Client for SANJIVANI 2.0
+One shared, non-blocking Gemini client for every LLM feature (explain,
+analysis, search fallback)
+
+Calls never block the event loop: the default transport uses the Gemini
+SDK's async API on a single reused GenerativeModel; setting LLM_BASE_URL
+switches to the Gemini REST API over httpx (a proxy, or a local fake
+server in tests). At most `max_concurrency` calls run at once and at most
+`max_queue` more may wait; beyond that LLMOverloaded is raised so
+handlers can shed load instead of piling up behind a slow model.
+"""
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Dict, Optional
+
+from .dataset_config_v2 import SERVING_CONFIG
+
+MODEL_NAME = 'gemini-2.0-flash'
+
+
+class LLMError(Exception):
+    """Raised when an LLM call fails"""
+    pass
+
+
+class LLMTimeout(LLMError):
+    """Raised when an LLM call exceeds its timeout"""
+    pass
+
+
+class LLMOverloaded(LLMError):
+    """Raised when the maximum number of LLM calls are already running or waiting"""
+    pass
+
+
+class GeminiSDKTransport:
+    """google-generativeai async API on one shared model object"""
+
+    def __init__(self, api_key: str, model_name: str = MODEL_NAME):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+
+class HTTPTransport:
+    """Gemini REST generateContent over a pooled httpx client (one per event loop)"""
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, model_name: str = MODEL_NAME):
+        self.url = f"{base_url.rstrip('/')}/v1beta/models/{model_name}:generateContent"
+        self.api_key = api_key
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _client(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(timeout=None)
+        return client
+
+    async def generate(self, prompt: str) -> str:
+        response = await self._client().post(
+            self.url,
+            params={"key": self.api_key} if self.api_key else None,
+            json={"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        )
+        if response.status_code != 200:
+            raise LLMError(f"LLM server returned {response.status_code}: {response.text[:200]}")
+        parts = response.json()["candidates"][0]["content"]["parts"]
+        return "".join(part.get("text", "") for part in parts)
+
+    async def close(self):
+        """Close this event loop's connection pool"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+def create_transport():
+    """Transport for the configured endpoint, or None if no LLM is configured"""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if SERVING_CONFIG["llm_base_url"]:
+        return HTTPTransport(SERVING_CONFIG["llm_base_url"], api_key)
+    if api_key:
+        return GeminiSDKTransport(api_key)
+    return None
+
+
+class LLMClient:
+    """
+    Bounded, timed access to the LLM
+
+    Tracks calls, failures, timeouts, rejections, the number of calls
+    running and waiting, and the peak queue depth.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout_s: Optional[float] = None
+    ):
+        self.transport = transport
+        self.max_concurrency = max(1, max_concurrency or SERVING_CONFIG["llm_max_concurrency"])
+        self.max_queue = max(0, max_queue if max_queue is not None else SERVING_CONFIG["llm_max_queue"])
+        self.timeout_s = timeout_s or SERVING_CONFIG["llm_timeout_s"]
+
+        # asyncio primitives belong to one loop; keep a semaphore per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+        # Counters
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_timeouts = 0
+        self.total_rejected = 0
+        self._total_latency_ms = 0.0
+        self._total_wait_ms = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.transport is not None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def generate(self, prompt: str, timeout_s: Optional[float] = None) -> str:
+        """
+        Generate text for a prompt
+
+        Raises:
+            LLMOverloaded: max_concurrency calls running and max_queue waiting
+            LLMTimeout: no answer within timeout_s (default LLM_TIMEOUT_S)
+            LLMError: no LLM configured, or the call failed
+        """
+        if self.transport is None:
+            raise LLMError("No LLM configured (set GEMINI_API_KEY)")
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            self.total_rejected += 1
+            raise LLMOverloaded(
+                f"LLM queue full ({self.in_flight} running, {self.waiting} waiting)"
+            )
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._semaphore().acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self._total_wait_ms += (started_at - queued_at) * 1000
+        self.in_flight += 1
+        self.total_calls += 1
+        try:
+            return await asyncio.wait_for(self.transport.generate(prompt), timeout_s or self.timeout_s)
+        except asyncio.TimeoutError:
+            self.total_timeouts += 1
+            raise LLMTimeout(f"LLM call timed out after {timeout_s or self.timeout_s:.1f}s")
+        except LLMError:
+            self.total_failures += 1
+            raise
+        except Exception as e:
+            self.total_failures += 1
+            raise LLMError(str(e)) from e
+        finally:
+            self.in_flight -= 1
+            self._total_latency_ms += (time.perf_counter() - started_at) * 1000
+            self._semaphore().release()
+
+    async def close(self):
+        """Release transport connections (on shutdown)"""
+        if hasattr(self.transport, "close"):
+            await self.transport.close()
+
+    def get_stats(self) -> Dict:
+        """Get client statistics"""
+        return {
+            "available": self.available,
+            "transport": type(self.transport).__name__ if self.transport else None,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout_s": self.timeout_s,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "total_timeouts": self.total_timeouts,
+            "total_rejected": self.total_rejected,
+            "avg_latency_ms": round(self._total_latency_ms / self.total_calls, 1) if self.total_calls else None,
+            "avg_wait_ms": round(self._total_wait_ms / self.total_calls, 1) if self.total_calls else None
+        }
+
+
+# Global instance
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+def get_llm_client() -> LLMClient:
+    """Get or create global LLM client instance"""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient(create_transport())
+    return _llm_client
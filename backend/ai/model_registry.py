@@ -0,0 +1,82 @@
+"""
+Model Registry for SANJIVANI 2.0
+Versioned model directories that can be hot-swapped into the
+running inference engine
+
+Layout:
+    models/registry/
+        2.1.0/
+            plant_disease_v2.h5
+            plant_disease_v2.tflite      (optional)
+            model_metadata.json          (optional)
+        2.2.0/
+            ...
+"""
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .dataset_config_v2 import SERVING_CONFIG
+
+MODEL_FILENAME = "plant_disease_v2.h5"
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+class UnknownModelVersion(Exception):
+    """Raised when a version is not present in the registry"""
+    pass
+
+
+class ModelRegistry:
+    """Read-only view over the versioned model directories"""
+
+    def __init__(self, root: Optional[str] = None):
+        root = root or SERVING_CONFIG["model_registry_dir"]
+        # Same relative-path fallback as the engine's default model path
+        if not Path(root).is_absolute() and not Path(root).parent.exists():
+            root = str(Path("backend") / root)
+        self.root = Path(root)
+
+    def get_model_path(self, version: str) -> Path:
+        """
+        Path to a version's .h5 (the .tflite is expected alongside)
+
+        Raises:
+            UnknownModelVersion: if the version directory has no model
+        """
+        if not VERSION_PATTERN.match(version):
+            raise UnknownModelVersion(f"Invalid model version: {version!r}")
+        h5_path = self.root / version / MODEL_FILENAME
+        if not (h5_path.exists() or h5_path.with_suffix(".tflite").exists()):
+            raise UnknownModelVersion(f"Model version {version!r} not found in {self.root}")
+        return h5_path
+
+    def list_versions(self) -> List[Dict]:
+        """All versions in the registry with their metadata"""
+        if not self.root.is_dir():
+            return []
+
+        versions = []
+        for version_dir in sorted(self.root.iterdir()):
+            if not version_dir.is_dir() or not VERSION_PATTERN.match(version_dir.name):
+                continue
+            h5_path = version_dir / MODEL_FILENAME
+            has_h5 = h5_path.exists()
+            has_tflite = h5_path.with_suffix(".tflite").exists()
+            if not (has_h5 or has_tflite):
+                continue
+
+            metadata = {}
+            metadata_path = version_dir / "model_metadata.json"
+            if metadata_path.exists():
+                with open(metadata_path, 'r') as f:
+                    metadata = json.load(f)
+
+            versions.append({
+                "version": version_dir.name,
+                "has_h5": has_h5,
+                "has_tflite": has_tflite,
+                "metadata": metadata
+            })
+        return versions
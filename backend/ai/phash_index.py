@@ -0,0 +1,144 @@
+"""
+Perceptual Hash Index for SANJIVANI 2.0
+Finds recently seen near-identical images (re-photographed or
+re-compressed leaves) so their prediction can be reused
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .dataset_config_v2 import SERVING_CONFIG
+
+HASH_BITS = 64
+
+
+def dhash(img: Image.Image) -> int:
+    """
+    64-bit difference hash
+
+    Shrinks the image to a 9x8 grayscale thumbnail and records whether each
+    pixel is brighter than its right-hand neighbour. Robust to rescaling,
+    JPEG re-compression and small brightness shifts.
+    """
+    thumb = np.asarray(img.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = thumb[:, 1:] > thumb[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class PHashIndex:
+    """
+    Multi-index hash table over 64-bit perceptual hashes
+
+    Each hash is split into radius + 1 chunks, each indexed in its own
+    table. By the pigeonhole principle, any hash within `radius` bits of a
+    stored one matches it exactly on at least one chunk, so a lookup only
+    needs to verify the handful of candidates in those buckets. Unlike a
+    BK-tree this supports cheap removal, so the index is a bounded LRU.
+    """
+
+    def __init__(self, radius: Optional[int] = None, max_entries: Optional[int] = None, max_age_s: Optional[float] = None):
+        self.radius = radius if radius is not None else SERVING_CONFIG["phash_radius"]
+        self.max_entries = max_entries if max_entries is not None else SERVING_CONFIG["phash_index_size"]
+        self.max_age_s = max_age_s if max_age_s is not None else SERVING_CONFIG["phash_max_age_s"]
+
+        self.num_chunks = min(self.radius + 1, HASH_BITS)
+        self._chunk_spans = self._split_bits(self.num_chunks)
+        self._tables: List[Dict[int, set]] = [{} for _ in range(self.num_chunks)]
+        self._entries: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.lookups = 0
+        self.hits = 0
+        self.lookup_ns_total = 0
+
+    @staticmethod
+    def _split_bits(num_chunks: int) -> List[Tuple[int, int]]:
+        """(shift, mask) for each chunk, covering all 64 bits as evenly as possible"""
+        spans = []
+        start = 0
+        for i in range(num_chunks):
+            width = HASH_BITS // num_chunks + (1 if i < HASH_BITS % num_chunks else 0)
+            spans.append((start, (1 << width) - 1))
+            start += width
+        return spans
+
+    def _chunks(self, h: int):
+        return [(h >> shift) & mask for shift, mask in self._chunk_spans]
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def lookup(self, h: int) -> Optional[Dict]:
+        """Return the value stored for the closest hash within radius, or None"""
+        if not self.enabled:
+            return None
+
+        start = time.perf_counter_ns()
+        with self._lock:
+            now = time.monotonic()
+            best, best_distance = None, self.radius + 1
+            for table, chunk in zip(self._tables, self._chunks(h)):
+                for candidate in table.get(chunk, ()):
+                    distance = (candidate ^ h).bit_count()
+                    if distance < best_distance and now - self._entries[candidate][0] <= self.max_age_s:
+                        best, best_distance = candidate, distance
+
+            value = None
+            if best is not None:
+                self._entries.move_to_end(best)
+                value = self._entries[best][1]
+                self.hits += 1
+            self.lookups += 1
+            self.lookup_ns_total += time.perf_counter_ns() - start
+        return value
+
+    def insert(self, h: int, value: Dict):
+        """Store a value under a hash, evicting the least recently used if full"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if h in self._entries:
+                self._entries[h] = (time.monotonic(), value)
+                self._entries.move_to_end(h)
+                return
+
+            self._entries[h] = (time.monotonic(), value)
+            for table, chunk in zip(self._tables, self._chunks(h)):
+                table.setdefault(chunk, set()).add(h)
+
+            while len(self._entries) > self.max_entries:
+                old, _ = self._entries.popitem(last=False)
+                self._remove_from_tables(old)
+
+    def _remove_from_tables(self, h: int):
+        for table, chunk in zip(self._tables, self._chunks(h)):
+            bucket = table.get(chunk)
+            if bucket is not None:
+                bucket.discard(h)
+                if not bucket:
+                    del table[chunk]
+
+    def clear(self):
+        """Drop all entries (e.g. after a model change)"""
+        with self._lock:
+            self._entries.clear()
+            for table in self._tables:
+                table.clear()
+
+    def get_stats(self) -> Dict:
+        """Get near-duplicate lookup statistics"""
+        with self._lock:
+            return {
+                "phash_entries": len(self._entries),
+                "phash_lookups": self.lookups,
+                "phash_hits": self.hits,
+                "phash_hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "phash_avg_lookup_us": round(self.lookup_ns_total / self.lookups / 1000, 2) if self.lookups else 0.0
+            }
@@ -0,0 +1,145 @@
+"""
+Post-Training Quantization for SANJIVANI 2.0
+TFLite export in float, dynamic-range and full-integer (int8) variants,
+plus an accuracy / size / latency comparison against the Keras model
+"""
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import tensorflow as tf
+
+from .backends import _PooledInterpreter, compile_forward
+
+QUANTIZATION_MODES = ("float", "dynamic", "int8")
+
+
+def representative_dataset(batches: Iterable, num_samples: int = 200) -> Callable[[], Iterator[List[np.ndarray]]]:
+    """
+    Calibration data for full-integer quantization
+
+    Args:
+        batches: Iterable of (images, labels) or images batches, already
+            scaled like serving inputs (e.g. the validation generator)
+        num_samples: Number of single images to draw
+
+    Returns:
+        A callable for TFLiteConverter.representative_dataset. The sample
+        is drawn once up front so every call yields the same images.
+    """
+    samples = []
+    for batch in batches:
+        images = batch[0] if isinstance(batch, tuple) else batch
+        for image in np.asarray(images, dtype=np.float32):
+            samples.append(image[None])
+            if len(samples) >= num_samples:
+                break
+        if len(samples) >= num_samples:
+            break
+
+    def generate():
+        for sample in samples:
+            yield [sample]
+
+    generate.num_samples = len(samples)
+    return generate
+
+
+def convert_tflite(model, mode: str, representative_data: Optional[Callable] = None) -> bytes:
+    """
+    Convert a Keras model to a TFLite flatbuffer
+
+    Args:
+        model: Keras model
+        mode: "float" (no quantization), "dynamic" (int8 weights, float
+            activations) or "int8" (int8 weights, activations and I/O)
+        representative_data: Calibration callable, required for "int8"
+
+    Returns:
+        Serialized .tflite model
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode} (expected one of {QUANTIZATION_MODES})")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if mode in ("dynamic", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == "int8":
+        if representative_data is None:
+            raise ValueError("int8 quantization needs a representative dataset for calibration")
+        converter.representative_dataset = representative_data
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def _latency_percentiles(fn: Callable, sample: np.ndarray, runs: int) -> Dict:
+    """Warm up, then p50/p99 of single-image latency in ms"""
+    for _ in range(10):
+        fn(sample)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(sample)
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(float(np.percentile(times, 50)), 3),
+        "p99_ms": round(float(np.percentile(times, 99)), 3)
+    }
+
+
+def compare_variants(
+    model,
+    tflite_models: Dict[str, bytes],
+    images: np.ndarray,
+    labels: np.ndarray,
+    keras_size_mb: float,
+    latency_runs: int = 200
+) -> Dict[str, Dict]:
+    """
+    Accuracy, size and CPU latency of the Keras model and each TFLite variant
+
+    Args:
+        model: Float Keras model (the reference)
+        tflite_models: {mode: flatbuffer} from convert_tflite
+        images: (N, 224, 224, 3) float32 evaluation images
+        labels: (N,) integer class labels
+        keras_size_mb: Size of the saved .h5 file
+        latency_runs: Timed single-image calls per variant
+
+    Returns:
+        {"keras_float": {...}, "tflite_float": {...}, ...}, each with
+        accuracy, agreement (top-1 match with Keras), size_mb, p50_ms, p99_ms
+    """
+    sample = images[:1]
+    num_classes = model.output_shape[-1]
+    forward = compile_forward(model)
+    keras_predict = lambda batch: forward(batch).numpy()
+    reference = np.concatenate([keras_predict(images[i:i + 32]) for i in range(0, len(images), 32)]).argmax(axis=1)
+
+    report = {
+        "keras_float": {
+            "accuracy": round(float(np.mean(reference == labels)), 4),
+            "agreement": 1.0,
+            "size_mb": round(keras_size_mb, 3),
+            **_latency_percentiles(keras_predict, sample, latency_runs)
+        }
+    }
+
+    for mode, content in tflite_models.items():
+        interpreter = _PooledInterpreter(content, num_threads=1)
+        probs = np.empty((len(images), num_classes), dtype=np.float32)
+        for i, image in enumerate(images):
+            interpreter.run(image, probs[i])
+        predicted = probs.argmax(axis=1)
+
+        out = np.empty(num_classes, dtype=np.float32)
+        report[f"tflite_{mode}"] = {
+            "accuracy": round(float(np.mean(predicted == labels)), 4),
+            "agreement": round(float(np.mean(predicted == reference)), 4),
+            "size_mb": round(len(content) / (1024 * 1024), 3),
+            **_latency_percentiles(lambda batch: interpreter.run(batch[0], out), sample, latency_runs)
+        }
+
+    return report
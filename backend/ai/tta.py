@@ -0,0 +1,54 @@
+"""
+Test-Time Augmentation for SANJIVANI 2.0
+Cheap geometric views of an already-preprocessed model input, averaged
+with the original prediction when the first pass is not confident
+
+Views are built from the (224, 224, 3) input array rather than the
+original upload, so no image is decoded or resized twice.
+"""
+from typing import Callable, List
+
+import numpy as np
+
+
+def _center_crop(fraction: float) -> Callable[[np.ndarray], np.ndarray]:
+    """Zoom into the central `fraction` of the image (nearest-neighbour resample)"""
+    def crop(image: np.ndarray) -> np.ndarray:
+        size = image.shape[0]
+        offset = (1 - fraction) * size / 2
+        index = (offset + np.arange(size) * fraction).astype(np.intp)
+        return image[index][:, index]
+    return crop
+
+
+_crop_875 = _center_crop(0.875)
+_crop_75 = _center_crop(0.75)
+
+# In order of preference: the first n are used when the budget allows n views
+VIEWS: List[Callable[[np.ndarray], np.ndarray]] = [
+    lambda image: image[:, ::-1],            # horizontal flip
+    _crop_875,                               # center crop 87.5%
+    lambda image: _crop_875(image)[:, ::-1],  # flipped center crop
+    lambda image: image[::-1],               # vertical flip
+    _crop_75,                                # center crop 75%
+]
+
+
+def augment(images: np.ndarray, num_views: int) -> np.ndarray:
+    """
+    Augmented views for a batch of model inputs
+
+    Args:
+        images: (N, H, W, C) float32 preprocessed inputs
+        num_views: Views per image (at most len(VIEWS))
+
+    Returns:
+        (N * num_views, H, W, C) float32 array, views of image i at
+        rows i * num_views ... (i + 1) * num_views - 1
+    """
+    num_views = min(num_views, len(VIEWS))
+    out = np.empty((len(images) * num_views, *images.shape[1:]), dtype=np.float32)
+    for i, image in enumerate(images):
+        for v in range(num_views):
+            out[i * num_views + v] = VIEWS[v](image)
+    return out
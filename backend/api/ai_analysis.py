@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from ai.gemini_service import get_gemini_service
+from ai.llm_client import LLMOverloaded
 
 router = APIRouter(prefix="/api/v2/ai", tags=["ai"])
 
@@ -15,19 +16,25 @@ async def analyze_disease(request: AnalysisRequest):
     Get detailed AI analysis for a detected disease using Gemini
     """
     service = get_gemini_service()
-    if not service.model:
+    if not service.available:
         raise HTTPException(status_code=503, detail="AI Service unavailable (Missing API Key)")
         
-    analysis = service.generate_disease_analysis(
-        request.crop, 
-        request.disease, 
-        request.confidence
-    )
+    try:
+        analysis, cache_info = await service.analyze(
+            request.crop, 
+            request.disease, 
+            request.confidence
+        )
+    except LLMOverloaded as e:
+        print(f"⚠️ Gemini overloaded: {e}")
+        raise HTTPException(status_code=503, detail="AI Service busy. Please retry shortly.", headers={"Retry-After": "5"})
     
     if not analysis:
         raise HTTPException(status_code=500, detail="Failed to generate analysis")
         
     return {
         "success": True,
-        "data": analysis
+        "data": analysis,
+        "cached": cache_info["status"] == "hit",
+        "cache": cache_info
     }
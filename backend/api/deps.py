@@ -1,9 +1,11 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import firebase_admin
 from firebase_admin import auth, credentials
 import os
 import json
+import secrets
+from typing import Optional
 
 # Initialize Firebase Admin
 # In production, this should be handled at startup/lifespan
@@ -67,3 +69,23 @@ async def get_current_user_optional(token: HTTPAuthorizationCredentials = Depend
         return None
     
     return await get_current_user(token)
+
+
+# Admin endpoints (model hot-swap) are keyed by a shared secret; unset disables them
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """
+    Verify the X-Admin-Key header against ADMIN_API_KEY
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled (ADMIN_API_KEY not set)"
+        )
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key"
+        )
+    return True
@@ -0,0 +1,85 @@
+"""
+API v2 Admin Endpoints
+Model registry listing and zero-downtime model hot-swap
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from schemas.prediction import ModelRegistryResponse, ModelSwapStatus
+from ai.inference_engine import get_inference_engine
+from ai.executor import get_inference_executor
+from ai.model_registry import UnknownModelVersion
+from api.deps import require_admin
+
+router = APIRouter(prefix="/api/v2/admin", tags=["admin-v2"], dependencies=[Depends(require_admin)])
+
+# Reference to the running swap so it isn't garbage collected mid-flight
+_swap_task: Optional[asyncio.Task] = None
+
+
+async def _swap(version: str):
+    """Load + warm up off the event loop, then move process workers over"""
+    engine = get_inference_engine()
+    try:
+        await asyncio.to_thread(engine.swap_model, version)
+    except Exception:
+        return  # Recorded in engine.swap_status
+    try:
+        get_inference_executor().restart_workers()
+    except Exception as e:
+        engine.swap_status = {
+            "state": "failed",
+            "version": version,
+            "error": f"Model {version} is active but worker restart failed: {e}"
+        }
+        print(f"❌ Worker restart after swap to {version} failed: {e}")
+
+
+@router.get("/models", response_model=ModelRegistryResponse)
+async def list_models():
+    """
+    List model versions in the registry
+    
+    Shows:
+    - Every version directory with its model files and metadata
+    - The active version and backend
+    - Status of the latest hot-swap
+    """
+    engine = get_inference_engine()
+    return ModelRegistryResponse(
+        active_version=engine.model_version,
+        active_backend=engine.backend.name if engine.backend is not None else "mock",
+        swap=ModelSwapStatus(**engine.swap_status),
+        versions=engine.registry.list_versions()
+    )
+
+
+@router.post("/models/{version}/activate", response_model=ModelSwapStatus, status_code=202)
+async def activate_model(version: str):
+    """
+    Hot-swap the serving model to a registry version
+    
+    The new model is loaded and warmed up in the background while the
+    current one keeps serving. The switch is atomic: requests already
+    running finish on the old model, which is unloaded afterwards.
+    Poll GET /api/v2/admin/models for progress.
+    """
+    global _swap_task
+    engine = get_inference_engine()
+    
+    try:
+        engine.registry.get_model_path(version)
+    except UnknownModelVersion as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    if _swap_task is not None and not _swap_task.done():
+        raise HTTPException(
+            status_code=409,
+            detail=f"A model swap to {engine.swap_status['version']} is already in progress"
+        )
+    
+    engine.swap_status = {"state": "loading", "version": version, "error": None}
+    _swap_task = asyncio.create_task(_swap(version))
+    return ModelSwapStatus(**engine.swap_status)
@@ -1,25 +1,66 @@
-from fastapi import APIRouter
-import json
-import os
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from knowledge.alert_index import get_alert_index
+from services.static_responses import get_static_responses
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+
+
+def _values(param: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated query parameter as a list"""
+    return [value for value in param.split(",") if value.strip()] if param else None
+
+
+def _page(result: dict) -> dict:
+    return {**result, "count": len(result["alerts"])}
+
+
 @router.get("/pests")
-async def get_pest_alerts():
+async def get_pest_alerts(
+    request: Request,
+    crop: Optional[str] = Query(None, description="Crop name(s), comma-separated"),
+    severity: Optional[str] = Query(None, description="Severity level(s), comma-separated (e.g. High,Critical)"),
+    region: Optional[str] = Query(None, description="Region name(s), comma-separated"),
+    since: Optional[date] = Query(None, description="Only alerts on or after this date (YYYY-MM-DD)"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(100.0, gt=0, le=5000, description="Search radius around lat/lon"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500)
+):
     """
-    Get current pest alerts.
+    Get current pest alerts, newest first.
+
+    Filters combine with AND; comma-separated values within one filter
+    combine with OR. Pass next_cursor back as `cursor` for the next page.
     """
-    # Path to the alerts json
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__))) # backend
-    json_path = os.path.join(base_dir, "knowledge", "pest_alerts.json")
-    
-    if not os.path.exists(json_path):
+    index = get_alert_index()
+    if index is None:
          return []
-         
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-        
-    return {
-        "alerts": data,
-        "count": len(data)
-    }
+
+    # The unfiltered first page is what most clients poll: serve it pre-encoded
+    if not request.query_params:
+        payload = get_static_responses().get("pests", index.version, lambda: _page(index.query(limit=DEFAULT_PAGE_SIZE)))
+        return payload.respond(request)
+
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="lat and lon must be given together")
+
+    try:
+        result = index.query(
+            crops=_values(crop),
+            severities=_values(severity),
+            regions=_values(region),
+            since=since,
+            near=(lat, lon, radius_km) if lat is not None else None,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _page(result)
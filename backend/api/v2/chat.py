@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from ai.gemini_tutor import get_explanation
+from ai.gemini_tutor import explain
+from ai.llm_client import LLMOverloaded
 from api.deps import get_current_user_optional
 
 router = APIRouter()
@@ -21,7 +22,7 @@ async def explain_result(
     Powered by Gemini 1.5 Flash.
     """
     try:
-        explanation = get_explanation(
+        explanation, cache_info = await explain(
             disease_name=request.disease,
             confidence=request.confidence,
             crop_name=request.crop,
@@ -30,7 +31,11 @@ async def explain_result(
         return {
             "explanation": explanation,
             "provider": "Gemini 2.0 Flash",
-            "cached": False
+            "cached": bool(cache_info and cache_info["status"] == "hit"),
+            "cache": cache_info
         }
+    except LLMOverloaded as e:
+        print(f"⚠️ Gemini overloaded: {e}")
+        raise HTTPException(status_code=503, detail="AI tutor busy. Please retry shortly.", headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,25 +1,41 @@
-from fastapi import APIRouter
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
 from ai.registry import get_supported_crops
+from knowledge.calendar_index import get_calendar_index, parse_month
 from knowledge.knowledge_engine import get_knowledge_engine
+from knowledge.loader import get_knowledge_loader
+from services.static_responses import get_static_responses
 
 router = APIRouter()
 
 @router.get("/crops")
-async def get_crops():
+async def get_crops(request: Request):
     """
     Get list of supported crops and their status.
     """
-    return {
+    # The registry is fixed for the life of the process
+    payload = get_static_responses().get("crops", "static", lambda: {
         "crops": get_supported_crops(),
         "count": len(get_supported_crops())
-    }
+    })
+    return payload.respond(request)
 
 @router.get("/diseases")
-async def get_diseases():
+async def get_diseases(request: Request):
     """
     Get searchable list of all diseases for Global Search.
     """
     engine = get_knowledge_engine()
+    payload = get_static_responses().get(
+        "diseases", engine.get_knowledge_revision(), lambda: _disease_index(engine.knowledge_db)
+    )
+    return payload.respond(request)
+
+
+def _disease_index(knowledge_db):
+    """Listing for Global Search, rebuilt only when the knowledge base changes"""
     # Create a lightweight index
     index = []
     
@@ -27,7 +43,7 @@ async def get_diseases():
     def format_name(key):
         return key.replace("_", " ")
 
-    for key, data in engine.knowledge_base.get("diseases", {}).items():
+    for key, data in knowledge_db.items():
         if key == "Healthy": continue
         
         index.append({
@@ -50,7 +66,7 @@ async def get_disease_detail(disease_id: str):
     Get full details for a specific disease.
     """
     engine = get_knowledge_engine()
-    data = engine.knowledge_base.get("diseases", {}).get(disease_id)
+    data = engine.knowledge_db.get(disease_id)
     
     if not data:
         return {"error": "Disease not found"}, 404
@@ -62,22 +78,65 @@ async def get_disease_detail(disease_id: str):
     }
 
 @router.get("/calendar")
-async def get_calendar():
+async def get_calendar(request: Request):
     """
     Get crop lifecycle calendar data.
     """
-    import json
-    import os
-    
-    # Path to the calendar json
-    # Assuming relative path from api/v2/meta.py back to knowledge/crop_calendar.json
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__))) # backend
-    json_path = os.path.join(base_dir, "knowledge", "crop_calendar.json")
-    
-    if not os.path.exists(json_path):
+    snapshot = get_knowledge_loader().get("crop_calendar")
+    if snapshot is None:
          return {"error": "Calendar data missing"}, 500
          
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-        
-    return data
+    return get_static_responses().get("calendar", snapshot.revision, lambda: snapshot.data).respond(request)
+
+@router.get("/calendar/month")
+async def get_calendar_month(
+    request: Request,
+    month: Optional[str] = Query(None, description="1-12 or month name (default: current month)"),
+    crop: Optional[str] = Query(None, description="Only this crop"),
+    season: Optional[str] = Query(None, description="Only this season (e.g. Kharif, Rabi)"),
+    phase: Optional[Literal["sowing", "growing", "harvest"]] = Query(None, description="Only this phase")
+):
+    """
+    What to sow, tend or harvest in a month.
+
+    Returns only the crops in each phase that month, instead of the whole
+    calendar for the client to filter.
+    """
+    index = get_calendar_index()
+    if index is None:
+        raise HTTPException(status_code=500, detail="Calendar data missing")
+    try:
+        month_index = parse_month(month) if month else date.today().month - 1
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    crop_name = index.resolve_crop(crop) if crop else None
+    if crop and crop_name is None:
+        raise HTTPException(status_code=404, detail=f"No calendar for crop: {crop}")
+    season_name = index.resolve_season(season) if season else None
+    if season and season_name is None:
+        raise HTTPException(status_code=404, detail=f"Unknown season: {season}")
+
+    # Inputs are canonicalized above, so the set of cached slices is bounded
+    key = f"calendar:{month_index}:{crop_name}:{season_name}:{phase}"
+    payload = get_static_responses().get(
+        key, index.version, lambda: index.query(month_index, crop_name, season_name, phase)
+    )
+    return payload.respond(request)
+
+@router.get("/calendar/seasons/{season}")
+async def get_calendar_season(request: Request, season: str):
+    """
+    Crops sown in a season, with their sowing months.
+    """
+    index = get_calendar_index()
+    if index is None:
+        raise HTTPException(status_code=500, detail="Calendar data missing")
+    season_name = index.resolve_season(season)
+    if season_name is None:
+        raise HTTPException(status_code=404, detail=f"Unknown season: {season}")
+
+    payload = get_static_responses().get(
+        f"season:{season_name}", index.version,
+        lambda: {"season": season_name, "crops": index.season_crops(season_name)}
+    )
+    return payload.respond(request)
@@ -1,13 +1,21 @@
 """
 API v2 Model Metrics and Health Endpoints
 """
+import asyncio
+
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 import json
 from pathlib import Path
 
-from schemas.prediction import ModelMetrics, HealthCheckResponse, PerformanceStats
+from schemas.prediction import ModelMetrics, HealthCheckResponse, PerformanceStats, CacheStats, LLMCacheStats, LLMClientStats
 from ai.inference_engine import get_inference_engine
+from ai.latency import get_latency_tracker
+from ai.llm_client import get_llm_client
 from knowledge.knowledge_engine import get_knowledge_engine
+from knowledge.loader import get_knowledge_loader
+from services.llm_cache import get_llm_cache
+from services.prediction_cache import get_prediction_cache
 
 router = APIRouter(prefix="/api/v2", tags=["metrics-v2"])
 
@@ -23,6 +31,8 @@ async def get_model_metrics():
     - Model size
     - Average inference time
     - Training date
+    - Quantization report: accuracy, size and p50/p99 CPU latency of the
+      float .h5 and the float, dynamic-range and int8 .tflite exports
     """
     try:
         # Robust path handling
@@ -30,12 +40,15 @@ async def get_model_metrics():
         if not metadata_path.exists():
             metadata_path = Path("backend/models/model_metadata.json")
         
-        if metadata_path.exists():
+        inference_engine = get_inference_engine()
+        if inference_engine.registry_version and inference_engine.model_metadata:
+            # Hot-swapped registry model: report the version actually serving
+            metadata = {**inference_engine.model_metadata, "version": inference_engine.model_version}
+        elif metadata_path.exists():
             with open(metadata_path, 'r') as f:
                 metadata = json.load(f)
         else:
             # Return basic info if metadata not available
-            inference_engine = get_inference_engine()
             model_info = inference_engine.get_model_info()
             metadata = {
                 "version": "2.0.0",
@@ -64,6 +77,10 @@ async def get_performance_stats():
     - Average inference time
     - Min/max inference times
     - Standard deviation
+    - Near-duplicate (perceptual hash) hit rate and lookup latency
+    - p50/p90/p99/p999 per stage (decode, resize, forward, knowledge
+      mapping, DB write, total request), all-time and over the last
+      1 and 15 minutes
     """
     inference_engine = get_inference_engine()
     stats = inference_engine.get_performance_stats()
@@ -75,12 +92,51 @@ async def get_performance_stats():
             avg_inference_ms=0,
             min_inference_ms=0,
             max_inference_ms=0,
-            std_inference_ms=0
+            std_inference_ms=0,
+            stages=get_latency_tracker().get_stats()
         )
     
     return PerformanceStats(**stats)
 
 
+@router.get("/model/cache", response_model=CacheStats)
+async def get_cache_stats():
+    """
+    Get prediction cache statistics
+    
+    Tracks:
+    - Hits, misses and hit rate
+    - LRU evictions and TTL expirations
+    - Invalidations caused by model or knowledge base version changes
+    """
+    return CacheStats(**get_prediction_cache().get_stats())
+
+
+@router.get("/llm/cache", response_model=LLMCacheStats)
+async def get_llm_cache_stats():
+    """
+    Get Gemini output cache statistics
+    
+    Tracks:
+    - Memory and disk tier hits, misses and hit rate
+    - Total generation latency saved by hits
+    """
+    return LLMCacheStats(**await asyncio.to_thread(get_llm_cache().get_stats))
+
+
+@router.get("/llm/client", response_model=LLMClientStats)
+async def get_llm_client_stats():
+    """
+    Get shared Gemini client statistics
+    
+    Tracks:
+    - Calls in flight and waiting for a slot (peak queue depth)
+    - Failures, timeouts and calls rejected when the queue is full
+    - Average call latency and queue wait
+    """
+    return LLMClientStats(**get_llm_client().get_stats())
+
+
 @router.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """
@@ -103,14 +159,18 @@ async def health_check():
     # Check knowledge base
     kb_version = knowledge_engine.get_knowledge_version()
     kb_loaded = kb_version != "unknown"
+    knowledge_status = get_knowledge_loader().get_status()
     
     # Get performance stats
     perf_stats = inference_engine.get_performance_stats()
     total_inferences = perf_stats.get("total_inferences", 0)
     avg_inference_ms = perf_stats.get("avg_inference_ms")
+    near_duplicate_hit_rate = perf_stats.get("phash_hit_rate")
     
     # Determine overall status
-    if model_loaded and kb_loaded:
+    if model_info["state"] == "loading":
+        status = "loading"
+    elif model_loaded and kb_loaded:
         status = "healthy"
     elif model_loaded or kb_loaded:
         status = "degraded"
@@ -120,9 +180,40 @@ async def health_check():
     return HealthCheckResponse(
         status=status,
         model_loaded=model_loaded,
+        model_state=model_info["state"],
+        model_load_ms=model_info["load_time_ms"],
         knowledge_base_loaded=kb_loaded,
         knowledge_version=kb_version,
-        model_version=model_info.get("metadata", {}).get("version", "2.0.0"),
+        model_version=model_info["version"],
         total_inferences=total_inferences,
-        avg_inference_ms=avg_inference_ms
+        avg_inference_ms=avg_inference_ms,
+        near_duplicate_hit_rate=near_duplicate_hit_rate,
+        request_latency=get_latency_tracker().get_stage_stats("total"),
+        knowledge_files=knowledge_status["files"],
+        knowledge_last_reload=knowledge_status["last_reload"]
     )
+
+
+@router.get("/live")
+async def liveness():
+    """
+    Liveness probe
+    
+    Answers as soon as the process is serving HTTP, even while the model
+    is still loading. Use /api/v2/ready to wait for predictions.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe
+    
+    200 once the model has loaded (or fallen back to mock mode),
+    503 while it is still loading.
+    """
+    inference_engine = get_inference_engine()
+    if inference_engine.state != "ready":
+        return JSONResponse(status_code=503, content={"status": inference_engine.state})
+    return {"status": "ready", "model_version": inference_engine.model_version}
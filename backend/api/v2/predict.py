@@ -3,20 +3,104 @@ API v2 Prediction Endpoint
 Combines AI inference with knowledge engine for complete responses
 """
 from fastapi import APIRouter, File, UploadFile, HTTPException, Query
-from typing import Optional
+from fastapi.responses import Response, StreamingResponse
+from typing import Optional, List, Dict, Tuple, AsyncIterator
+import asyncio
+import json
+import time
+import zipfile
+import zlib
 
-from schemas.prediction import PredictionResponse
-from ai.inference_engine import get_inference_engine
-from knowledge.knowledge_engine import get_knowledge_engine
+from schemas.prediction import PredictionMetadata, PredictionResponse
+from ai.batch_scheduler import get_batch_scheduler
+from ai.executor import InferenceQueueFull, get_inference_executor
+from ai.latency import get_latency_tracker
+from ai.inference_engine import ModelNotReady, get_inference_engine
+from knowledge.knowledge_engine import ResponseFragment, get_knowledge_engine
+from services.prediction_cache import get_prediction_cache
+from services.upload_ingest import UploadRejected, check_image, read_upload
 from database import save_scan
 
 router = APIRouter(prefix="/api/v2", tags=["prediction-v2"])
 
 
-from ai.dataset_config_v2 import CLASS_NAMES, get_crop_from_class, get_disease_from_class, get_severity_from_class
+from ai.dataset_config_v2 import CLASS_NAMES, CONFIDENCE_THRESHOLD, SERVING_CONFIG, get_crop_from_class, get_disease_from_class, get_severity_from_class
 from api.deps import get_current_user_optional
 from fastapi import Depends
 
+
+def _require_model_ready():
+    """503 instead of queueing uploads while the model is still loading"""
+    if get_inference_engine().state != "ready":
+        raise HTTPException(
+            status_code=503,
+            detail="Model is still loading. Please retry shortly.",
+            headers={"Retry-After": "5"}
+        )
+
+
+def _cache_context(contents: bytes, language: str) -> Tuple[Tuple, Tuple[str, str]]:
+    """Prediction cache key and (model, knowledge) generation for an upload"""
+    model_version = get_inference_engine().model_version
+    cache_generation = (model_version, get_knowledge_engine().get_knowledge_revision())
+    return get_prediction_cache().make_key(contents, model_version, language), cache_generation
+
+
+def _assemble_response(prediction: Dict, language: str) -> Tuple[ResponseFragment, Dict]:
+    """
+    Map an engine prediction to the full API response, with confidence safeguards
+    
+    Returns:
+        The precompiled knowledge fragment (static, pre-serialized fields) and
+        the per-request fields: crop, confidence, alternatives, metadata
+    """
+    confidence = prediction["confidence"]
+    
+    # --- CONFIDENCE SAFEGUARDS ---
+    # Priority 1.3: Prevent blind trust in low-confidence predictions. The
+    # uncertain fragment carries the warning, generic actions and Low severity.
+    uncertain = confidence < CONFIDENCE_THRESHOLD
+    if uncertain:
+        print(f"⚠️ Low confidence prediction ({confidence:.2f} < {CONFIDENCE_THRESHOLD})")
+    
+    # Map to knowledge base (deterministic)
+    start_time = time.perf_counter()
+    fragment = get_knowledge_engine().get_response_fragment(prediction["disease_key"], language, uncertain)
+    get_latency_tracker().record("knowledge", (time.perf_counter() - start_time) * 1000)
+    if fragment is None:
+        raise ValueError(f"No knowledge base entry for {prediction['disease_key']}")
+    
+    # The fragment was validated when compiled; the per-request half is checked here,
+    # and metadata is cut down to the fields PredictionMetadata declares
+    dynamic = {
+        "crop": prediction["crop"],
+        "confidence": confidence,
+        "alternatives": prediction.get("alternatives"),
+        "metadata": PredictionMetadata.model_validate(prediction["metadata"]).model_dump(mode="json", exclude_none=True)
+    }
+    return fragment, dynamic
+
+
+def _json_response(fragment: ResponseFragment, dynamic: Dict, cached: bool) -> Response:
+    """Serialized PredictionResponse, spliced from the fragment's pre-encoded JSON"""
+    return Response(fragment.render({**dynamic, "cached": cached}), media_type="application/json")
+
+
+def _save_scan(fragment: ResponseFragment, dynamic: Dict, filename: Optional[str]):
+    """Persist a completed scan"""
+    scan_data = {
+        "crop": dynamic["crop"],
+        "disease": fragment.fields["disease"],
+        "confidence": dynamic["confidence"],
+        "severity": fragment.fields["severity"],
+        "filename": filename,
+        "model_version": dynamic["metadata"]["model_version"]
+    }
+    start_time = time.perf_counter()
+    save_scan(scan_data)
+    get_latency_tracker().record("db_write", (time.perf_counter() - start_time) * 1000)
+
+
 @router.post("/predict", response_model=PredictionResponse)
 async def predict_disease(
     file: UploadFile = File(...),
@@ -35,7 +119,7 @@ async def predict_disease(
     - **User Identity Awareness** (New)
     
     **Process:**
-    1. AI inference (crop + disease + confidence)
+    1. AI inference (crop + disease + confidence), micro-batched with concurrent uploads
     2. Knowledge lookup (symptoms + treatments)
     3. Structured response assembly
     """
@@ -43,68 +127,236 @@ async def predict_disease(
         # Log User Access
         user_id = user.get("uid") if user else "guest"
         print(f"👤 Prediction requested by: {user_id}")
+        start_time = time.perf_counter()
+        _require_model_ready()
 
-        # Read image bytes
-        contents = await file.read()
-        
-        # Get AI engines
-        inference_engine = get_inference_engine()
-        knowledge_engine = get_knowledge_engine()
-        
-        # Step 1: AI Inference (isolated)
-        prediction = inference_engine.predict(contents)
-        confidence = prediction["confidence"]
+        # Read image bytes (chunked, size-capped, header checked before decode)
+        contents = await read_upload(file)
         
-        # Step 2: Map to knowledge base (deterministic)
-        complete_response = knowledge_engine.map_prediction_to_response(
-            crop=prediction["crop"],
-            disease_key=prediction["disease_key"],
-            confidence=confidence,
-            language=language
-        )
+        # Step 0: Serve re-uploads of the same photo from cache
+        prediction_cache = get_prediction_cache()
+        cache_key, cache_generation = _cache_context(contents, language)
+        cached_response = prediction_cache.get(cache_key, cache_generation)
+        if cached_response is not None:
+            response = _json_response(*cached_response, cached=True)
+            get_latency_tracker().record("total", (time.perf_counter() - start_time) * 1000)
+            return response
         
-        # --- CONFIDENCE SAFEGUARDS ---
-        # Priority 1.3: Prevent blind trust in low-confidence predictions
-        if confidence < CONFIDENCE_THRESHOLD:
-            print(f"⚠️ Low confidence prediction ({confidence:.2f} < {CONFIDENCE_THRESHOLD})")
-            
-            # 1. Flag as 'Uncertain' in explanation
-            warning_msg = "⚠️ Low Confidence Risk: The system is uncertain about this result. Please consult an expert before applying treatments."
-            complete_response["explanation"] = f"{warning_msg}\n\n{complete_response['explanation']}"
-            
-            # 2. Suppress specific chemical advice (Safety)
-            complete_response["recommended_actions"] = {
-                "immediate": ["Consult a local agricultural expert for verification."],
-                "short_term": ["Monitor the crop for progression of symptoms."],
-                "preventive": ["Maintain general crop hygiene."]
-            }
-            
-            # 3. Force severity to Low to prevent panic
-            complete_response["severity"] = "Low"
-            
-        # Add metadata from inference
-        complete_response["metadata"] = prediction["metadata"]
+        # Step 1: AI Inference (isolated, coalesced with concurrent requests)
+        prediction = await get_batch_scheduler().submit(contents)
         
-        # Add alternatives if available
-        if "alternatives" in prediction:
-            complete_response["alternatives"] = prediction["alternatives"]
+        # Step 2: Map to knowledge base (deterministic, with safeguards)
+        fragment, dynamic = _assemble_response(prediction, language)
         
         # Step 3: Save to database
-        scan_data = {
-            "crop": complete_response["crop"],
-            "disease": complete_response["disease"],
-            "confidence": complete_response["confidence"],
-            "severity": complete_response["severity"],
-            "filename": file.filename,
-            "model_version": prediction["metadata"]["model_version"]
-        }
-        save_scan(scan_data)
+        _save_scan(fragment, dynamic, file.filename)
         
-        return PredictionResponse(**complete_response)
+        prediction_cache.put(cache_key, cache_generation, (fragment, dynamic))
+        response = _json_response(fragment, dynamic, cached=False)
+        get_latency_tracker().record("total", (time.perf_counter() - start_time) * 1000)
+        return response
         
+    except HTTPException:
+        raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except InferenceQueueFull as e:
+        print(f"⚠️ Inference overloaded: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy processing other images. Please retry shortly.",
+            headers={"Retry-After": "2"}
+        )
     except Exception as e:
         print(f"❌ Prediction error: {e}")
         raise HTTPException(
             status_code=500, 
             detail=f"Prediction failed: {str(e)}"
         )
+
+
+# --- BATCH PREDICTION ---
+
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+
+def _is_zip(upload: UploadFile) -> bool:
+    return upload.content_type in ZIP_CONTENT_TYPES or (upload.filename or "").lower().endswith(".zip")
+
+
+async def _iter_batch_items(files: List[UploadFile]) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Yield (filename, bytes or error message) for every image, one at a time
+    
+    Multipart uploads are spooled to disk by Starlette and zip members are
+    only decompressed when reached, so nothing here holds the whole batch.
+    """
+    max_bytes = SERVING_CONFIG["max_upload_bytes"]
+    for upload in files:
+        if not _is_zip(upload):
+            try:
+                yield upload.filename, await read_upload(upload)
+            except UploadRejected as e:
+                yield upload.filename, e.detail
+            continue
+        
+        try:
+            archive = zipfile.ZipFile(upload.file)
+        except zipfile.BadZipFile:
+            yield upload.filename, "Invalid zip archive"
+            continue
+        
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                    continue
+                if info.file_size > max_bytes:
+                    yield info.filename, f"File too large ({info.file_size} bytes > {max_bytes})"
+                    continue
+                try:
+                    data = await asyncio.to_thread(archive.read, info)
+                except (zipfile.BadZipFile, RuntimeError, zlib.error, EOFError, NotImplementedError) as e:
+                    # Bad CRC, encrypted member or unsupported/corrupt compression: fail this item only
+                    yield info.filename, f"Unreadable zip member: {e}"
+                    continue
+                try:
+                    check_image(data)
+                except UploadRejected as e:
+                    data = e.detail
+                yield info.filename, data
+
+
+async def _predict_chunk(chunk: List[Tuple[int, str, object]], language: str) -> List[Dict]:
+    """Run one chunk of images as a single engine batch and return one line per image"""
+    prediction_cache = get_prediction_cache()
+    executor = get_inference_executor()
+    lines: Dict[int, Dict] = {}
+    to_infer = []
+    
+    for index, filename, payload in chunk:
+        if isinstance(payload, str):
+            lines[index] = {"index": index, "filename": filename, "error": payload}
+            continue
+        cache_key, cache_generation = _cache_context(payload, language)
+        cached_response = prediction_cache.get(cache_key, cache_generation)
+        if cached_response is not None:
+            fragment, dynamic = cached_response
+            lines[index] = {"index": index, "filename": filename, "result": fragment.to_dict({**dynamic, "cached": True})}
+            continue
+        to_infer.append((index, filename, payload, cache_key, cache_generation))
+    
+    if to_infer:
+        # Share the executor with /predict traffic: back off exponentially, then shed the chunk
+        delay, waited = 0.05, 0.0
+        while True:
+            try:
+                predictions = await executor.predict_batch([item[2] for item in to_infer], return_exceptions=True)
+                break
+            except InferenceQueueFull:
+                if waited >= SERVING_CONFIG["batch_busy_wait_s"]:
+                    predictions = None
+                    break
+                delay = min(delay, SERVING_CONFIG["batch_busy_wait_s"] - waited)
+                await asyncio.sleep(delay)
+                waited += delay
+                delay *= 2
+        
+        if predictions is None:
+            print(f"⚠️ Batch chunk of {len(to_infer)} images shed after {waited:.1f}s of full executor")
+            for index, filename, *_ in to_infer:
+                lines[index] = {"index": index, "filename": filename, "error": "Server busy"}
+            to_infer, predictions = [], []
+        
+        for (index, filename, _, cache_key, cache_generation), prediction in zip(to_infer, predictions):
+            if isinstance(prediction, Exception):
+                lines[index] = {"index": index, "filename": filename, "error": f"Prediction failed: {prediction}"}
+                continue
+            try:
+                fragment, dynamic = _assemble_response(prediction, language)
+                _save_scan(fragment, dynamic, filename)
+                prediction_cache.put(cache_key, cache_generation, (fragment, dynamic))
+                lines[index] = {"index": index, "filename": filename, "result": fragment.to_dict({**dynamic, "cached": False})}
+            except Exception as e:
+                lines[index] = {"index": index, "filename": filename, "error": f"Prediction failed: {e}"}
+    
+    return [lines[index] for index, _, _ in chunk]
+
+
+async def _stream_batch(files: List[UploadFile], language: str) -> AsyncIterator[bytes]:
+    """
+    Pipeline: read -> chunk -> infer -> stream
+    
+    At most `max_in_flight` chunks of `max_batch_size` images are held at
+    once, so memory is bounded by chunk size rather than batch size.
+    Lines are emitted as chunks finish, which may be out of upload order;
+    each line carries its `index`.
+    """
+    chunk_size = SERVING_CONFIG["max_batch_size"]
+    max_in_flight = get_inference_executor().max_workers
+    start_time = time.time()
+    total = failed = 0
+    pending = set()
+    chunk = []
+    
+    async def drain(return_when):
+        nonlocal pending, failed
+        done, pending = await asyncio.wait(pending, return_when=return_when)
+        for task in done:
+            for line in task.result():
+                failed += "error" in line
+                yield (json.dumps(line) + "\n").encode()
+    
+    async for filename, payload in _iter_batch_items(files):
+        chunk.append((total, filename, payload))
+        total += 1
+        if len(chunk) < chunk_size:
+            continue
+        if len(pending) >= max_in_flight:
+            async for line in drain(asyncio.FIRST_COMPLETED):
+                yield line
+        pending.add(asyncio.create_task(_predict_chunk(chunk, language)))
+        chunk = []
+    
+    if chunk:
+        pending.add(asyncio.create_task(_predict_chunk(chunk, language)))
+    while pending:
+        async for line in drain(asyncio.FIRST_COMPLETED):
+            yield line
+    
+    summary = {
+        "summary": {
+            "total": total,
+            "succeeded": total - failed,
+            "failed": failed,
+            "elapsed_ms": round((time.time() - start_time) * 1000, 2)
+        }
+    }
+    yield (json.dumps(summary) + "\n").encode()
+
+
+@router.post("/predict/batch")
+async def predict_batch(
+    files: List[UploadFile] = File(..., description="Images and/or zip archives of images"),
+    language: str = Query("en", description="Language for response (en, hi, mr)"),
+    user: dict = Depends(get_current_user_optional)
+):
+    """
+    Predict diseases for many field photos in one request (API v2)
+    
+    Accepts any mix of image files and zip archives. Images are decoded and
+    classified in engine-sized batches, and results stream back as
+    newline-delimited JSON as soon as each batch finishes:
+    
+    - `{"index": 0, "filename": "...", "result": {...PredictionResponse}}`
+    - `{"index": 1, "filename": "...", "error": "..."}`
+    - final line: `{"summary": {"total": .., "succeeded": .., "failed": .., "elapsed_ms": ..}}`
+    
+    Confidence safeguards and the prediction cache apply to every item.
+    """
+    user_id = user.get("uid") if user else "guest"
+    print(f"👤 Batch prediction requested by: {user_id} ({len(files)} uploads)")
+    _require_model_ready()
+    
+    return StreamingResponse(_stream_batch(files, language), media_type="application/x-ndjson")
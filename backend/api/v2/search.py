@@ -1,19 +1,20 @@
 """
 AI-Powered Search Endpoint
-Uses Gemini 1.5 Flash to answer natural language queries about crop diseases.
+Answers natural language queries about crop diseases from a local BM25
+index over the knowledge base, falling back to Gemini 1.5 Flash when
+nothing local is relevant enough.
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional, List
-import os
-import google.generativeai as genai
+from typing import Optional, List, Tuple
+import json
 
-router = APIRouter()
+from ai.dataset_config_v2 import SERVING_CONFIG
+from ai.llm_client import LLMError, LLMOverloaded, get_llm_client
+from knowledge.knowledge_engine import get_knowledge_engine
+from knowledge.search_index import get_search_index
 
-# Configure Gemini
-API_KEY = os.getenv("GEMINI_API_KEY")
-if API_KEY:
-    genai.configure(api_key=API_KEY)
+router = APIRouter()
 
 class SearchQuery(BaseModel):
     query: str
@@ -30,21 +31,70 @@ class SearchResponse(BaseModel):
     suggestions: List[str]
     provider: str
 
+def _relevance(score: float, top_score: float) -> str:
+    """High/Medium/Low relative to the best match"""
+    if score >= 0.75 * top_score:
+        return "High"
+    return "Medium" if score >= 0.4 * top_score else "Low"
+
+
+def _local_search(request: SearchQuery) -> Tuple[SearchResponse, float]:
+    """Answer from the local index; returns the response and the top BM25 score"""
+    index = get_search_index()
+    results = index.search(request.query, limit=3)
+    if not results:
+        return SearchResponse(
+            answer="I couldn't find a matching disease in our knowledge base.",
+            matches=[],
+            suggestions=["Try searching for specific symptoms", "Describe the affected plant part"],
+            provider="Local index"
+        ), 0.0
+    
+    top_key, top_score = results[0]
+    matches = [
+        DiseaseMatch(id=key, name=index.display_name(key, request.language), relevance=_relevance(score, top_score))
+        for key, score in results
+    ]
+    info = get_knowledge_engine().get_disease_info(top_key, request.language) or {}
+    name = matches[0].name
+    scientific_name = info.get("scientific_name")
+    answer = f"This sounds like {name}{f' ({scientific_name})' if scientific_name else ''}. {info.get('explanation', '')}".strip()
+    return SearchResponse(
+        answer=answer,
+        matches=matches,
+        suggestions=[f"How do I treat {name}?", f"How can I prevent {name}?"],
+        provider="Local index"
+    ), top_score
+
+
 @router.post("/search/ai", response_model=SearchResponse)
 async def ai_search(request: SearchQuery):
     """
-    AI-powered search using Gemini 1.5 Flash.
+    Disease search: local BM25 index first, Gemini 1.5 Flash fallback.
     Returns a conversational answer and structured disease matches.
-    """
-    if not API_KEY:
-        raise HTTPException(
-            status_code=503,
-            detail="AI search is currently unavailable. Please configure GEMINI_API_KEY environment variable."
-        )
     
+    Gemini is only asked when the best local match scores below
+    SEARCH_MIN_SCORE and GEMINI_API_KEY is configured; otherwise the
+    local answer (possibly empty) is returned. It is also returned when
+    Gemini fails or times out, and 503 when too many calls are queued.
+    """
+    local_response, top_score = _local_search(request)
+    if top_score >= SERVING_CONFIG["search_min_score"] or not get_llm_client().available:
+        return local_response
+    try:
+        return await _gemini_search(request)
+    except LLMOverloaded as e:
+        print(f"⚠️ Gemini overloaded: {e}")
+        raise HTTPException(status_code=503, detail="AI search busy. Please retry shortly.", headers={"Retry-After": "5"})
+    except LLMError as e:
+        print(f"⚠️ Gemini search failed, answering locally: {e}")
+        return local_response
+
+
+async def _gemini_search(request: SearchQuery) -> SearchResponse:
+    """Ask Gemini 1.5 Flash (the pre-index search path)"""
+    text = None
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
         prompt = f"""You are an agricultural disease expert helping farmers.
         
 User Query: "{request.query}"
@@ -69,18 +119,17 @@ Guidelines:
 - Language: {request.language}
 """
         
-        response = model.generate_content(prompt)
-        text = response.text.strip()
+        text = (await get_llm_client().generate(prompt)).strip()
         
         # Parse JSON response
-        import json
         # Handle markdown code blocks if present
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
+        body = text
+        if body.startswith("```"):
+            body = body.split("```")[1]
+            if body.startswith("json"):
+                body = body[4:]
         
-        data = json.loads(text)
+        data = json.loads(body)
         
         return SearchResponse(
             answer=data.get("answer", "I couldn't find specific information about that."),
@@ -92,10 +141,12 @@ Guidelines:
     except json.JSONDecodeError:
         # Fallback if Gemini doesn't return valid JSON
         return SearchResponse(
-            answer=response.text.strip() if response else "Unable to process query.",
+            answer=text or "Unable to process query.",
             matches=[],
             suggestions=["Try searching for specific symptoms", "Describe the affected plant part"],
             provider="Gemini 1.5 Flash (Raw)"
         )
+    except LLMError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI search failed: {str(e)}")
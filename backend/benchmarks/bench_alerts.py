@@ -0,0 +1,128 @@
+"""
+SANJIVANI 2.0 - Pest Alert Query Benchmark
+Per-query latency of the alert index on synthetic alert sets, against a
+linear scan over the alert list (what filtering the raw file would cost)
+
+Alerts get random crops, severities, regions, dates within a year and
+coordinates inside India's bounding box (a few percent have none).
+
+Usage:
+    python benchmarks/bench_alerts.py [--sizes 1000 10000 50000] [--iterations 2000]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from knowledge.alert_index import AlertIndex, haversine_km
+
+CROPS = ["Tomato", "Potato", "Corn", "Cotton", "Wheat", "Rice", "Soybean", "Sugarcane", "Chilli", "Onion"]
+SEVERITIES = ["Low", "Moderate", "High", "Critical"]
+REGIONS = ["Maharashtra", "Gujarat", "Karnataka", "Punjab", "Uttar Pradesh", "Bihar", "Tamil Nadu", "Telangana"]
+TODAY = date(2026, 1, 1)
+
+QUERIES = {
+    "first page": {},
+    "crop": {"crops": ["Cotton"]},
+    "crop+severity": {"crops": ["Cotton", "Corn"], "severities": ["High", "Critical"]},
+    "since 30d": {"since": TODAY - timedelta(days=30)},
+    "radius 50km": {"near": (19.99, 73.79, 50.0)},
+    "radius+crop+since": {"near": (19.99, 73.79, 200.0), "crops": ["Tomato"], "since": TODAY - timedelta(days=90)},
+}
+
+
+def synthetic_alerts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    alerts = []
+    for i in range(count):
+        alert = {
+            "id": f"alert_{i:06d}",
+            "pest": "Fall Armyworm",
+            "crop": rng.choice(CROPS),
+            "severity": rng.choice(SEVERITIES),
+            "region": rng.choice(REGIONS),
+            "date": (TODAY - timedelta(days=rng.randrange(365))).isoformat(),
+            "description": "Synthetic alert"
+        }
+        if rng.random() < 0.95:
+            alert["lat"], alert["lon"] = round(rng.uniform(8.0, 35.0), 4), round(rng.uniform(68.0, 97.0), 4)
+        alerts.append(alert)
+    return alerts
+
+
+def linear_scan(alerts, crops=None, severities=None, since=None, near=None, limit=50):
+    """Filter, sort and page the raw list"""
+    crops = {c.lower() for c in crops} if crops else None
+    severities = {s.lower() for s in severities} if severities else None
+    since = since.isoformat() if since else None
+    matching = []
+    for alert in alerts:
+        if crops and alert["crop"].lower() not in crops:
+            continue
+        if severities and alert["severity"].lower() not in severities:
+            continue
+        if since and alert["date"] < since:
+            continue
+        if near:
+            if "lat" not in alert:
+                continue
+            km = haversine_km(near[0], near[1], np.array([alert["lat"]]), np.array([alert["lon"]]))[0]
+            if km > near[2]:
+                continue
+        matching.append(alert)
+    matching.sort(key=lambda a: (a["date"], a["id"]), reverse=True)
+    return matching[:limit]
+
+
+def _time(fn, iterations: int) -> float:
+    """Mean microseconds per call"""
+    for _ in range(min(100, iterations)):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        alerts = synthetic_alerts(size)
+        start = time.perf_counter()
+        index = AlertIndex(alerts, "bench")
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n{'='*60}")
+        print(f"{size} alerts (index built in {build_ms:.1f} ms, {len(index.cells)} grid cells)")
+        print(f"{'='*60}")
+        print(f"{'query':<20} {'matches':>8} {'index us':>10} {'scan us':>10} {'speedup':>8}")
+
+        scan_iterations = max(1, args.iterations // 100)
+        for label, kwargs in QUERIES.items():
+            result = index.query(**kwargs)
+            index_us = _time(lambda: index.query(**kwargs), args.iterations)
+            scan_us = _time(lambda: linear_scan(alerts, **kwargs), scan_iterations)
+            print(f"{label:<20} {result['total']:8d} {index_us:10.1f} {scan_us:10.1f} {scan_us / index_us:7.0f}x")
+
+        # Deep pagination: walk 20 pages of a common filter
+        cursor_page = index.query(crops=["Cotton"], limit=50)
+        for _ in range(19):
+            cursor_page = index.query(crops=["Cotton"], cursor=cursor_page["next_cursor"], limit=50)
+        cursor = cursor_page["next_cursor"]
+        if cursor:
+            page_us = _time(lambda: index.query(crops=["Cotton"], cursor=cursor, limit=50), args.iterations)
+            print(f"{'crop, page 21':<20} {'':>8} {page_us:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
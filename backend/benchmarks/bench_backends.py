@@ -0,0 +1,69 @@
+"""
+SANJIVANI 2.0 - Serving Backend Benchmark
+Compares per-call forward latency of the Keras and TFLite backends
+
+Usage:
+    python benchmarks/bench_backends.py [path/to/plant_disease_v2.h5] [--batch 1] [--runs 200]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from ai.backends import KerasBackend, TFLiteBackend
+from ai.dataset_config_v2 import MODEL_CONFIG
+
+
+def time_backend(backend, batch: np.ndarray, runs: int) -> dict:
+    """Warm up, then time `runs` forward passes"""
+    for _ in range(10):
+        backend.predict(batch)
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict(batch)
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "p50_ms": float(np.percentile(times, 50)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "avg_ms": float(np.mean(times)),
+        "per_image_ms": float(np.mean(times)) / len(batch)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("model_path", nargs="?", default="models/plant_disease_v2.h5")
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    h5_path = Path(args.model_path)
+    batch = np.random.random((args.batch, *MODEL_CONFIG["input_size"])).astype(np.float32)
+
+    backends = []
+    if h5_path.exists():
+        backends.append(KerasBackend(str(h5_path)))
+    if h5_path.with_suffix(".tflite").exists():
+        backends.append(TFLiteBackend(str(h5_path.with_suffix(".tflite")), pool_size=1))
+    if not backends:
+        print(f"ERROR: No model files found next to {h5_path}")
+        return
+
+    print(f"\n{'='*60}")
+    print(f"Backend latency (batch={args.batch}, runs={args.runs})")
+    print(f"{'='*60}")
+    for backend in backends:
+        backend.load()
+        stats = time_backend(backend, batch, args.runs)
+        print(f"{backend.name:>8}: p50 {stats['p50_ms']:7.2f} ms | p99 {stats['p99_ms']:7.2f} ms | "
+              f"avg {stats['avg_ms']:7.2f} ms | {stats['per_image_ms']:6.2f} ms/image")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+SANJIVANI 2.0 - Preprocessing Benchmark
+Compares decode + resize time and peak memory per megapixel for the
+fast (JPEG draft + bilinear) and original (full decode + LANCZOS) paths
+
+Peak memory is measured as the growth in peak RSS (VmHWM, Linux only)
+of a fresh subprocess, since Pillow's decode buffers are invisible to
+tracemalloc.
+
+Usage:
+    python benchmarks/bench_preprocess.py [--runs 20]
+"""
+import argparse
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(str(Path(__file__).parent.parent))
+from ai.dataset_config_v2 import SERVING_CONFIG
+
+# Typical phone camera resolutions
+SIZES = {
+    "2 MP": (1600, 1200),
+    "5 MP": (2592, 1944),
+    "12 MP": (4000, 3000),
+}
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    """Synthetic leaf-like photo: smooth gradients plus sensor noise"""
+    rng = np.random.default_rng(42)
+    y, x = np.mgrid[0:height, 0:width]
+    img = np.stack([
+        (x / width) * 120 + 40,
+        (y / height) * 160 + 60,
+        np.full((height, width), 50.0)
+    ], axis=-1)
+    img += rng.normal(0, 12, img.shape)
+    buf = io.BytesIO()
+    Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _engine():
+    """An InferenceEngine with no model, which is all preprocessing needs"""
+    from ai.inference_engine import InferenceEngine
+    from ai.phash_index import PHashIndex
+    engine = InferenceEngine.__new__(InferenceEngine)
+    engine.phash_index = PHashIndex(max_entries=0)
+    return engine
+
+
+def time_path(image_bytes: bytes, fast: bool, runs: int) -> float:
+    """Median preprocess time in ms"""
+    SERVING_CONFIG["fast_decode"] = fast
+    engine = _engine()
+    out = np.empty((1, 224, 224, 3), dtype=np.float32)
+    engine.preprocess_image(image_bytes, out=out)
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        engine.preprocess_image(image_bytes, out=out)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def measure_peak_memory(image_path: str, fast: bool) -> float:
+    """Run one preprocess in a fresh interpreter and return peak RSS growth in MB"""
+    code = f"""
+import sys, json
+sys.path.insert(0, {str(Path(__file__).parent)!r})
+sys.path.insert(0, {str(Path(__file__).parent.parent)!r})
+from bench_preprocess import _engine
+from ai.dataset_config_v2 import SERVING_CONFIG
+SERVING_CONFIG["fast_decode"] = {fast!r}
+data = open({image_path!r}, "rb").read()
+engine = _engine()
+def status_kb(field):
+    for line in open("/proc/self/status"):
+        if line.startswith(field):
+            return int(line.split()[1])
+# Reset the high-water mark so imports don't mask the decode peak
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+before = status_kb("VmRSS:")
+engine.preprocess_image(data)
+print(json.dumps({{"kb": status_kb("VmHWM:") - before}}))
+"""
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])["kb"] / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"\n{'='*78}")
+    print("Preprocess benchmark (decode + resize + normalize to 224x224 float32)")
+    print(f"{'='*78}")
+    print(f"{'size':>6} | {'path':>8} | {'median ms':>9} | {'ms/MP':>6} | {'peak MB':>7} | {'MB/MP':>6}")
+    print("-" * 78)
+
+    for label, (width, height) in SIZES.items():
+        megapixels = width * height / 1e6
+        data = make_jpeg(width, height)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as f:
+            f.write(data)
+            f.flush()
+            for name, fast in (("lanczos", False), ("fast", True)):
+                ms = time_path(data, fast, args.runs)
+                peak_mb = measure_peak_memory(f.name, fast)
+                print(f"{label:>6} | {name:>8} | {ms:9.2f} | {ms / megapixels:6.2f} | "
+                      f"{peak_mb:7.1f} | {peak_mb / megapixels:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+SANJIVANI 2.0 - Response Assembly Benchmark
+Per-request cost of mapping a prediction to its knowledge-base response
+and serializing it, before and after precompiled response fragments
+
+"before" replays the previous path: copy the disease entry, build the
+response dict, apply the confidence safeguards, validate it into a
+PredictionResponse and serialize it the way FastAPI does for a
+response_model (dump, re-validate, jsonable_encoder, JSONResponse).
+"after" is the current path: look up the fragment and splice the
+per-request fields into its pre-encoded JSON.
+
+Usage:
+    python benchmarks/bench_response.py [--iterations 20000] [--language en]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ai.dataset_config_v2 import CONFIDENCE_THRESHOLD
+from api.v2.predict import _assemble_response, _json_response
+from knowledge.knowledge_engine import LOW_CONFIDENCE_ACTIONS, LOW_CONFIDENCE_WARNING, get_knowledge_engine
+from schemas.prediction import PredictionResponse
+
+
+def _prediction(confidence: float) -> dict:
+    return {
+        "crop": "Tomato",
+        "disease": "Early Blight",
+        "disease_key": "Early_Blight",
+        "severity": "Moderate",
+        "confidence": confidence,
+        "alternatives": [
+            {"disease": "Late_Blight", "confidence": 0.04},
+            {"disease": "Leaf_Mold", "confidence": 0.02}
+        ],
+        "metadata": {
+            "model_version": "2.0.0",
+            "inference_time_ms": 41.2,
+            "model_architecture": "MobileNetV2",
+            "backend": "tflite",
+            "forward_ms": 30.1,
+            "near_duplicate": False,
+            "decode_ms": 6.3,
+            "resize_ms": 2.1,
+            "peak_memory_mb": 3.4
+        }
+    }
+
+
+def before(prediction: dict, language: str) -> bytes:
+    """The per-request path prior to precompiled fragments"""
+    knowledge = get_knowledge_engine()
+    disease_key = prediction["disease_key"]
+    info = knowledge.get_disease_info(disease_key, language)
+    response = {
+        "crop": prediction["crop"],
+        "disease": disease_key.replace("_", " ").title(),
+        "disease_key": disease_key,
+        "confidence": prediction["confidence"],
+        "severity": info["severity"],
+        "explanation": info["explanation"],
+        "recommended_actions": info["recommended_actions"],
+        "symptoms": info.get("symptoms", []),
+        "economic_impact": info.get("economic_impact", ""),
+        "scientific_name": info.get("scientific_name", "")
+    }
+    if language != "en" and "name_localized" in info:
+        response["disease_localized"] = info["name_localized"]
+    if response["confidence"] < CONFIDENCE_THRESHOLD:
+        response["explanation"] = f"{LOW_CONFIDENCE_WARNING}\n\n{response['explanation']}"
+        response["recommended_actions"] = LOW_CONFIDENCE_ACTIONS
+        response["severity"] = "Low"
+    response["metadata"] = prediction["metadata"]
+    response["alternatives"] = prediction["alternatives"]
+
+    model = PredictionResponse(**response)
+    # FastAPI: dump the returned model, validate against response_model, encode, render
+    content = PredictionResponse.model_validate(model.model_dump(mode="json")).model_dump(mode="json")
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def after(prediction: dict, language: str) -> bytes:
+    """The current per-request path"""
+    fragment, dynamic = _assemble_response(prediction, language)
+    return _json_response(fragment, dynamic, cached=False).body
+
+
+def _time(fn, prediction: dict, language: str, iterations: int) -> float:
+    """Mean microseconds per call"""
+    for _ in range(min(1000, iterations)):
+        fn(prediction, language)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(prediction, language)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"Response assembly: {args.iterations} iterations, language={args.language}")
+    print(f"{'='*60}")
+    print(f"{'case':<16} {'before us':>10} {'after us':>10} {'speedup':>8}")
+
+    for label, confidence in (("confident", 0.94), ("low confidence", 0.45)):
+        prediction = _prediction(confidence)
+        before_us = _time(before, prediction, args.language, args.iterations)
+        after_us = _time(after, prediction, args.language, args.iterations)
+        print(f"{label:<16} {before_us:10.1f} {after_us:10.1f} {before_us / after_us:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+SANJIVANI 2.0 - Multi-worker Serving Benchmark
+Sweeps pre-fork workers x threads per worker (serve.py) and reports
+throughput and tail latency of /api/v2/predict under concurrent load
+
+Response caching and the near-duplicate index are disabled in the
+server under test, so every request runs a forward pass.
+
+Usage:
+    python benchmarks/bench_serving.py [--workers 1 2 4] [--threads 1 2] [--requests 400] [--concurrency 16] [--pin]
+"""
+import argparse
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+from PIL import Image
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def make_images(count: int):
+    """Distinct random JPEGs so no two requests hash alike"""
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        buf = io.BytesIO()
+        pixels = rng.integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(buf, "JPEG", quality=85)
+        images.append(buf.getvalue())
+    return images
+
+
+def start_server(workers: int, threads: int, port: int, pin: bool) -> subprocess.Popen:
+    env = os.environ.copy()
+    env.update({"PREDICTION_CACHE_SIZE": "0", "PHASH_INDEX_SIZE": "0"})
+    command = [sys.executable, "serve.py", "--workers", str(workers), "--threads", str(threads),
+               "--host", "127.0.0.1", "--port", str(port)]
+    if pin:
+        command.append("--pin")
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(base_url: str, workers: int, timeout: float):
+    """
+    Poll /api/v2/ready until it answers 200 several times in a row
+
+    Requests land on whichever worker accepts first, so a run of
+    successes is needed before we can assume every worker has loaded.
+    """
+    deadline = time.perf_counter() + timeout
+    streak = 0
+    with httpx.Client(base_url=base_url, timeout=5) as client:
+        while time.perf_counter() < deadline:
+            try:
+                streak = streak + 1 if client.get("/api/v2/ready").status_code == 200 else 0
+            except httpx.TransportError:
+                streak = 0
+            if streak >= 4 * workers:
+                return
+            time.sleep(0.05)
+    raise TimeoutError("Server did not become ready in time")
+
+
+async def drive(base_url: str, images, total: int, concurrency: int):
+    """Send `total` predictions from `concurrency` clients; latencies (ms) and error count"""
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            image = images[index % len(images)]
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/api/v2/predict", files={"file": ("leaf.jpg", image, "image/jpeg")}
+                )
+                ok = response.status_code == 200
+            except httpx.TransportError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def run_config(args, workers: int, threads: int, images) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(workers, threads, args.port, args.pin)
+    try:
+        wait_ready(base_url, workers, args.timeout)
+        # Warm each worker's code paths before timing
+        asyncio.run(drive(base_url, images, 4 * workers, args.concurrency))
+
+        start = time.perf_counter()
+        latencies, errors = asyncio.run(drive(base_url, images, args.requests, args.concurrency))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    return {
+        "workers": workers,
+        "threads": threads,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)) if latencies else float("nan"),
+        "p99_ms": float(np.percentile(latencies, 99)) if latencies else float("nan"),
+        "errors": errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--requests", type=int, default=400, help="Timed requests per configuration")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--pin", action="store_true", help="Pin workers to cores")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=180.0)
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"Serving sweep: {args.requests} requests, concurrency {args.concurrency}, "
+          f"{os.cpu_count()} CPUs{' (pinned)' if args.pin else ''}")
+    print(f"{'='*60}")
+    print(f"{'workers':>8} {'threads':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+
+    images = make_images(32)
+    for workers in args.workers:
+        for threads in args.threads:
+            result = run_config(args, workers, threads, images)
+            print(f"{result['workers']:>8} {result['threads']:>8} {result['rps']:>9.1f} "
+                  f"{result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
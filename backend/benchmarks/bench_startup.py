@@ -0,0 +1,102 @@
+"""
+SANJIVANI 2.0 - Startup Benchmark
+Measures how long `import main` takes and, for a real uvicorn process,
+the time until the port answers (/api/v2/live), until the model is
+ready (/api/v2/ready) and until the first prediction succeeds
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--port 8765]
+"""
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def measure_import(runs: int) -> float:
+    """Median wall time of `import main` in a fresh interpreter, in ms"""
+    code = "import time; t = time.perf_counter(); import main; print((time.perf_counter() - t) * 1000)"
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def _jpeg() -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (640, 480), color=(40, 150, 60)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def _wait_for(client: httpx.Client, start: float, timeout: float, request) -> float:
+    """Poll until request() returns 200; seconds since start"""
+    while time.perf_counter() - start < timeout:
+        try:
+            if request(client).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError("Server did not become ready in time")
+
+
+def measure_server(port: int, timeout: float) -> dict:
+    """Start uvicorn and time the liveness, readiness and first-prediction milestones"""
+    base_url = f"http://127.0.0.1:{port}"
+    image = _jpeg()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=os.environ.copy()
+    )
+    try:
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            live_s = _wait_for(client, start, timeout, lambda c: c.get("/api/v2/live"))
+            meta_s = _wait_for(client, start, timeout, lambda c: c.get("/api/v2/meta/crops"))
+            ready_s = _wait_for(client, start, timeout, lambda c: c.get("/api/v2/ready"))
+            predict_s = _wait_for(
+                client, start, timeout,
+                lambda c: c.post("/api/v2/predict", files={"file": ("leaf.jpg", image, "image/jpeg")})
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    return {"live": live_s, "meta": meta_s, "ready": ready_s, "first_prediction": predict_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters for the import timing")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print("Startup benchmark")
+    print(f"{'='*60}")
+
+    import_ms = measure_import(args.runs)
+    print(f"import main (median of {args.runs}): {import_ms:8.0f} ms")
+
+    milestones = measure_server(args.port, args.timeout)
+    print(f"port open (/api/v2/live):         {milestones['live'] * 1000:8.0f} ms")
+    print(f"metadata served (/meta/crops):    {milestones['meta'] * 1000:8.0f} ms")
+    print(f"model ready (/api/v2/ready):      {milestones['ready'] * 1000:8.0f} ms")
+    print(f"first prediction (/predict):      {milestones['first_prediction'] * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
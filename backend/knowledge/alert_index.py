@@ -0,0 +1,216 @@
+"""
+Pest Alert Index for SANJIVANI 2.0
+In-memory query index over pest_alerts.json: filters by crop, severity,
+region, date and distance, with stable cursor pagination
+
+Alerts are kept newest first, so the date cutoff and the cursor are a
+binary search each. Crop, severity and region are stored as one integer
+code per alert; a filter is a lookup of those codes in a small table of
+allowed values, giving a boolean mask over the alerts in date range.
+Alerts with coordinates are also bucketed into a lat/lon grid; a radius
+query only looks at the cells its bounding box covers and then checks
+the exact great-circle distance.
+"""
+import base64
+import bisect
+import math
+import threading
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .loader import get_knowledge_loader
+
+FILTER_FIELDS = ("crop", "severity", "region")
+GRID_DEG = 0.5  # Grid cell size in degrees (~55 km north-south)
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+
+
+def encode_cursor(alert: Dict) -> str:
+    """Opaque cursor for the position right after `alert`"""
+    return base64.urlsafe_b64encode(f"{alert['date']}|{alert['id']}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Sort key encoded in a cursor; raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        day, alert_id = raw.split("|", 1)
+        return (-date.fromisoformat(day).toordinal(), alert_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _sort_key(alert: Dict) -> Tuple[int, str]:
+    """Newest first, then by id so equal dates keep a stable order"""
+    return (-date.fromisoformat(alert["date"]).toordinal(), alert["id"])
+
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    return (math.floor(lat / GRID_DEG), math.floor(lon / GRID_DEG))
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many, in km"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class AlertIndex:
+    """
+    Query index over one version of the pest alerts
+
+    Immutable once built; a reloaded alerts file gets a new index.
+    """
+
+    def __init__(self, alerts: List[Dict], version: str):
+        self.version = version
+        self.alerts = sorted(alerts, key=_sort_key)
+        self.keys = [_sort_key(alert) for alert in self.alerts]
+
+        # Categorical fields: value -> code, plus the code of every alert
+        self.values: Dict[str, Dict[str, int]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for field in FILTER_FIELDS:
+            values = self.values[field] = {}
+            self.codes[field] = np.array(
+                [values.setdefault(alert[field].lower(), len(values)) for alert in self.alerts], dtype=np.int32
+            )
+
+        cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.lats = np.full(len(self.alerts), np.nan)
+        self.lons = np.full(len(self.alerts), np.nan)
+        for position, alert in enumerate(self.alerts):
+            if "lat" in alert:
+                self.lats[position], self.lons[position] = alert["lat"], alert["lon"]
+                cells[_cell(alert["lat"], alert["lon"])].append(position)
+        # Positions are appended in order, so every cell is already sorted
+        self.cells = {cell: np.array(positions, dtype=np.int64) for cell, positions in cells.items()}
+        self.located = np.flatnonzero(~np.isnan(self.lats))
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def _mask(self, field: str, values: Iterable[str], end: int) -> np.ndarray:
+        """Which of the first `end` alerts have field equal to any of values (case-insensitive)"""
+        allowed = np.zeros(len(self.values[field]), dtype=bool)
+        for value in values:
+            code = self.values[field].get(value.strip().lower())
+            if code is not None:
+                allowed[code] = True
+        return allowed[self.codes[field][:end]]
+
+    def _near(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Sorted positions within radius_km of (lat, lon)"""
+        dlat = radius_km / KM_PER_DEG_LAT
+        # Longitude degrees shrink towards the poles; widen the box accordingly
+        dlon = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6))
+        (row_min, col_min), (row_max, col_max) = _cell(lat - dlat, lon - dlon), _cell(lat + dlat, lon + dlon)
+
+        if dlon >= 180 or (row_max - row_min + 1) * (col_max - col_min + 1) > len(self.cells):
+            candidates = self.located  # Box covers more cells than are occupied: scan instead
+        else:
+            # Wrap columns across the antimeridian
+            columns_per_turn = round(360 / GRID_DEG)
+            offset = -round(180 / GRID_DEG)
+            found = [
+                self.cells[(row, (col - offset) % columns_per_turn + offset)]
+                for row in range(row_min, row_max + 1)
+                for col in range(col_min, col_max + 1)
+                if (row, (col - offset) % columns_per_turn + offset) in self.cells
+            ]
+            if not found:
+                return np.empty(0, dtype=np.int64)
+            candidates = np.sort(np.concatenate(found))
+
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        return candidates[distances <= radius_km]
+
+    def query(
+        self,
+        crops: Optional[List[str]] = None,
+        severities: Optional[List[str]] = None,
+        regions: Optional[List[str]] = None,
+        since: Optional[date] = None,
+        near: Optional[Tuple[float, float, float]] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict:
+        """
+        Filtered page of alerts, newest first
+
+        Args:
+            crops, severities, regions: Match any of the given values (case-insensitive)
+            since: Only alerts dated on or after this day
+            near: (lat, lon, radius_km); alerts without coordinates never match
+            cursor: next_cursor from the previous page
+            limit: Page size
+
+        Returns:
+            {"alerts", "total", "next_cursor"}; next_cursor is None on the last page
+        """
+        start = bisect.bisect_right(self.keys, decode_cursor(cursor)) if cursor else 0
+        end = bisect.bisect_left(self.keys, (-since.toordinal() + 1, "")) if since else len(self.alerts)
+
+        mask = None
+        for field, values in (("crop", crops), ("severity", severities), ("region", regions)):
+            if values:
+                field_mask = self._mask(field, values, end)
+                mask = field_mask if mask is None else np.logical_and(mask, field_mask, out=mask)
+
+        candidates = None  # Sorted matching positions, when anything filters
+        if near is not None:
+            candidates = self._near(*near)
+            if mask is not None:
+                candidates = candidates[candidates < end]
+                candidates = candidates[mask[candidates]]
+        elif mask is not None:
+            candidates = np.flatnonzero(mask)
+
+        # total counts every match; the page starts after the cursor
+        if candidates is None:
+            total = end
+            page = range(start, min(end, start + limit))
+            more = start + limit < end
+        else:
+            lo, hi = np.searchsorted(candidates, start), np.searchsorted(candidates, end)
+            total = int(hi)
+            page = candidates[lo:min(hi, lo + limit)].tolist()
+            more = lo + limit < hi
+
+        alerts = [self.alerts[position] for position in page]
+        if near is not None and alerts:
+            positions = np.array(page, dtype=np.int64)
+            distances = haversine_km(near[0], near[1], self.lats[positions], self.lons[positions])
+            alerts = [{**alert, "distance_km": round(float(km), 1)} for alert, km in zip(alerts, distances)]
+
+        return {
+            "alerts": alerts,
+            "total": total,
+            "next_cursor": encode_cursor(alerts[-1]) if more else None
+        }
+
+
+# Global instance, rebuilt when pest_alerts.json is reloaded
+_alert_index: Optional[AlertIndex] = None
+_alert_index_lock = threading.Lock()
+
+
+def get_alert_index() -> Optional[AlertIndex]:
+    """Get the index for the current alerts file (None if it never loaded)"""
+    global _alert_index
+    snapshot = get_knowledge_loader().get("pest_alerts")
+    if snapshot is None:
+        return None
+    index = _alert_index
+    if index is None or index.version != snapshot.revision:
+        with _alert_index_lock:
+            if _alert_index is None or _alert_index.version != snapshot.revision:
+                _alert_index = AlertIndex(snapshot.data, snapshot.revision)
+            index = _alert_index
+    return index
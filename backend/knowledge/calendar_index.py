@@ -0,0 +1,169 @@
+"""
+Crop Calendar Index for SANJIVANI 2.0
+crop_calendar.json compiled into month and season lookups, so "what do I
+sow, tend or harvest in month M" is answered server-side with only the
+matching crops
+
+For every sowing window, each sowing month is laid out day by day
+through the crop's stages (a month counted as 365.25 / 12 days, sowing
+at the start of the month). A month takes the stage under way at its
+middle; months whose middle is in the last stage are the harvest phase,
+and other months in the field outside the sowing months are the growing
+phase. A month can be both a sowing and a harvest month when a window
+spans several months (sow late, harvest the early sowing).
+"""
+import calendar
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from .loader import get_knowledge_loader
+
+PHASES = ("sowing", "growing", "harvest")
+MONTHS = list(calendar.month_name)[1:]
+DAYS_PER_MONTH = 365.25 / 12
+
+
+def parse_month(value: str) -> int:
+    """Month index 0-11 from a number (1-12), full name or abbreviation; raises ValueError"""
+    value = value.strip().lower()
+    if value.isdigit() and 1 <= int(value) <= 12:
+        return int(value) - 1
+    for index in range(12):
+        if value in (calendar.month_name[index + 1].lower(), calendar.month_abbr[index + 1].lower()):
+            return index
+    raise ValueError(f"Unknown month: {value!r}")
+
+
+def _months_at_middle(sow_month: int, start_day: float, end_day: float) -> List[int]:
+    """
+    Months whose middle falls in days [start_day, end_day) after sowing
+
+    A span shorter than a month may contain no month's middle; it then
+    counts for the month containing its own middle.
+    """
+    first = int(start_day // DAYS_PER_MONTH)
+    months = [
+        (sow_month + offset) % 12
+        for offset in range(first, int(end_day // DAYS_PER_MONTH) + 1)
+        if start_day <= (offset + 0.5) * DAYS_PER_MONTH < end_day
+    ]
+    return months or [(sow_month + int((start_day + end_day) / 2 // DAYS_PER_MONTH)) % 12]
+
+
+class CalendarIndex:
+    """
+    Month and season lookups over one version of the crop calendar
+
+    Immutable once built; a reloaded calendar gets a new index.
+    """
+
+    def __init__(self, data: Dict, version: str):
+        self.version = version
+        self.crops = {crop.lower(): crop for crop in data["crops"]}
+        self.seasons: Dict[str, str] = {}
+        self.by_season: Dict[str, List[tuple]] = defaultdict(list)  # season -> [(crop, sowing months)]
+        # month -> phase -> entries, in calendar file order
+        self.by_month: List[Dict[str, List[Dict]]] = [{phase: [] for phase in PHASES} for _ in range(12)]
+
+        for crop, info in data["crops"].items():
+            stages = info.get("stages", [])
+            for window in info.get("sowing_windows", []):
+                season = window["season"]
+                self.seasons.setdefault(season.lower(), season)
+                self.by_season[season.lower()].append((crop, window["months"]))
+
+                sowing = [parse_month(month) for month in window["months"]]
+                stage_positions: Dict[int, set] = defaultdict(set)
+                harvest, alive = set(), set()
+                for sow_month in sowing:
+                    day = 0
+                    for position, stage in enumerate(stages):
+                        for month in _months_at_middle(sow_month, day, day + stage["days"]):
+                            stage_positions[month].add(position)
+                        day += stage["days"]
+                    if stages:
+                        alive.update(_months_at_middle(sow_month, 0, day))
+                        harvest.update(_months_at_middle(sow_month, day - stages[-1]["days"], day))
+                # Stages under way in each month (for any sowing month), in crop order
+                stage_months = {
+                    month: [stages[position]["name"] for position in sorted(positions)]
+                    for month, positions in stage_positions.items()
+                }
+
+                phases = {
+                    "sowing": set(sowing),
+                    "harvest": harvest,
+                    "growing": alive - set(sowing) - harvest
+                }
+                harvest_months = [MONTHS[m] for m in sorted(harvest, key=lambda m: (m - sowing[0]) % 12)]
+                for phase, months in phases.items():
+                    for month in sorted(months):
+                        self.by_month[month][phase].append({
+                            "crop": crop,
+                            "season": season,
+                            "stages": stage_months.get(month, []),
+                            "sowing_months": window["months"],
+                            "harvest_months": harvest_months,
+                            "duration_days": info.get("duration_days")
+                        })
+
+    def resolve_crop(self, crop: str) -> Optional[str]:
+        """Calendar spelling of a crop name, or None if it has no calendar"""
+        return self.crops.get(crop.strip().lower())
+
+    def resolve_season(self, season: str) -> Optional[str]:
+        return self.seasons.get(season.strip().lower())
+
+    def season_crops(self, season: str) -> List[Dict]:
+        """Crops sown in a season (canonical name), with their sowing months"""
+        return [
+            {"crop": crop, "sowing_months": months}
+            for crop, months in self.by_season.get(season.lower(), [])
+        ]
+
+    def query(
+        self,
+        month: int,
+        crop: Optional[str] = None,
+        season: Optional[str] = None,
+        phase: Optional[str] = None
+    ) -> Dict:
+        """
+        Calendar slice for one month
+
+        Args:
+            month: Month index 0-11
+            crop, season: Canonical names (see resolve_crop / resolve_season)
+            phase: One of PHASES; all phases if None
+
+        Returns:
+            {"month", <phase>: [entries], ...}
+        """
+        result = {"month": MONTHS[month]}
+        for name in ((phase,) if phase else PHASES):
+            result[name] = [
+                entry for entry in self.by_month[month][name]
+                if (crop is None or entry["crop"] == crop) and (season is None or entry["season"] == season)
+            ]
+        return result
+
+
+# Global instance, rebuilt when crop_calendar.json is reloaded
+_calendar_index: Optional[CalendarIndex] = None
+_calendar_index_lock = threading.Lock()
+
+
+def get_calendar_index() -> Optional[CalendarIndex]:
+    """Get the index for the current calendar file (None if it never loaded)"""
+    global _calendar_index
+    snapshot = get_knowledge_loader().get("crop_calendar")
+    if snapshot is None:
+        return None
+    index = _calendar_index
+    if index is None or index.version != snapshot.revision:
+        with _calendar_index_lock:
+            if _calendar_index is None or _calendar_index.version != snapshot.revision:
+                _calendar_index = CalendarIndex(snapshot.data, snapshot.revision)
+            index = _calendar_index
+    return index
@@ -4,42 +4,127 @@ Handles disease information queries and treatment recommendations
 Completely deterministic - no AI/LLM logic here
 """
 import json
+import threading
 from pathlib import Path
-from typing import Dict, Optional, List
+from types import MappingProxyType
+from typing import Dict, Optional, List, Tuple
+
+from .loader import content_digest, get_knowledge_loader
+
+# Response fields that depend only on (disease, language, confidence band)
+STATIC_FIELDS = (
+    "disease", "disease_key", "severity", "explanation", "recommended_actions",
+    "symptoms", "economic_impact", "scientific_name"
+)
+
+# Low-confidence safeguard: never pass on specific treatments for an uncertain result
+LOW_CONFIDENCE_WARNING = (
+    "⚠️ Low Confidence Risk: The system is uncertain about this result. "
+    "Please consult an expert before applying treatments."
+)
+LOW_CONFIDENCE_ACTIONS = {
+    "immediate": ["Consult a local agricultural expert for verification."],
+    "short_term": ["Monitor the crop for progression of symptoms."],
+    "preventive": ["Maintain general crop hygiene."]
+}
+
+
+def _dumps(obj) -> str:
+    """JSON exactly as FastAPI's JSONResponse writes it"""
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+class ResponseFragment:
+    """
+    Static part of a prediction response for one (disease, language, band)
+    
+    Validated against PredictionResponse once at load time and kept both as
+    a read-only mapping and as pre-serialized JSON, so a request only has to
+    splice in its crop, confidence, alternatives and metadata.
+    """
+    __slots__ = ("fields", "localized_name", "_json")
+    
+    def __init__(self, fields: Dict, localized_name: Optional[str] = None):
+        self.fields = MappingProxyType(fields)
+        self.localized_name = localized_name
+        self._json = _dumps(fields)[1:-1].encode("utf-8")
+    
+    def to_dict(self, dynamic: Dict) -> Dict:
+        """Complete response as a JSON-ready dict"""
+        return {**self.fields, **dynamic}
+    
+    def render(self, dynamic: Dict) -> bytes:
+        """Complete response as JSON bytes; `dynamic` must not be empty"""
+        return b"{" + self._json + b"," + _dumps(dynamic)[1:].encode("utf-8")
+
+
+class _KnowledgeState:
+    """Everything derived from one knowledge base version, swapped as a unit"""
+    __slots__ = ("knowledge_db", "version", "revision", "fragments")
+    
+    def __init__(self, knowledge_db: Dict, version: str, revision: str, fragments: Dict):
+        self.knowledge_db = knowledge_db
+        self.version = version
+        self.revision = revision
+        self.fragments = fragments
 
 
 class KnowledgeEngine:
     """
     Query and retrieve disease information from knowledge database
     Maps AI predictions to actionable treatment recommendations
+    
+    The database, its version and the compiled fragments live in one state
+    object replaced by apply(), so a reload never exposes a mix of versions.
     """
     
-    def __init__(self, knowledge_path: Optional[str] = None):
+    def __init__(self, knowledge_path: Optional[str] = None, load: bool = True):
         # Robust path handling
         default_path = "knowledge/disease_knowledge.json"
         if not Path(default_path).exists():
             default_path = "backend/knowledge/disease_knowledge.json"
             
         self.knowledge_path = knowledge_path or default_path
-        self.knowledge_db = {}
-        self.version = "unknown"
-        self.load_knowledge_base()
+        self._state = _KnowledgeState({}, "unknown", "unknown", {})
+        if load:
+            self.load_knowledge_base()
+    
+    @property
+    def knowledge_db(self) -> Dict:
+        return self._state.knowledge_db
+    
+    @property
+    def version(self) -> str:
+        return self._state.version
     
     def load_knowledge_base(self):
         """Load disease knowledge from JSON file"""
         try:
             kb_file = Path(self.knowledge_path)
             if kb_file.exists():
-                with open(kb_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.knowledge_db = data.get("diseases", {})
-                    self.version = data.get("version", "unknown")
-                    print(f"✅ Knowledge base v{self.version} loaded successfully")
+                raw = kb_file.read_bytes()
+                self.apply(json.loads(raw), content_digest(raw))
             else:
                 print(f"⚠️ Knowledge base not found at {self.knowledge_path}")
         except Exception as e:
             print(f"❌ Error loading knowledge base: {e}")
     
+    def apply(self, data: Dict, digest: str = ""):
+        """
+        Compile a parsed disease_knowledge.json and swap it in
+        
+        Args:
+            data: Parsed file contents
+            digest: Content digest, so edits without a version bump still
+                invalidate caches keyed on get_knowledge_revision()
+        """
+        knowledge_db = data.get("diseases", {})
+        version = data.get("version", "unknown")
+        fragments = self._compile_fragments(knowledge_db)
+        revision = f"{version}@{digest}" if digest else version
+        self._state = _KnowledgeState(knowledge_db, version, revision, fragments)
+        print(f"✅ Knowledge base v{version} loaded successfully ({len(fragments)} response fragments)")
+    
     def get_disease_info(self, disease_key: str, language: str = "en") -> Optional[Dict]:
         """
         Get complete disease information
@@ -51,8 +136,10 @@ class KnowledgeEngine:
         Returns:
             Complete disease information dict or None if not found
         """
-        disease_info = self.knowledge_db.get(disease_key)
-        
+        return self._localize(self.knowledge_db.get(disease_key), language)
+    
+    @staticmethod
+    def _localize(disease_info: Optional[Dict], language: str) -> Optional[Dict]:
         if not disease_info:
             return None
         
@@ -67,6 +154,68 @@ class KnowledgeEngine:
         
         return info
     
+    def _compile_fragments(self, knowledge_db: Dict) -> Dict[Tuple[str, str, bool], ResponseFragment]:
+        """
+        Build every (disease_key, language, uncertain) response fragment
+        
+        Languages are English plus those with a localized name; others fall
+        back to English at lookup. Entries the response schema rejects are
+        skipped with a warning instead of failing every request for them.
+        """
+        from schemas.prediction import PredictionResponse
+        
+        placeholder = {
+            "crop": "", "confidence": 0.0,
+            "metadata": {"model_version": "", "inference_time_ms": 0.0, "model_architecture": ""}
+        }
+        fragments = {}
+        for disease_key, disease_info in knowledge_db.items():
+            languages = {"en"} | {
+                lang for lang, data in disease_info.get("multilingual", {}).items() if "name" in data
+            }
+            for language in languages:
+                info = self._localize(disease_info, language)
+                for uncertain in (False, True):
+                    response = {
+                        "disease": disease_key.replace("_", " ").title(),
+                        "disease_key": disease_key,
+                        "severity": info["severity"],
+                        "explanation": info["explanation"],
+                        "recommended_actions": info["recommended_actions"],
+                        "symptoms": info.get("symptoms", []),
+                        "economic_impact": info.get("economic_impact", ""),
+                        "scientific_name": info.get("scientific_name", "")
+                    }
+                    if uncertain:
+                        response["explanation"] = f"{LOW_CONFIDENCE_WARNING}\n\n{response['explanation']}"
+                        response["recommended_actions"] = LOW_CONFIDENCE_ACTIONS
+                        response["severity"] = "Low"  # Prevent panic over an uncertain result
+                    try:
+                        validated = PredictionResponse(**placeholder, **response).model_dump(mode="json")
+                    except ValueError as e:
+                        print(f"⚠️ Knowledge entry {disease_key} does not fit the response schema: {e}")
+                        break
+                    fragments[(disease_key, language, uncertain)] = ResponseFragment(
+                        {field: validated[field] for field in STATIC_FIELDS},
+                        info.get("name_localized")
+                    )
+        return fragments
+    
+    def get_response_fragment(self, disease_key: str, language: str = "en", uncertain: bool = False) -> Optional[ResponseFragment]:
+        """
+        Precompiled response fragment for a disease
+        
+        Args:
+            disease_key: Disease identifier (e.g., "Early_Blight")
+            language: Language code; falls back to English if not localized
+            uncertain: Low-confidence variant (warning, generic actions, Low severity)
+            
+        Returns:
+            The fragment, or None if the disease is not in the knowledge base
+        """
+        fragments = self._state.fragments
+        return fragments.get((disease_key, language, uncertain)) or fragments.get((disease_key, "en", uncertain))
+    
     def get_severity(self, disease_key: str) -> str:
         """Get disease severity level"""
         info = self.get_disease_info(disease_key)
@@ -117,10 +266,9 @@ class KnowledgeEngine:
         Returns:
             Complete API response structure
         """
-        # Get disease information
-        disease_info = self.get_disease_info(disease_key, language)
+        fragment = self.get_response_fragment(disease_key, language)
         
-        if not disease_info:
+        if fragment is None:
             # Fallback for unknown disease
             return {
                 "crop": crop,
@@ -135,26 +283,11 @@ class KnowledgeEngine:
                 }
             }
         
-        # Determine severity color/level
-        severity = disease_info["severity"]
-        
-        # Build structured response
-        response = {
-            "crop": crop,
-            "disease": disease_key.replace("_", " ").title(),
-            "disease_key": disease_key,
-            "confidence": confidence,
-            "severity": severity,
-            "explanation": disease_info["explanation"],
-            "recommended_actions": disease_info["recommended_actions"],
-            "symptoms": disease_info.get("symptoms", []),
-            "economic_impact": disease_info.get("economic_impact", ""),
-            "scientific_name": disease_info.get("scientific_name", "")
-        }
+        response = fragment.to_dict({"crop": crop, "confidence": confidence})
         
         # Add localized name if available
-        if language != "en" and "name_localized" in disease_info:
-            response["disease_localized"] = disease_info["name_localized"]
+        if language != "en" and fragment.localized_name:
+            response["disease_localized"] = fragment.localized_name
         
         return response
     
@@ -165,14 +298,29 @@ class KnowledgeEngine:
     def get_knowledge_version(self) -> str:
         """Get knowledge base version"""
         return self.version
+    
+    def get_knowledge_revision(self) -> str:
+        """Version plus content digest; changes on every reload that changed content"""
+        return self._state.revision
 
 
 # Global instance
 _knowledge_engine = None
+_knowledge_engine_lock = threading.Lock()
 
 def get_knowledge_engine() -> KnowledgeEngine:
-    """Get or create global knowledge engine instance"""
+    """Get or create global knowledge engine instance, kept current by the knowledge loader"""
     global _knowledge_engine
     if _knowledge_engine is None:
-        _knowledge_engine = KnowledgeEngine()
+        with _knowledge_engine_lock:
+            if _knowledge_engine is None:
+                loader = get_knowledge_loader()
+                engine = KnowledgeEngine(str(loader.path("disease_knowledge")), load=False)
+                snapshot = loader.get("disease_knowledge")
+                if snapshot is not None:
+                    engine.apply(snapshot.data, snapshot.digest)
+                else:
+                    print(f"⚠️ Knowledge base not found at {engine.knowledge_path}")
+                loader.subscribe("disease_knowledge", lambda snapshot: engine.apply(snapshot.data, snapshot.digest))
+                _knowledge_engine = engine
     return _knowledge_engine
@@ -0,0 +1,280 @@
+"""
+Knowledge File Loader for SANJIVANI 2.0
+Versioned, hot-reloadable in-memory snapshots of the knowledge JSON files
+
+Every file is parsed and validated once, then served from memory. A
+background thread polls the files' mtimes; a changed file is re-parsed
+and validated off the request path and only then swapped in, so a
+request sees either the old snapshot or the new one, never a partial
+load. A file that fails validation keeps its previous snapshot.
+"""
+import calendar
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, get_args
+
+from pydantic import ValidationError
+
+from ai.dataset_config_v2 import SERVING_CONFIG
+from schemas.prediction import PredictionResponse, RecommendedActions
+
+KNOWLEDGE_DIR = Path(__file__).parent
+SEVERITIES = get_args(PredictionResponse.model_fields["severity"].annotation)
+
+
+def content_digest(raw: bytes) -> str:
+    """Short digest identifying a file's exact content"""
+    return hashlib.blake2b(raw, digest_size=6).hexdigest()
+
+
+class KnowledgeSnapshot:
+    """One parsed, validated version of a knowledge file (treat as read-only)"""
+    __slots__ = ("name", "data", "version", "digest", "mtime_ns", "size", "loaded_at")
+
+    def __init__(self, name: str, data: Any, version: str, digest: str, mtime_ns: int, size: int):
+        self.name = name
+        self.data = data
+        self.version = version
+        self.digest = digest
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.loaded_at = time.time()
+
+    @property
+    def revision(self) -> str:
+        """Declared version plus content digest; changes on any edit, bumped or not"""
+        return f"{self.version}@{self.digest}"
+
+
+def _require_object(value: Any, what: str) -> Dict:
+    if not isinstance(value, dict):
+        raise ValueError(f"{what} must be an object, got {type(value).__name__}")
+    return value
+
+
+def _validate_diseases(data: Any):
+    if not isinstance(data, dict) or not isinstance(data.get("diseases"), dict):
+        raise ValueError("expected an object with a 'diseases' object")
+    for key, info in data["diseases"].items():
+        _require_object(info, f"disease {key!r}")
+        missing = {"severity", "explanation", "recommended_actions"} - set(info)
+        if missing:
+            raise ValueError(f"disease {key!r} is missing {sorted(missing)}")
+        # Everything the response schema needs, so no entry is accepted here and dropped at compile
+        if info["severity"] not in SEVERITIES:
+            raise ValueError(f"disease {key!r} severity {info['severity']!r} is not one of {list(SEVERITIES)}")
+        if not isinstance(info["explanation"], str) or not isinstance(info.get("economic_impact", ""), str):
+            raise ValueError(f"disease {key!r} explanation and economic_impact must be strings")
+        if not isinstance(info.get("scientific_name", ""), (str, type(None))):
+            raise ValueError(f"disease {key!r} scientific_name must be a string")
+        symptoms = info.get("symptoms", [])
+        if not isinstance(symptoms, list) or not all(isinstance(symptom, str) for symptom in symptoms):
+            raise ValueError(f"disease {key!r} symptoms must be a list of strings")
+        try:
+            RecommendedActions.model_validate(info["recommended_actions"])
+        except ValidationError as e:
+            problems = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            raise ValueError(f"disease {key!r} recommended_actions invalid ({problems})")
+        for language, localized in _require_object(info.get("multilingual", {}), f"disease {key!r} multilingual").items():
+            _require_object(localized, f"disease {key!r} {language} translation")
+
+
+def _validate_calendar(data: Any):
+    if not isinstance(data, dict) or not isinstance(data.get("crops"), dict):
+        raise ValueError("expected an object with a 'crops' object")
+    month_names = set(calendar.month_name[1:])
+    for crop, info in data["crops"].items():
+        _require_object(info, f"crop {crop!r}")
+        windows, stages = info.get("sowing_windows", []), info.get("stages", [])
+        if not isinstance(windows, list) or not isinstance(stages, list):
+            raise ValueError(f"crop {crop!r} sowing_windows and stages must be lists")
+        for window in windows:
+            months = _require_object(window, f"crop {crop!r} sowing window").get("months", [])
+            if (not isinstance(window.get("season"), str) or not isinstance(months, list)
+                    or not all(isinstance(month, str) and month in month_names for month in months)):
+                raise ValueError(f"crop {crop!r} has a sowing window without a season or with unknown months")
+        for stage in stages:
+            days = _require_object(stage, f"crop {crop!r} stage").get("days")
+            # bool is an int subclass; true is not a day count
+            if not (isinstance(days, int) and not isinstance(days, bool) and days > 0):
+                raise ValueError(f"crop {crop!r} has a stage without a positive day count")
+
+
+def _validate_alerts(data: Any):
+    if not isinstance(data, list):
+        raise ValueError("expected a list of alerts")
+    for alert in data:
+        _require_object(alert, "alert")
+        missing = {"id", "pest", "crop", "severity", "region", "date"} - set(alert)
+        if missing:
+            raise ValueError(f"alert {alert.get('id')!r} is missing {sorted(missing)}")
+        for field in ("id", "pest", "crop", "severity", "region", "date"):
+            if not isinstance(alert[field], str):
+                raise ValueError(f"alert {alert['id']!r} field {field!r} must be a string")
+        date.fromisoformat(alert["date"])
+        if ("lat" in alert) != ("lon" in alert):
+            raise ValueError(f"alert {alert['id']!r} needs both lat and lon")
+        if "lat" in alert:
+            lat, lon = alert["lat"], alert["lon"]
+            if not (all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (lat, lon))
+                    and -90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError(f"alert {alert['id']!r} has invalid coordinates")
+
+
+# name -> (file name, validator)
+KNOWLEDGE_FILES: Dict[str, tuple] = {
+    "disease_knowledge": ("disease_knowledge.json", _validate_diseases),
+    "crop_calendar": ("crop_calendar.json", _validate_calendar),
+    "pest_alerts": ("pest_alerts.json", _validate_alerts),
+}
+
+
+class KnowledgeLoader:
+    """
+    Shared loader for the knowledge JSON files
+
+    get(name) returns the current snapshot without touching the disk.
+    subscribe(name, callback) runs callback(snapshot) after each reload of
+    that file, on the reload thread, e.g. to rebuild derived structures.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, files: Optional[Dict[str, tuple]] = None):
+        self.directory = Path(directory or KNOWLEDGE_DIR)
+        self.files = files or KNOWLEDGE_FILES
+        self._snapshots: Dict[str, KnowledgeSnapshot] = {}  # Replaced whole, never mutated
+        self._errors: Dict[str, str] = {}
+        self._subscribers: Dict[str, List[Callable[[KnowledgeSnapshot], None]]] = {}
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.last_reload: Optional[float] = None
+        self.reloads = 0
+        self.reload()
+
+    def path(self, name: str) -> Path:
+        return self.directory / self.files[name][0]
+
+    def get(self, name: str) -> Optional[KnowledgeSnapshot]:
+        """Current snapshot of a file, or None if it has never loaded"""
+        return self._snapshots.get(name)
+
+    def subscribe(self, name: str, callback: Callable[[KnowledgeSnapshot], None]):
+        self._subscribers.setdefault(name, []).append(callback)
+
+    def _parse(self, name: str, stat: os.stat_result) -> KnowledgeSnapshot:
+        raw = self.path(name).read_bytes()
+        data = json.loads(raw)
+        self.files[name][1](data)
+        version = str(data.get("version", "unversioned")) if isinstance(data, dict) else "unversioned"
+        digest = content_digest(raw)
+        return KnowledgeSnapshot(name, data, version, digest, stat.st_mtime_ns, stat.st_size)
+
+    def reload(self) -> List[str]:
+        """
+        Re-parse every file whose mtime or size changed; returns the names swapped in
+
+        Runs on the caller's thread (startup) or the watcher thread, never
+        on a request.
+        """
+        with self._reload_lock:
+            changed = []
+            for name in self.files:
+                try:
+                    stat = self.path(name).stat()
+                except FileNotFoundError:
+                    self._errors[name] = f"{self.path(name)} not found"
+                    continue
+                current = self._snapshots.get(name)
+                if current and (current.mtime_ns, current.size) == (stat.st_mtime_ns, stat.st_size):
+                    self._errors.pop(name, None)  # The served file is back (e.g. moved away and restored)
+                    continue
+                try:
+                    snapshot = self._parse(name, stat)
+                except Exception as e:  # Unreadable, malformed or invalid: all keep the old snapshot
+                    if self._errors.get(name) != str(e):
+                        print(f"❌ Knowledge file {self.files[name][0]} rejected, keeping the previous version: {e}")
+                    self._errors[name] = str(e)
+                    continue
+                if current and current.digest == snapshot.digest:
+                    # Touched but not changed: remember the new mtime, keep the old object
+                    snapshot.data, snapshot.loaded_at = current.data, current.loaded_at
+                    self._snapshots = {**self._snapshots, name: snapshot}
+                    self._errors.pop(name, None)  # A bad edit or missing file was reverted
+                    continue
+
+                self._snapshots = {**self._snapshots, name: snapshot}
+                self._errors.pop(name, None)
+                changed.append(name)
+                for callback in self._subscribers.get(name, []):
+                    try:
+                        callback(snapshot)
+                    except Exception as e:
+                        # Served data and derived state disagree; show it in /health until the next load
+                        self._errors[name] = f"reload hook failed: {e}"
+                        print(f"❌ Knowledge reload hook for {name} failed: {e}")
+                if current:
+                    print(f"🔄 Knowledge file {self.files[name][0]} reloaded: v{current.version} -> v{snapshot.version} ({snapshot.digest})")
+
+            if changed:
+                self.last_reload = time.time()
+                self.reloads += 1
+            return changed
+
+    def start_watching(self, interval_s: Optional[float] = None):
+        """Poll the files for changes in a daemon thread (interval 0 disables)"""
+        interval_s = SERVING_CONFIG["knowledge_reload_interval_s"] if interval_s is None else interval_s
+        if interval_s <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval_s):
+                try:
+                    self.reload()
+                except Exception as e:  # Keep watching; one bad pass must not end hot reload
+                    print(f"❌ Knowledge reload failed: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="knowledge-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def get_status(self) -> Dict:
+        """Versions, digests and reload times for /health"""
+        def iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+        snapshots = self._snapshots
+        return {
+            "last_reload": iso(self.last_reload),
+            "reloads": self.reloads,
+            "files": {
+                name: {
+                    "version": snapshots[name].version if name in snapshots else None,
+                    "digest": snapshots[name].digest if name in snapshots else None,
+                    "loaded_at": iso(snapshots[name].loaded_at) if name in snapshots else None,
+                    "error": self._errors.get(name)
+                }
+                for name in self.files
+            }
+        }
+
+
+# Global instance
+_knowledge_loader = None
+_knowledge_loader_lock = threading.Lock()
+
+
+def get_knowledge_loader() -> KnowledgeLoader:
+    """Get or create global knowledge loader instance (first call loads every file)"""
+    global _knowledge_loader
+    if _knowledge_loader is None:
+        with _knowledge_loader_lock:
+            if _knowledge_loader is None:
+                _knowledge_loader = KnowledgeLoader()
+    return _knowledge_loader
@@ -0,0 +1,205 @@
+"""
+Local Search Index for SANJIVANI 2.0
+In-memory inverted index over the disease knowledge base with BM25
+ranking and typo tolerance, so most searches never leave the process
+
+Fields are weighted BM25F-style: a term in a disease's name counts
+more than the same term in its explanation. Misspelled query terms are
+matched to indexed terms within a small edit distance via a
+symmetric-delete lookup table built with the index.
+"""
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .knowledge_engine import get_knowledge_engine
+
+# Devanagari vowel signs are not \w, so include the block explicitly (hi, mr names)
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u097F]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "has",
+    "have", "how", "i", "in", "is", "it", "my", "of", "on", "or", "the", "this", "to", "what",
+    "when", "which", "why", "with", "plant", "plants", "leaf", "leaves", "crop", "crops"
+}
+
+# Field weights: how much one occurrence counts towards a term's frequency
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "localized_names": 3.0,
+    "scientific_name": 2.5,
+    "crops": 2.0,
+    "symptoms": 1.5,
+    "explanation": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+FUZZY_PENALTY = 0.7  # Score multiplier per edit for a typo-corrected term
+
+
+def _stem(token: str) -> str:
+    """Strip common English plural endings so "spots" matches "spot" """
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed tokens without stopwords"""
+    return [_stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _max_edits(token: str) -> int:
+    """Edits tolerated for a term of this length"""
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 7 else 2
+
+
+def _deletes(token: str, max_edits: int) -> Set[str]:
+    """Every string reachable from token by deleting up to max_edits characters"""
+    results = {token}
+    frontier = {token}
+    for _ in range(max_edits):
+        frontier = {term[:i] + term[i + 1:] for term in frontier for i in range(len(term))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (transpositions count once), or limit + 1 if larger"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """
+    BM25 index over one version of the knowledge base
+
+    Immutable once built; a new knowledge version gets a new index.
+    """
+
+    def __init__(self, diseases: Dict[str, Dict], version: str):
+        self.version = version
+        self.doc_ids: List[str] = []
+        self.display_names: List[str] = []
+        self.localized: List[Dict[str, str]] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        self.doc_lengths: List[float] = []
+
+        for disease_key, info in diseases.items():
+            doc = len(self.doc_ids)
+            self.doc_ids.append(disease_key)
+            self.display_names.append(disease_key.replace("_", " ").title())
+            localized = {
+                lang: data["name"] for lang, data in info.get("multilingual", {}).items() if "name" in data
+            }
+            self.localized.append(localized)
+
+            fields = {
+                "name": [disease_key.replace("_", " ")],
+                "localized_names": localized.values(),
+                "scientific_name": [info.get("scientific_name", "")],
+                "crops": info.get("crops_affected", []),
+                "symptoms": info.get("symptoms", []),
+                "explanation": [info.get("explanation", "")],
+            }
+            frequencies: Dict[str, float] = defaultdict(float)
+            for field, texts in fields.items():
+                for text in texts:
+                    for token in tokenize(text):
+                        frequencies[token] += FIELD_WEIGHTS[field]
+            for token, frequency in frequencies.items():
+                self.postings[token].append((doc, frequency))
+            self.doc_lengths.append(sum(frequencies.values()))
+
+        self.num_docs = len(self.doc_ids)
+        self._doc_index = {disease_key: doc for doc, disease_key in enumerate(self.doc_ids)}
+        self.avg_length = sum(self.doc_lengths) / self.num_docs if self.num_docs else 0.0
+        self.idf = {
+            token: math.log(1 + (self.num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+
+        # Symmetric-delete table: delete-variant -> indexed terms it came from
+        self._delete_table: Dict[str, Set[str]] = defaultdict(set)
+        for token in self.postings:
+            for variant in _deletes(token, _max_edits(token)):
+                self._delete_table[variant].add(token)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Indexed terms matching a query term, with a weight (1.0 exact, lower for typos)"""
+        if token in self.postings:
+            return [(token, 1.0)]
+        max_edits = _max_edits(token)
+        if not max_edits:
+            return []
+        candidates: Set[str] = set()
+        for variant in _deletes(token, max_edits):
+            candidates |= self._delete_table.get(variant, set())
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(token, candidate, min(max_edits, _max_edits(candidate)))
+            if 0 < distance <= max_edits:
+                matches.append((candidate, FUZZY_PENALTY ** distance))
+        return matches
+
+    def search(self, query: str, limit: int = 3) -> List[Tuple[str, float]]:
+        """
+        Rank diseases for a free-text query
+
+        Returns:
+            Up to `limit` (disease_key, score) pairs, best first, score > 0
+        """
+        scores = [0.0] * self.num_docs
+        for token in set(tokenize(query)):
+            for term, weight in self._expand(token):
+                idf = self.idf[term]
+                for doc, frequency in self.postings[term]:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / self.avg_length)
+                    scores[doc] += weight * idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+        ranked = sorted((score, doc) for doc, score in enumerate(scores) if score > 0)
+        return [(self.doc_ids[doc], score) for score, doc in reversed(ranked[-limit:])]
+
+    def display_name(self, disease_key: str, language: str = "en") -> str:
+        """Localized name if the knowledge base has one, else the English name"""
+        doc = self._doc_index[disease_key]
+        return self.localized[doc].get(language, self.display_names[doc])
+
+
+# Global instance, rebuilt when the knowledge base is reloaded with new content
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Get the index for the current knowledge base, building it on first use or after a reload"""
+    global _search_index
+    knowledge = get_knowledge_engine()
+    revision = knowledge.get_knowledge_revision()
+    index = _search_index
+    if index is None or index.version != revision:
+        with _search_index_lock:
+            if _search_index is None or _search_index.version != revision:
+                _search_index = SearchIndex(knowledge.knowledge_db, revision)
+                print(f"✅ Search index built for knowledge v{revision} ({_search_index.num_docs} diseases, {len(_search_index.postings)} terms)")
+            index = _search_index
+    return index
@@ -12,7 +12,7 @@ load_dotenv()
 
 # Import API v2 routers
 # Import API v2 routers
-from api.v2 import predict, meta, alerts, metrics, search
+from api.v2 import predict, meta, alerts, metrics, search, admin
 from api.v2.feedback import router as feedback_router
 from api.v2.chat import router as chat_router
 from api import weather
@@ -20,8 +20,16 @@ from api import ai_analysis
 
 # Import initialization functions
 from database import init_db
-from ai.inference_engine import get_inference_engine
+from ai.inference_engine import ModelNotReady, start_background_load
+from ai.batch_scheduler import get_batch_scheduler
+from ai.executor import get_inference_executor, InferenceQueueFull
+from ai.llm_client import get_llm_client
 from knowledge.knowledge_engine import get_knowledge_engine
+from knowledge.alert_index import get_alert_index
+from knowledge.calendar_index import get_calendar_index
+from knowledge.loader import get_knowledge_loader
+from knowledge.search_index import get_search_index
+from services.upload_ingest import UploadRejected, read_upload
 
 
 # Initialize FastAPI app
@@ -55,9 +63,10 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 # Include API v2 routers
 # Note: predict_router and metrics_router have prefixes internal to them
 app.include_router(metrics.router)
+app.include_router(predict.router, tags=["Prediction"])
+app.include_router(admin.router)
 
 # These routers rely on the prefix defined here to match frontend expectations
-app.include_router(predict.router, prefix="/api/v2", tags=["Prediction"])
 app.include_router(meta.router, prefix="/api/v2/meta", tags=["Meta"])
 app.include_router(alerts.router, prefix="/api/v2/alerts", tags=["Alerts"])
 app.include_router(feedback_router, prefix="/api/v2")
@@ -75,13 +84,10 @@ async def startup_event():
     # Initialize database
     init_db()
     
-    # Initialize AI engine (loads model)
-    inference_engine = get_inference_engine()
-    model_info = inference_engine.get_model_info()
-    if model_info["loaded"]:
-        print(f"✅ Model loaded: {model_info['metadata'].get('version', 'unknown')}")
-    else:
-        print("⚠️ Model not found - using mock mode")
+    # Initialize AI engine: TensorFlow import + model load happen in the
+    # background so the port opens immediately (/api/v2/ready gates traffic)
+    start_background_load()
+    print("⏳ Model loading in background")
     
     # Initialize knowledge engine
     knowledge_engine = get_knowledge_engine()
@@ -89,9 +95,30 @@ async def startup_event():
     print(f"✅ Knowledge Base v{kb_version} loaded")
     print(f"   Diseases: {len(knowledge_engine.get_all_diseases())}")
     
+    # Local search index (rebuilt automatically when the knowledge version changes)
+    get_search_index()
+    get_alert_index()
+    get_calendar_index()
+    
+    # Hot reload: changed knowledge files are parsed and swapped in off the request path
+    knowledge_loader = get_knowledge_loader()
+    knowledge_loader.subscribe("disease_knowledge", lambda snapshot: get_search_index())
+    knowledge_loader.subscribe("pest_alerts", lambda snapshot: get_alert_index())
+    knowledge_loader.subscribe("crop_calendar", lambda snapshot: get_calendar_index())
+    knowledge_loader.start_watching()
+    
     print("✅ SANJIVANI 2.0 ready!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background workers on shutdown"""
+    await get_batch_scheduler().close()
+    get_inference_executor().shutdown()
+    get_knowledge_loader().stop_watching()
+    await get_llm_client().close()
+
+
 @app.get("/")
 async def root():
     """API root - redirect to docs"""
@@ -131,14 +158,13 @@ async def predict_v1(file: UploadFile = File(...)):
     - Multilingual support
     """
     try:
-        contents = await file.read()
+        contents = await read_upload(file)
         
-        # Use new inference engine
-        inference_engine = get_inference_engine()
+        # Use new inference engine (off the event loop, batched with v2 traffic)
         knowledge_engine = get_knowledge_engine()
         
         # Get prediction
-        prediction = inference_engine.predict(contents)
+        prediction = await get_batch_scheduler().submit(contents)
         complete_response = knowledge_engine.map_prediction_to_response(
             crop=prediction["crop"],
             disease_key=prediction["disease_key"],
@@ -155,6 +181,12 @@ async def predict_v1(file: UploadFile = File(...)):
             prevention="; ".join(actions["preventive"][:2]) if actions["preventive"] else "Continue good practices"
         )
         
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ModelNotReady:
+        raise HTTPException(status_code=503, detail="Model is loading, please retry", headers={"Retry-After": "5"})
+    except InferenceQueueFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "2"})
     except Exception as e:
         print(f"❌ Error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
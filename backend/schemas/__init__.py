@@ -5,7 +5,15 @@ from .prediction import (
     PredictionMetadata,
     ModelMetrics,
     HealthCheckResponse,
-    PerformanceStats
+    PerformanceStats,
+    CacheStats,
+    LLMCacheStats,
+    LLMClientStats,
+    LatencySummary,
+    StageLatency,
+    QuantizationReport,
+    ModelRegistryResponse,
+    ModelSwapStatus
 )
 
 __all__ = [
@@ -14,5 +22,13 @@ __all__ = [
     'PredictionMetadata',
     'ModelMetrics',
     'HealthCheckResponse',
-    'PerformanceStats'
+    'PerformanceStats',
+    'CacheStats',
+    'LLMCacheStats',
+    'LLMClientStats',
+    'LatencySummary',
+    'StageLatency',
+    'QuantizationReport',
+    'ModelRegistryResponse',
+    'ModelSwapStatus'
 ]
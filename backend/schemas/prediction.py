@@ -13,11 +13,29 @@ class RecommendedActions(BaseModel):
     preventive: List[str] = Field(description="Long-term prevention strategies")
 
 
+class TTAInfo(BaseModel):
+    """Adaptive test-time augmentation applied to a low-confidence prediction"""
+    views: int = Field(description="Augmented views averaged in (0: skipped, over the latency budget)")
+    tta_ms: float = Field(description="Time of the extra forward pass in milliseconds")
+    first_pass_confidence: float = Field(description="Confidence before augmentation")
+    rescued: bool = Field(description="Confidence reached the threshold after augmentation")
+
+
 class PredictionMetadata(BaseModel):
     """Model and inference metadata"""
     model_version: str = Field(description="Model version used")
     inference_time_ms: float = Field(description="Inference time in milliseconds")
     model_architecture: str = Field(description="Model architecture name")
+    backend: Optional[str] = Field(None, description="Serving backend (keras, tflite or mock)")
+    forward_ms: Optional[float] = Field(None, description="Model forward pass time in milliseconds")
+    near_duplicate: Optional[bool] = Field(None, description="Reused the prediction of a near-identical recent image")
+    peak_memory_mb: Optional[float] = Field(None, description="Estimated peak memory held for this image (upload, decoded pixels, model input)")
+    decode_ms: Optional[float] = Field(None, description="Image decode time in milliseconds")
+    resize_ms: Optional[float] = Field(None, description="Resize and normalize time in milliseconds")
+    tta: Optional[TTAInfo] = Field(None, description="Set when the first pass was below the confidence threshold and adaptive TTA is on")
+    cascade_stage: Optional[str] = Field(None, description="Cascade stage that answered: small or full (unset without a cascade)")
+    queue_wait_ms: Optional[float] = Field(None, description="Time waiting for a micro-batch slot in milliseconds")
+    batch_size: Optional[int] = Field(None, description="Images in the micro-batch this prediction ran in")
 
 
 class AlternativePrediction(BaseModel):
@@ -44,6 +62,36 @@ class PredictionResponse(BaseModel):
         None, description="Alternative predictions"
     )
     metadata: PredictionMetadata
+    cached: bool = Field(False, description="True if served from the prediction cache")
+
+
+class QuantizedVariant(BaseModel):
+    """Accuracy, size and CPU latency of one exported model variant"""
+    accuracy: float
+    agreement: float = Field(description="Top-1 agreement with the float Keras model")
+    size_mb: float
+    p50_ms: float
+    p99_ms: float
+
+
+class QuantizationReport(BaseModel):
+    """Post-training quantization comparison written at export time"""
+    calibration_samples: int
+    eval_samples: int
+    variants: Dict[str, QuantizedVariant] = Field(
+        description="keras_float, tflite_float, tflite_dynamic, tflite_int8"
+    )
+
+
+class CascadeReport(BaseModel):
+    """Early-exit threshold tuned offline on validation data (tune_cascade.py)"""
+    threshold: Optional[float] = Field(description="Small-model confidence at which it answers alone (None: never)")
+    accuracy: float = Field(description="Cascade accuracy at this threshold")
+    escalation_rate: float = Field(description="Fraction of images sent on to the full model")
+    target_accuracy: float
+    small_accuracy: float
+    large_accuracy: float
+    samples: int
 
 
 class ModelMetrics(BaseModel):
@@ -58,17 +106,99 @@ class ModelMetrics(BaseModel):
     avg_inference_ms: Optional[float] = None
     trained_date: Optional[str] = None
     num_classes: int
+    tflite_size_mb: Optional[float] = None
+    tflite_quantization: Optional[str] = Field(None, description="Served TFLite variant: float, dynamic or int8")
+    quantization: Optional[QuantizationReport] = None
+    cascade: Optional[CascadeReport] = None
+
+
+class LatencySummary(BaseModel):
+    """Latency percentiles over one time window"""
+    count: int = 0
+    mean_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p90_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    p999_ms: Optional[float] = None
+    min_ms: Optional[float] = None
+    max_ms: Optional[float] = None
+    std_ms: Optional[float] = None
+
+
+class StageLatency(BaseModel):
+    """All-time and sliding-window latency of one pipeline stage"""
+    all_time: LatencySummary
+    last_1m: LatencySummary
+    last_15m: LatencySummary
+
+
+class KnowledgeFileStatus(BaseModel):
+    """Loaded version of one knowledge JSON file"""
+    version: Optional[str] = Field(None, description="Declared version, or 'unversioned'")
+    digest: Optional[str] = Field(None, description="Content digest of the loaded file")
+    loaded_at: Optional[str] = None
+    error: Optional[str] = Field(None, description="Why the file on disk was rejected, if it was")
 
 
 class HealthCheckResponse(BaseModel):
     """API health check response"""
-    status: Literal["healthy", "degraded", "unhealthy"]
+    status: Literal["healthy", "degraded", "unhealthy", "loading"]
     model_loaded: bool
+    model_state: Optional[str] = Field(None, description="loading or ready")
+    model_load_ms: Optional[float] = Field(None, description="Time taken to load and warm up the model")
     knowledge_base_loaded: bool
     knowledge_version: str
     model_version: str
     total_inferences: int
     avg_inference_ms: Optional[float] = None
+    near_duplicate_hit_rate: Optional[float] = None
+    request_latency: Optional[StageLatency] = Field(None, description="End-to-end /predict latency")
+    knowledge_files: Dict[str, KnowledgeFileStatus] = Field(default_factory=dict)
+    knowledge_last_reload: Optional[str] = Field(None, description="Last time a changed knowledge file was swapped in")
+
+
+class CacheStats(BaseModel):
+    """Prediction cache statistics"""
+    entries: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class LLMCacheStats(BaseModel):
+    """Gemini output cache statistics"""
+    entries: int
+    max_entries: int
+    disk_entries: Optional[int] = Field(None, description="Entries in the persistent tier (None if disabled)")
+    ttl_seconds: float
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    hit_rate: float
+    saved_ms: float = Field(description="Generation time avoided by hits since startup")
+
+
+class LLMClientStats(BaseModel):
+    """Shared Gemini client concurrency statistics"""
+    available: bool
+    transport: Optional[str] = Field(None, description="GeminiSDKTransport or HTTPTransport (None if no LLM configured)")
+    max_concurrency: int
+    max_queue: int
+    timeout_s: float
+    in_flight: int
+    waiting: int = Field(description="Calls queued for a concurrency slot")
+    peak_waiting: int = Field(description="Deepest queue since startup")
+    total_calls: int
+    total_failures: int
+    total_timeouts: int
+    total_rejected: int = Field(description="Calls refused because the queue was full")
+    avg_latency_ms: Optional[float] = None
+    avg_wait_ms: Optional[float] = None
 
 
 class PerformanceStats(BaseModel):
@@ -78,3 +208,42 @@ class PerformanceStats(BaseModel):
     min_inference_ms: float
     max_inference_ms: float
     std_inference_ms: float
+    backend: Optional[str] = None
+    avg_forward_ms: Optional[float] = None
+    phash_entries: int = 0
+    phash_lookups: int = 0
+    phash_hits: int = 0
+    phash_hit_rate: float = 0.0
+    phash_avg_lookup_us: float = 0.0
+    tta_applied: int = 0
+    tta_rescued: int = 0
+    tta_skipped: int = 0
+    cascade_small: int = 0
+    cascade_full: int = 0
+    stages: Dict[str, StageLatency] = Field(
+        default_factory=dict,
+        description="Per-stage latency: decode, resize, small_forward, forward, tta, inference, knowledge, db_write, total"
+    )
+
+
+class ModelVersionInfo(BaseModel):
+    """One version in the model registry"""
+    version: str
+    has_h5: bool
+    has_tflite: bool
+    metadata: Dict = Field(default_factory=dict)
+
+
+class ModelSwapStatus(BaseModel):
+    """Progress of the latest model hot-swap"""
+    state: Literal["idle", "loading", "draining", "failed"]
+    version: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ModelRegistryResponse(BaseModel):
+    """Registry contents and the version currently serving"""
+    active_version: str
+    active_backend: str
+    swap: ModelSwapStatus
+    versions: List[ModelVersionInfo]
@@ -0,0 +1,151 @@
+"""
+SANJIVANI 2.0 - Pre-fork Server
+Loads the model once in a parent process and forks N uvicorn workers
+that share it copy-on-write on one listening socket
+
+Thread counts for TF, TFLite and BLAS are set per worker before any
+numerical library is imported, so N workers x T threads never
+oversubscribes the machine. Workers can optionally be pinned to cores.
+
+Only the TFLite backend is preloaded in the parent: TensorFlow's eager
+runtime does not survive fork(), so with the Keras backend each worker
+loads its own copy after forking.
+
+Usage:
+    python serve.py [--workers 4] [--threads 1] [--pin] [--host 0.0.0.0] [--port 8000]
+
+Environment (CLI flags take precedence):
+    SERVE_WORKERS   Worker processes (default: CPU count)
+    SERVE_THREADS   Compute threads per worker (default: CPUs / workers)
+    SERVE_PIN       "1" pins each worker to its own cores (Linux only)
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def parse_args():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="SANJIVANI pre-fork server")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVE_WORKERS", cpus)))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("SERVE_THREADS", "0")),
+                        help="Compute threads per worker (0: CPUs / workers)")
+    parser.add_argument("--pin", action="store_true", default=os.getenv("SERVE_PIN", "0") == "1")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+    args.threads = args.threads or max(1, cpus // args.workers)
+    return args
+
+
+def configure_threads(threads: int):
+    """Per-worker thread counts; must run before numpy/TF are imported"""
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TFLITE_NUM_THREADS"] = str(threads)
+    os.environ["TF_INTRA_OP_THREADS"] = str(threads)
+    os.environ["TF_INTER_OP_THREADS"] = "1"
+
+
+def worker_cores(index: int, threads: int):
+    """Cores for worker `index`: consecutive blocks of `threads`, wrapping around"""
+    cpus = os.cpu_count() or 1
+    return {(index * threads + j) % cpus for j in range(threads)}
+
+
+def run_worker(index: int, sock: socket.socket, args):
+    """Child process: optionally pin, then serve the preloaded app"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if args.pin and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, worker_cores(index, args.threads))
+
+    import uvicorn
+    from main import app
+
+    config = uvicorn.Config(app, log_level="info", access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    args = parse_args()
+    configure_threads(args.threads)
+
+    # Everything below may import numpy / TF, so it comes after the thread setup
+    from ai.dataset_config_v2 import SERVING_CONFIG
+    from ai.inference_engine import get_inference_engine
+    from knowledge.knowledge_engine import get_knowledge_engine
+    import main as app_module  # noqa: F401  (routes, schemas and config, shared by all workers)
+
+    print(f"🚀 Pre-fork server: {args.workers} workers x {args.threads} threads"
+          f"{' (pinned)' if args.pin else ''} on {args.host}:{args.port}")
+
+    get_knowledge_engine()
+    if SERVING_CONFIG["inference_backend"] in ("auto", "tflite"):
+        # Workers are CPU-only; skip the GPU probe and preload TFLite for sharing
+        SERVING_CONFIG["inference_backend"] = "tflite"
+        engine = get_inference_engine()
+        if engine.backend is None:
+            print("⚠️ No .tflite model preloaded; workers run in mock mode")
+    else:
+        print("⚠️ Keras backend cannot be shared across fork(); each worker loads its own model")
+
+    # Objects alive now are never freed; keep GC from dirtying their pages in workers
+    gc.collect()
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(index, sock, args)
+            finally:
+                os._exit(0)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(args.workers):
+        spawn(index)
+
+    # Supervise: replace workers that die unexpectedly
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"⚠️ Worker {index} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(1)
+            spawn(index)
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
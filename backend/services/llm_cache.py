@@ -0,0 +1,262 @@
+"""
+LLM Response Cache for SANJIVANI 2.0
+Two-tier cache of Gemini outputs: an in-memory LRU in front of a SQLite
+file that survives restarts and is shared by pre-forked workers
+
+Entries are keyed by a fingerprint of the model and the exact prompt, so
+callers get hits by building prompts from normalized inputs (see
+confidence_band). Each entry remembers how long it took to generate, so
+a hit can report the latency it saved.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ai.dataset_config_v2 import CONFIDENCE_THRESHOLD, SERVING_CONFIG
+
+# Coarse confidence levels prompts are built from: high from here up,
+# moderate from CONFIDENCE_THRESHOLD, low below it
+HIGH_CONFIDENCE = 0.85
+BAND_DESCRIPTIONS = {
+    "high": f"high (at least {HIGH_CONFIDENCE:.0%})",
+    "moderate": f"moderate ({CONFIDENCE_THRESHOLD:.0%}-{HIGH_CONFIDENCE:.0%})",
+    "low": f"low (below {CONFIDENCE_THRESHOLD:.0%})"
+}
+
+
+def confidence_band(confidence: float) -> str:
+    """Coarse confidence level: LLM output should not depend on the exact score"""
+    if confidence >= HIGH_CONFIDENCE:
+        return "high"
+    return "moderate" if confidence >= CONFIDENCE_THRESHOLD else "low"
+
+
+def normalize_label(value: str) -> str:
+    """Early_Blight, early blight and 'Early  Blight' all become 'early blight'"""
+    return " ".join(value.replace("_", " ").split()).lower()
+
+
+def fingerprint(namespace: str, model: str, prompt: str) -> str:
+    """Cache key for a prompt; insensitive to indentation and blank lines"""
+    normalized = "\n".join(line.strip() for line in prompt.strip().splitlines() if line.strip())
+    return hashlib.blake2b(f"{namespace}\0{model}\0{normalized}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class LLMCache:
+    """
+    In-memory LRU + SQLite cache with a TTL
+
+    Values must be JSON-serializable. A generator result of None means the
+    call failed and is never cached.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None, path: Optional[str] = None):
+        self.max_entries = max_entries if max_entries is not None else SERVING_CONFIG["llm_cache_size"]
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else SERVING_CONFIG["llm_cache_ttl_s"]
+        self.path = path if path is not None else SERVING_CONFIG["llm_cache_path"]
+
+        self._entries: "OrderedDict[str, Tuple[float, Any, float]]" = OrderedDict()  # key -> (expires, value, latency_ms)
+        self._lock = threading.Lock()  # Memory tier and counters; never held across SQLite calls
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.path:
+            self._open_db()
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def _open_db(self):
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")  # Readers in other workers don't block the writer
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, latency_ms REAL NOT NULL)"
+            )
+            db.execute("DELETE FROM llm_cache WHERE expires < ?", (time.time(),))
+            db.commit()
+            self._db = db
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache file {self.path} unavailable, caching in memory only: {e}")
+
+    def _remember(self, key: str, expires: float, value: Any, latency_ms: float):
+        """Insert into the LRU tier (lock held)"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (expires, value, latency_ms)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_memory(self, key: str, now: float) -> Optional[Tuple[Any, str, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1], "memory", entry[2]
+                del self._entries[key]
+        return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[Tuple[Any, str, float]]:
+        """Read the SQLite tier (may wait on other workers' locks; keep it off the event loop)"""
+        if self._db is None:
+            return None
+        with self._db_lock:
+            try:
+                row = self._db.execute(
+                    "SELECT value, expires, latency_ms FROM llm_cache WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache read failed: {e}")
+                return None
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        with self._lock:
+            self._remember(key, row[1], value, row[2])
+        return value, "disk", row[2]
+
+    def _put_disk(self, key: str, value: Any, expires: float, latency_ms: float):
+        if self._db is None:
+            return
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires, latency_ms) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), expires, latency_ms)
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache write failed: {e}")
+
+    def get(self, key: str) -> Optional[Tuple[Any, str, float]]:
+        """(value, tier, generation latency ms) for a live entry, or None"""
+        now = time.time()
+        return self._get_memory(key, now) or self._get_disk(key, now)
+
+    def put(self, key: str, value: Any, latency_ms: float):
+        """Store a generated value in both tiers"""
+        expires = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires, value, latency_ms)
+        self._put_disk(key, value, expires, latency_ms)
+
+    def _hit(self, cached: Tuple[Any, str, float], start: float) -> Tuple[Any, Dict]:
+        """(value, info) for a cache hit, counting it"""
+        value, tier, generation_ms = cached
+        lookup_ms = (time.perf_counter() - start) * 1000
+        saved_ms = max(generation_ms - lookup_ms, 0.0)
+        with self._lock:
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.disk_hits += 1
+            self.saved_ms += saved_ms
+        return value, {"status": "hit", "tier": tier, "latency_ms": round(lookup_ms, 2), "saved_ms": round(saved_ms, 1)}
+
+    def _miss(self, start: float) -> float:
+        """Count a miss; returns the generation latency in ms"""
+        with self._lock:
+            self.misses += 1
+        return (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _miss_info(latency_ms: float) -> Dict:
+        return {"status": "miss", "tier": None, "latency_ms": round(latency_ms, 1), "saved_ms": 0.0}
+
+    def get_or_generate(self, key: str, generate: Callable[[], Any]) -> Tuple[Any, Dict]:
+        """
+        Cached value for key, or the result of generate() (cached unless None)
+
+        Returns:
+            (value, info) where info is {"status": "hit" | "miss", "tier":
+            "memory" | "disk" | None, "latency_ms", "saved_ms"}
+        """
+        start = time.perf_counter()
+        cached = self.get(key)
+        if cached is not None:
+            return self._hit(cached, start)
+        value = generate()
+        latency_ms = self._miss(start)
+        if value is not None:
+            self.put(key, value, latency_ms)
+        return value, self._miss_info(latency_ms)
+
+    async def get_or_generate_async(self, key: str, generate: Callable[[], Awaitable[Any]]) -> Tuple[Any, Dict]:
+        """
+        get_or_generate for a coroutine generator (see LLMClient)
+
+        Only the memory tier is used on the event loop; SQLite reads and
+        writes, which can wait on other workers, run in a thread.
+        """
+        start = time.perf_counter()
+        now = time.time()
+        cached = self._get_memory(key, now) or await asyncio.to_thread(self._get_disk, key, now)
+        if cached is not None:
+            return self._hit(cached, start)
+        value = await generate()
+        latency_ms = self._miss(start)
+        if value is not None:
+            expires = time.time() + self.ttl_seconds
+            with self._lock:
+                self._remember(key, expires, value, latency_ms)
+            await asyncio.to_thread(self._put_disk, key, value, expires, latency_ms)
+        return value, self._miss_info(latency_ms)
+
+    def clear(self):
+        """Drop all entries from both tiers"""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics (counts the SQLite tier; call off the event loop)"""
+        disk_entries = None
+        if self._db is not None:
+            with self._db_lock:
+                try:
+                    disk_entries = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_entries": disk_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "saved_ms": round(self.saved_ms, 1)
+            }
+
+
+# Global instance
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> LLMCache:
+    """Get or create global LLM cache instance"""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache()
+    return _llm_cache
@@ -0,0 +1,123 @@
+"""
+Prediction Cache for SANJIVANI 2.0
+Content-addressed LRU + TTL cache of complete prediction responses,
+so retried or re-sent uploads skip decode, inference and the DB write
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ai.dataset_config_v2 import SERVING_CONFIG
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache with per-entry TTL
+
+    Entries are keyed by a hash of the raw upload bytes plus model version
+    and response language. The cache also remembers which (model version,
+    knowledge version) it was filled under and clears itself when either
+    one changes, so a new model or knowledge base never serves stale advice.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries if max_entries is not None else SERVING_CONFIG["prediction_cache_size"]
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else SERVING_CONFIG["prediction_cache_ttl_s"]
+
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._generation: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(image_bytes: bytes, model_version: str, language: str) -> Tuple[str, str, str]:
+        """Content address for an upload"""
+        digest = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+        return (digest, model_version, language)
+
+    def _check_generation(self, generation: Tuple[str, str]):
+        """Drop everything if the model or knowledge base changed (lock held)"""
+        if self._generation != generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key: Tuple, generation: Tuple[str, str]) -> Optional[Any]:
+        """Return the cached response for key, or None"""
+        if self.max_entries <= 0:
+            return None
+
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, response = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: Tuple, generation: Tuple[str, str], response: Any):
+        """Store a response (treated as immutable), evicting the least recently used entry if full"""
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._check_generation(generation)
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+# Global instance
+_prediction_cache = None
+_prediction_cache_lock = threading.Lock()
+
+def get_prediction_cache() -> PredictionCache:
+    """Get or create global prediction cache instance"""
+    global _prediction_cache
+    if _prediction_cache is None:
+        with _prediction_cache_lock:
+            if _prediction_cache is None:
+                _prediction_cache = PredictionCache()
+    return _prediction_cache
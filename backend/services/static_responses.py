@@ -0,0 +1,137 @@
+"""
+Static Responses for SANJIVANI 2.0
+Metadata payloads serialized and compressed once per data version, served
+with strong ETags so re-polling clients mostly get an empty 304
+
+Each payload keeps its identity, gzip and (when the brotli package is
+installed) brotli bodies. The encoding is negotiated per request from
+Accept-Encoding; GZipMiddleware leaves responses that already carry a
+Content-Encoding alone.
+"""
+import gzip
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Set
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from ai.dataset_config_v2 import SERVING_CONFIG
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip and identity only
+    brotli = None
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Content codings an Accept-Encoding header allows (q=0 excluded)"""
+    accepted = set()
+    for item in header.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class StaticPayload:
+    """One version of a metadata response, pre-encoded in every supported coding"""
+    __slots__ = ("version", "bodies", "etags")
+
+    def __init__(self, content, version: str):
+        self.version = version
+        body = JSONResponse(content).body
+        self.bodies: Dict[str, bytes] = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=11)
+        # Strong validators differ per representation, so each coding gets its own tag
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.etags = {coding: f'"{digest}-{coding}"' for coding in self.bodies}
+
+    def choose_encoding(self, accept_encoding: str) -> str:
+        """Smallest body the client accepts"""
+        accepted = accepted_encodings(accept_encoding)
+        for coding in ("br", "gzip"):
+            if coding in self.bodies and (coding in accepted or "*" in accepted):
+                return coding
+        return "identity"
+
+    def matched_etag(self, if_none_match: str, coding: str) -> Optional[str]:
+        """
+        Our tag the client's If-None-Match names (weak comparison), or None
+
+        Prefers the tag of `coding`, the representation negotiated now;
+        otherwise the client revalidated a copy in another coding, and the
+        304 must carry that copy's tag.
+        """
+        if if_none_match.strip() == "*":
+            return self.etags[coding]
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if self.etags[coding] in tags:
+            return self.etags[coding]
+        return next((etag for etag in self.etags.values() if etag in tags), None)
+
+    def respond(self, request: Request) -> Response:
+        """304 if the client's copy is current, else the pre-encoded body"""
+        coding = self.choose_encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etags[coding],
+            "Cache-Control": f"public, max-age={SERVING_CONFIG['metadata_max_age_s']}",
+            "Vary": "Accept-Encoding"
+        }
+        if_none_match = request.headers.get("if-none-match")
+        matched = self.matched_etag(if_none_match, coding) if if_none_match else None
+        if matched is not None:
+            return Response(status_code=304, headers={**headers, "ETag": matched})
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(self.bodies[coding], media_type="application/json", headers=headers)
+
+
+class StaticResponseCache:
+    """Latest payload per endpoint, rebuilt only when its data version changes"""
+
+    def __init__(self):
+        self._payloads: Dict[str, StaticPayload] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, name: str, version: str, build: Callable[[], object]) -> StaticPayload:
+        """
+        Payload for `name` at `version`
+
+        Args:
+            build: Produces the JSON-ready content; called only on a version change
+        """
+        payload = self._payloads.get(name)
+        if payload is None or payload.version != version:
+            with self._lock:
+                payload = self._payloads.get(name)
+                if payload is None or payload.version != version:
+                    payload = StaticPayload(build(), version)
+                    self._payloads[name] = payload
+                    self.builds += 1
+        return payload
+
+
+# Global instance
+_static_responses: Optional[StaticResponseCache] = None
+_static_responses_lock = threading.Lock()
+
+
+def get_static_responses() -> StaticResponseCache:
+    """Get or create global static response cache instance"""
+    global _static_responses
+    if _static_responses is None:
+        with _static_responses_lock:
+            if _static_responses is None:
+                _static_responses = StaticResponseCache()
+    return _static_responses
@@ -0,0 +1,116 @@
+"""
+Upload Ingestion for SANJIVANI 2.0
+Reads image uploads in chunks under a byte cap, rejecting non-images
+and oversized photos from their header before anything is decoded
+"""
+from typing import Optional
+
+from fastapi import UploadFile
+from PIL import Image
+
+from ai.dataset_config_v2 import SERVING_CONFIG
+from ai.image_io import ImageBuffer, read_header, sniff_format
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_LIMIT = 256 * 1024  # Headers (incl. EXIF) normally fit well within this
+
+
+class UploadRejected(Exception):
+    """Upload is not an acceptable image; carries the HTTP status to return"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def check_image(data: ImageBuffer, complete: bool = True, max_pixels: Optional[int] = None) -> bool:
+    """
+    Validate an image from its leading bytes
+
+    Args:
+        data: The upload so far (or all of it)
+        complete: Whether `data` is the whole upload; a header that can't
+            be parsed is only an error once nothing more is coming
+        max_pixels: Pixel cap, defaults to SERVING_CONFIG["max_image_pixels"]
+
+    Returns:
+        True once the header has been read and checked, False if more
+        bytes are needed
+
+    Raises:
+        UploadRejected: 415 for non-images, 413 for too many pixels
+    """
+    max_pixels = max_pixels if max_pixels is not None else SERVING_CONFIG["max_image_pixels"]
+    if len(data) < 12 and not complete:
+        return False
+    if sniff_format(data) is None:
+        raise UploadRejected(415, "Unsupported file type. Please upload a JPEG, PNG, WebP, GIF or BMP image.")
+
+    try:
+        header = read_header(data)
+    except Image.DecompressionBombError as e:
+        # Too many pixels, like the byte cap: 413, not an unsupported type
+        raise UploadRejected(413, f"Image has too many pixels. {e}")
+    if header is None:
+        if complete:
+            raise UploadRejected(415, "Could not read image header. The file may be corrupt.")
+        return False
+
+    image_format, (width, height) = header
+    if width * height > max_pixels:
+        raise UploadRejected(
+            413,
+            f"Image is {width}x{height} ({width * height / 1e6:.1f} MP); "
+            f"the limit is {max_pixels / 1e6:.1f} MP."
+        )
+    return True
+
+
+async def read_upload(upload: UploadFile, max_bytes: Optional[int] = None) -> bytearray:
+    """
+    Read an upload into a single buffer, validating it as it arrives
+
+    The declared size is checked before reading, the running size after
+    every chunk, and the image header as soon as it has arrived, so a bad
+    upload is dropped after at most one chunk past the point it is known
+    to be bad. The result is one bytearray (preallocated when the size is
+    known) that decodes via a memoryview without further copies.
+    """
+    max_bytes = max_bytes if max_bytes is not None else SERVING_CONFIG["max_upload_bytes"]
+    too_large = UploadRejected(413, f"File too large. The limit is {max_bytes / 2**20:.0f} MB.")
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large
+
+    buffer = bytearray(upload.size or 0)
+    view = memoryview(buffer)
+    received = 0
+    header_checked = False
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            end = received + len(chunk)
+            if end > max_bytes:
+                raise too_large
+            if end <= len(buffer):
+                view[received:end] = chunk
+            else:
+                # Size unknown or under-declared: grow in place
+                view.release()
+                del buffer[received:]
+                buffer += chunk
+                view = memoryview(buffer)
+            received = end
+
+            if not header_checked and received <= SNIFF_LIMIT:
+                header_checked = check_image(view[:received], complete=False)
+    finally:
+        view.release()
+        await upload.close()
+
+    del buffer[received:]
+    if not header_checked:
+        check_image(buffer)
+    return buffer
@@ -0,0 +1,101 @@
+"""
+Fake LLM Server
+A local stand-in for the Gemini REST API (generateContent) with
+configurable latency, for exercising LLMClient without a network or key
+
+Replies "echo: <prompt>" after `latency_s` and records how many requests
+were served concurrently.
+
+Usage:
+    FakeLLMServer(latency_s=0.2).start() -> base URL for HTTPTransport / LLM_BASE_URL
+    python tests/fake_llm_server.py [--port 8001] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+class FakeLLMServer:
+    """Fake generateContent endpoint served by uvicorn in a background thread"""
+
+    def __init__(self, latency_s: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency_s = latency_s
+        self.host = host
+        self.port = port
+        self.active = 0
+        self.peak_active = 0
+        self.requests = 0
+        self.app = self._build_app()
+        self._server = None
+        self._thread = None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v1beta/models/{model}:generateContent")
+        async def generate_content(model: str, request: Request):
+            body = await request.json()
+            prompt = "".join(part.get("text", "") for part in body["contents"][-1]["parts"])
+            self.requests += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            try:
+                await asyncio.sleep(self.latency_s)
+            finally:
+                self.active -= 1
+            return {"candidates": [{"content": {"role": "model", "parts": [{"text": f"echo: {prompt}"}]}}]}
+
+        return app
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(self.app, log_level="warning", access_log=False, lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake LLM server did not start")
+            time.sleep(0.01)
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini generateContent server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before each reply")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(latency_s=args.latency, host=args.host, port=args.port)
+    print(f"🚀 Fake LLM server on {server.start()} ({args.latency:.2f}s latency); set LLM_BASE_URL to use it")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Unit Tests for the Pest Alert Index
+Tests filtering, radius search and cursor pagination against a linear scan
+"""
+import random
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from knowledge.alert_index import AlertIndex, haversine_km
+
+CROPS = ["Tomato", "Potato", "Corn", "Cotton", "Wheat"]
+SEVERITIES = ["Low", "Moderate", "High", "Critical"]
+REGIONS = ["Maharashtra", "Gujarat", "Karnataka", "Punjab"]
+
+
+def synthetic_alerts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    alerts = []
+    for i in range(count):
+        alert = {
+            "id": f"alert_{i:05d}",
+            "pest": "Armyworm",
+            "crop": rng.choice(CROPS),
+            "severity": rng.choice(SEVERITIES),
+            "region": rng.choice(REGIONS),
+            "date": (date(2025, 1, 1) + timedelta(days=rng.randrange(60))).isoformat(),
+        }
+        if rng.random() < 0.9:
+            alert["lat"], alert["lon"] = rng.uniform(8, 32), rng.uniform(68, 90)
+        alerts.append(alert)
+    return alerts
+
+
+class TestAlertIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.alerts = synthetic_alerts(2000)
+        cls.index = AlertIndex(cls.alerts, "test")
+
+    def _scan(self, predicate):
+        """Expected ids, newest first, by brute force"""
+        matching = [a for a in self.alerts if predicate(a)]
+        return [a["id"] for a in sorted(matching, key=lambda a: (-date.fromisoformat(a["date"]).toordinal(), a["id"]))]
+
+    def _all_pages(self, **kwargs):
+        ids, cursor = [], None
+        while True:
+            page = self.index.query(cursor=cursor, limit=37, **kwargs)
+            ids.extend(a["id"] for a in page["alerts"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return ids, page["total"]
+
+    def test_unfiltered_newest_first(self):
+        """Test the default page is the newest alerts with a total count"""
+        page = self.index.query(limit=10)
+        self.assertEqual([a["id"] for a in page["alerts"]], self._scan(lambda a: True)[:10])
+        self.assertEqual(page["total"], len(self.alerts))
+
+    def test_combined_filters_match_scan(self):
+        """Test crop, severity and since combine like a linear scan"""
+        since = date(2025, 2, 1)
+        ids, _ = self._all_pages(crops=["tomato", "Potato"], severities=["Critical"], since=since)
+        expected = self._scan(lambda a: a["crop"] in ("Tomato", "Potato") and a["severity"] == "Critical"
+                              and a["date"] >= since.isoformat())
+        self.assertEqual(ids, expected)
+        self.assertGreater(len(expected), 0)
+
+    def test_radius_matches_scan(self):
+        """Test the grid lookup finds exactly the alerts within the radius"""
+        lat, lon, radius = 19.0, 73.0, 250.0
+        ids, total = self._all_pages(near=(lat, lon, radius), regions=["Maharashtra"])
+
+        def within(a):
+            if "lat" not in a or a["region"] != "Maharashtra":
+                return False
+            return haversine_km(lat, lon, np.array([a["lat"]]), np.array([a["lon"]]))[0] <= radius
+
+        self.assertEqual(ids, self._scan(within))
+        self.assertEqual(total, len(ids))
+
+        page = self.index.query(near=(lat, lon, radius), limit=5)
+        self.assertTrue(all(a["distance_km"] <= radius for a in page["alerts"]))
+
+    def test_pagination_covers_every_alert_once(self):
+        """Test cursors walk the full result without gaps or repeats"""
+        ids, total = self._all_pages(severities=["High"])
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, self._scan(lambda a: a["severity"] == "High"))
+        self.assertEqual(total, len(ids))
+
+    def test_cursor_survives_reload(self):
+        """Test a cursor from one index version continues in the next"""
+        first = self.index.query(limit=10)
+        reloaded = AlertIndex(self.alerts[::-1], "reloaded")
+        second = reloaded.query(cursor=first["next_cursor"], limit=10)
+        self.assertEqual([a["id"] for a in second["alerts"]], self._scan(lambda a: True)[10:20])
+
+    def test_unknown_values_and_bad_cursor(self):
+        """Test unmatched filters return an empty page and malformed cursors raise"""
+        self.assertEqual(self.index.query(crops=["Banana"])["alerts"], [])
+        with self.assertRaises(ValueError):
+            self.index.query(cursor="not-a-cursor")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -28,3 +28,253 @@ async def test_weather_endpoint_fallback(client: AsyncClient):
     data = response.json()
     assert data["success"] is True
     assert "temperature" in data["data"]
+
+def _jpeg_bytes(color):
+    from PIL import Image
+    import io
+    byte_io = io.BytesIO()
+    Image.new('RGB', (320, 240), color=color).save(byte_io, 'JPEG')
+    return byte_io.getvalue()
+
+@pytest.mark.asyncio
+async def test_predict_reupload_is_cached(client: AsyncClient):
+    image = _jpeg_bytes((120, 160, 40))
+    files = {"file": ("leaf.jpg", image, "image/jpeg")}
+
+    first = await client.post("/api/v2/predict", files=files)
+    assert first.status_code == 200
+    assert first.json()["cached"] is False
+
+    second = await client.post("/api/v2/predict", files=files)
+    assert second.status_code == 200
+    assert second.json()["cached"] is True
+    assert second.json()["disease_key"] == first.json()["disease_key"]
+
+    stats = (await client.get("/api/v2/model/cache")).json()
+    assert stats["hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_predict_batch_streams_ndjson(client: AsyncClient):
+    import io
+    import json
+    import zipfile
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("field/a.jpg", _jpeg_bytes((30, 140, 60)))
+        zf.writestr("field/b.jpg", _jpeg_bytes((90, 90, 20)))
+        zf.writestr("field/notes.txt", b"not an image")
+
+    files = [
+        ("files", ("leaf.jpg", _jpeg_bytes((10, 200, 10)), "image/jpeg")),
+        ("files", ("field.zip", archive.getvalue(), "application/zip")),
+    ]
+    response = await client.post("/api/v2/predict/batch", files=files)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    items, summary = lines[:-1], lines[-1]["summary"]
+    assert sorted(item["index"] for item in items) == [0, 1, 2, 3]
+    assert summary["total"] == 4
+    assert summary["failed"] == 1
+    by_name = {item["filename"]: item for item in items}
+    assert "error" in by_name["field/notes.txt"]
+    assert by_name["field/a.jpg"]["result"]["crop"]
+
+
+@pytest.mark.asyncio
+async def test_predict_batch_corrupt_zip_member(client: AsyncClient):
+    import io
+    import json
+    import zipfile
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("a.jpg", _jpeg_bytes((30, 140, 60)))
+        zf.writestr("b.jpg", _jpeg_bytes((90, 90, 20)))
+    data = bytearray(archive.getvalue())
+    with zipfile.ZipFile(io.BytesIO(bytes(data))) as zf:
+        member = zf.getinfo("b.jpg")
+    data[member.header_offset + 30 + len("b.jpg") + 100] ^= 0xFF  # Corrupt b.jpg's body: CRC mismatch
+
+    files = [("files", ("field.zip", bytes(data), "application/zip"))]
+    response = await client.post("/api/v2/predict/batch", files=files)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_name = {item["filename"]: item for item in lines[:-1]}
+    assert "CRC" in by_name["b.jpg"]["error"]
+    assert by_name["a.jpg"]["result"]["crop"]
+    assert lines[-1]["summary"] == {**lines[-1]["summary"], "total": 2, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_predict_batch_sheds_when_busy(client: AsyncClient):
+    import json
+    from unittest import mock
+    from ai.dataset_config_v2 import SERVING_CONFIG
+    from ai.executor import InferenceQueueFull, get_inference_executor
+
+    files = [("files", (f"{i}.jpg", _jpeg_bytes((20 * i, 120, 40)), "image/jpeg")) for i in range(2)]
+    busy = mock.AsyncMock(side_effect=InferenceQueueFull("full"))
+    with mock.patch.dict(SERVING_CONFIG, {"batch_busy_wait_s": 0.2}), \
+         mock.patch.object(get_inference_executor(), "predict_batch", busy):
+        response = await client.post("/api/v2/predict/batch", files=files)
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["error"] for item in lines[:-1]] == ["Server busy", "Server busy"]
+    assert lines[-1]["summary"]["failed"] == 2
+    assert 2 <= busy.await_count <= 5  # 50, 100, then the remaining 50 ms: backing off, not polling
+
+
+@pytest.mark.asyncio
+async def test_predict_reports_batching_metadata(client: AsyncClient):
+    files = {"file": ("leaf.jpg", _jpeg_bytes((70, 130, 90)), "image/jpeg")}
+    response = await client.post("/api/v2/predict", files=files)
+    assert response.status_code == 200
+    metadata = response.json()["metadata"]
+    assert metadata["batch_size"] >= 1
+    assert metadata["queue_wait_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_predict_body_matches_schema(client: AsyncClient, monkeypatch):
+    from schemas.prediction import PredictionMetadata, PredictionResponse
+    from ai.batch_scheduler import get_batch_scheduler
+
+    submit = get_batch_scheduler().submit
+
+    async def submit_with_extra(image_bytes):
+        prediction = await submit(image_bytes)
+        prediction["metadata"]["debug_only"] = "internal"  # Undeclared: must not reach clients
+        return prediction
+
+    monkeypatch.setattr(get_batch_scheduler(), "submit", submit_with_extra)
+    files = {"file": ("leaf.jpg", _jpeg_bytes((150, 60, 110)), "image/jpeg")}
+    body = (await client.post("/api/v2/predict", files=files)).json()
+
+    PredictionResponse.model_validate(body)
+    assert set(body) <= set(PredictionResponse.model_fields)
+    assert set(body["metadata"]) <= set(PredictionMetadata.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_predict_rejects_non_image(client: AsyncClient):
+    files = {"file": ("notes.txt", b"not an image at all", "text/plain")}
+    response = await client.post("/api/v2/predict", files=files)
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_admin_requires_key(client: AsyncClient, monkeypatch):
+    import api.deps
+
+    monkeypatch.setattr(api.deps, "ADMIN_API_KEY", None)
+    assert (await client.get("/api/v2/admin/models")).status_code == 403
+
+    monkeypatch.setattr(api.deps, "ADMIN_API_KEY", "secret")
+    assert (await client.get("/api/v2/admin/models", headers={"X-Admin-Key": "wrong"})).status_code == 401
+
+    response = await client.get("/api/v2/admin/models", headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 200
+    assert response.json()["swap"]["state"] == "idle"
+
+    response = await client.post("/api/v2/admin/models/9.9.9/activate", headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_liveness_and_readiness(client: AsyncClient):
+    assert (await client.get("/api/v2/live")).json() == {"status": "alive"}
+    response = await client.get("/api/v2/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+@pytest.mark.asyncio
+async def test_search_answers_locally(client: AsyncClient):
+    # A clear symptom query is answered from the local index, typo included
+    response = await client.post("/api/v2/search/ai", json={"query": "concentric rigns on tomato"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["provider"] == "Local index"
+    assert data["matches"][0]["id"] == "Early_Blight"
+    assert data["matches"][0]["relevance"] == "High"
+
+@pytest.mark.asyncio
+async def test_knowledge_snapshots_served(client: AsyncClient):
+    health = (await client.get("/api/v2/health")).json()
+    assert set(health["knowledge_files"]) == {"disease_knowledge", "crop_calendar", "pest_alerts"}
+    assert health["knowledge_files"]["disease_knowledge"]["version"] == health["knowledge_version"]
+
+    calendar = (await client.get("/api/v2/meta/calendar")).json()
+    assert "crops" in calendar
+    alerts = (await client.get("/api/v2/alerts/pests")).json()
+    assert alerts["count"] == len(alerts["alerts"])
+
+@pytest.mark.asyncio
+async def test_metadata_conditional_get(client: AsyncClient):
+    for path in ("/api/v2/meta/crops", "/api/v2/meta/diseases", "/api/v2/meta/calendar", "/api/v2/alerts/pests"):
+        response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "max-age" in response.headers["cache-control"]
+        assert response.json()
+
+        revalidated = await client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+@pytest.mark.asyncio
+async def test_pest_alert_filters(client: AsyncClient):
+    response = await client.get("/api/v2/alerts/pests", params={"crop": "Cotton,Corn", "limit": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1 and data["total"] == 2
+    assert data["alerts"][0]["crop"] in ("Cotton", "Corn")
+
+    nxt = await client.get("/api/v2/alerts/pests", params={"crop": "Cotton,Corn", "limit": 1, "cursor": data["next_cursor"]})
+    assert nxt.json()["next_cursor"] is None
+    assert nxt.json()["alerts"][0]["id"] != data["alerts"][0]["id"]
+
+    nearby = await client.get("/api/v2/alerts/pests", params={"lat": 19.99, "lon": 73.78, "radius_km": 50})
+    assert [a["id"] for a in nearby.json()["alerts"]] == ["alert_001"]
+
+    assert (await client.get("/api/v2/alerts/pests", params={"lat": 19.99})).status_code == 400
+    assert (await client.get("/api/v2/alerts/pests", params={"cursor": "%%%"})).status_code == 400
+
+@pytest.mark.asyncio
+async def test_calendar_month_slice(client: AsyncClient):
+    response = await client.get("/api/v2/meta/calendar/month", params={"month": "jun", "phase": "sowing"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["month"] == "June"
+    assert set(data) == {"month", "sowing"}
+    assert "Cotton" in [entry["crop"] for entry in data["sowing"]]
+
+    assert (await client.get("/api/v2/meta/calendar/month", params={"month": "13"})).status_code == 400
+    assert (await client.get("/api/v2/meta/calendar/month", params={"crop": "Banana"})).status_code == 404
+
+    season = (await client.get("/api/v2/meta/calendar/seasons/kharif")).json()
+    assert season["season"] == "Kharif" and season["crops"]
+
+@pytest.mark.asyncio
+async def test_explain_reports_cache(client: AsyncClient):
+    from unittest import mock
+    from ai.llm_client import LLMClient
+    from services.llm_cache import LLMCache
+
+    transport = mock.Mock()
+    transport.generate = mock.AsyncMock(return_value="Concentric rings point to Early Blight.")
+    generate = transport.generate
+    body = {"disease": "Early_Blight", "confidence": 0.93, "crop": "Tomato"}
+    with mock.patch("services.llm_cache._llm_cache", LLMCache(max_entries=8, ttl_seconds=60, path="")), \
+         mock.patch("ai.llm_client._llm_client", LLMClient(transport, max_concurrency=1, max_queue=0, timeout_s=5)):
+        first = (await client.post("/api/v2/chat/explain", json=body)).json()
+        second = (await client.post("/api/v2/chat/explain", json={**body, "disease": "early blight", "confidence": 0.95})).json()
+        stats = (await client.get("/api/v2/llm/client")).json()
+
+    assert first["cached"] is False and first["cache"]["status"] == "miss"
+    assert second["cached"] is True and second["cache"]["tier"] == "memory"
+    assert second["explanation"] == first["explanation"]
+    assert generate.call_count == 1
+    assert stats["total_calls"] == 1 and stats["in_flight"] == 0
@@ -0,0 +1,101 @@
+"""
+Unit Tests for Model Serving Backends
+Tests that the compiled Keras and TFLite paths agree with model.predict
+"""
+import unittest
+import tempfile
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import tensorflow as tf
+from ai.backends import KerasBackend, TFLiteBackend, batch_buckets
+from ai.quantization import compare_variants, convert_tflite, representative_dataset
+from ai.dataset_config_v2 import MODEL_CONFIG
+
+
+class TestBackends(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Save a tiny model with the production input/output shape"""
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        inputs = tf.keras.Input(shape=MODEL_CONFIG["input_size"])
+        x = tf.keras.layers.Conv2D(4, 3, strides=8)(inputs)
+        x = tf.keras.layers.GlobalAveragePooling2D()(x)
+        outputs = tf.keras.layers.Dense(MODEL_CONFIG["num_classes"], activation="softmax")(x)
+        cls.model = tf.keras.Model(inputs, outputs)
+
+        cls.h5_path = Path(cls.tmp_dir.name) / "plant_disease_v2.h5"
+        cls.model.save(str(cls.h5_path))
+        converter = tf.lite.TFLiteConverter.from_keras_model(cls.model)
+        cls.h5_path.with_suffix(".tflite").write_bytes(converter.convert())
+
+        cls.batch = np.random.random((3, *MODEL_CONFIG["input_size"])).astype(np.float32)
+        cls.expected = cls.model.predict(cls.batch, verbose=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_batch_buckets(self):
+        """Test bucket sizes are powers of two capped at the max batch"""
+        self.assertEqual(batch_buckets(1), [1])
+        self.assertEqual(batch_buckets(8), [1, 2, 4, 8])
+        self.assertEqual(batch_buckets(6), [1, 2, 4, 6])
+
+    def test_compiled_keras_matches_predict(self):
+        """Test the tf.function forward pass gives model.predict's output"""
+        backend = KerasBackend(str(self.h5_path), compiled=True, max_batch_size=4)
+        backend.load()
+        np.testing.assert_allclose(backend.predict(self.batch), self.expected, atol=1e-5)
+
+    def test_tflite_matches_keras(self):
+        """Test pooled TFLite interpreters give the Keras output"""
+        backend = TFLiteBackend(str(self.h5_path.with_suffix(".tflite")), pool_size=2)
+        backend.load()
+        probs = backend.predict(self.batch)
+
+        self.assertEqual(probs.shape, self.expected.shape)
+        np.testing.assert_allclose(probs, self.expected, atol=1e-4)
+
+    def test_predict_after_unload_raises(self):
+        """Test an unloaded backend fails fast instead of waiting on an empty pool"""
+        for backend in (TFLiteBackend(str(self.h5_path.with_suffix(".tflite")), pool_size=1), KerasBackend(str(self.h5_path))):
+            backend.load()
+            backend.unload()
+            with self.assertRaises(RuntimeError):
+                backend.predict(self.batch)
+
+    def test_int8_tflite_dequantizes_outputs(self):
+        """Test a full-integer model is served with float inputs and outputs"""
+        calibration = representative_dataset([self.batch] * 10, num_samples=20)
+        content = convert_tflite(self.model, "int8", calibration)
+        int8_path = Path(self.tmp_dir.name) / "plant_disease_v2.int8.tflite"
+        int8_path.write_bytes(content)
+
+        backend = TFLiteBackend(str(int8_path), pool_size=1)
+        backend.load()
+        self.assertEqual(backend._pool.queue[0].input_dtype, np.int8)
+        probs = backend.predict(self.batch)
+
+        self.assertEqual(probs.dtype, np.float32)
+        np.testing.assert_allclose(probs, self.expected, atol=0.05)
+
+    def test_compare_variants_report(self):
+        """Test the quantization report covers every variant"""
+        calibration = representative_dataset([self.batch], num_samples=3)
+        variants = {mode: convert_tflite(self.model, mode, calibration) for mode in ("float", "dynamic", "int8")}
+        labels = self.expected.argmax(axis=1)
+        report = compare_variants(self.model, variants, self.batch, labels, keras_size_mb=1.0, latency_runs=5)
+
+        self.assertEqual(set(report), {"keras_float", "tflite_float", "tflite_dynamic", "tflite_int8"})
+        self.assertEqual(report["keras_float"]["accuracy"], 1.0)
+        self.assertEqual(report["tflite_float"]["agreement"], 1.0)
+        self.assertGreaterEqual(report["tflite_int8"]["p99_ms"], report["tflite_int8"]["p50_ms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
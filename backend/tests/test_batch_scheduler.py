@@ -0,0 +1,100 @@
+"""
+Unit Tests for the Micro-batching Scheduler
+Tests request coalescing, batch limits and per-caller metadata
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ai.batch_scheduler import BatchScheduler
+from ai.executor import InferenceExecutor, InferenceQueueFull
+
+
+class FakeExecutor:
+    """Records batch sizes instead of running a model"""
+    capacity = 4
+
+    def __init__(self):
+        self.batches = []
+
+    async def predict_batch(self, images, return_exceptions=False):
+        self.batches.append(len(images))
+        results = []
+        for image in images:
+            if image == b"bad":
+                results.append(ValueError("cannot identify image file"))
+            else:
+                results.append({"disease_key": image.decode(), "metadata": {}})
+        return results
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    executor = FakeExecutor()
+    scheduler = BatchScheduler(executor=executor, max_batch_size=8, max_batch_wait_ms=50)
+
+    results = await asyncio.gather(*(scheduler.submit(f"img{i}".encode()) for i in range(5)))
+    await scheduler.close()
+
+    assert executor.batches == [5]
+    assert [r["disease_key"] for r in results] == [f"img{i}" for i in range(5)]
+    for r in results:
+        assert r["metadata"]["batch_size"] == 5
+        assert r["metadata"]["queue_wait_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_batch_size_is_capped():
+    executor = FakeExecutor()
+    scheduler = BatchScheduler(executor=executor, max_batch_size=3, max_batch_wait_ms=50)
+
+    await asyncio.gather(*(scheduler.submit(b"x") for _ in range(7)))
+    await scheduler.close()
+
+    assert executor.batches == [3, 3, 1]
+    assert scheduler.get_stats()["total_batches"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_image_does_not_fail_batch():
+    executor = FakeExecutor()
+    scheduler = BatchScheduler(executor=executor, max_batch_size=4, max_batch_wait_ms=50)
+
+    results = await asyncio.gather(
+        scheduler.submit(b"good"),
+        scheduler.submit(b"bad"),
+        return_exceptions=True
+    )
+    await scheduler.close()
+
+    assert results[0]["disease_key"] == "good"
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_undispatched_callers():
+    executor = FakeExecutor()
+    scheduler = BatchScheduler(executor=executor, max_batch_size=2, max_batch_wait_ms=10_000)
+
+    # One caller in the batch being collected, one still queued behind a full batch
+    callers = [asyncio.create_task(scheduler.submit(f"img{i}".encode())) for i in range(3)]
+    await asyncio.sleep(0.05)
+    await scheduler.close()
+    results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), 1)
+
+    assert [r["disease_key"] for r in results[:2]] == ["img0", "img1"]
+    assert isinstance(results[2], asyncio.CancelledError)
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_when_full():
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=0)
+    executor._in_flight = executor.capacity
+
+    with pytest.raises(InferenceQueueFull):
+        await executor.predict_batch([b"x"])
+    assert executor.get_stats()["total_rejected"] == 1
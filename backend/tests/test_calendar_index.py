@@ -0,0 +1,87 @@
+"""
+Unit Tests for the Crop Calendar Index
+Tests month parsing and the sowing / growing / harvest layout of crop stages
+"""
+import unittest
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from knowledge.calendar_index import CalendarIndex, parse_month
+
+CALENDAR = {
+    "crops": {
+        "Wheat": {
+            "sowing_windows": [{"season": "Rabi", "months": ["November"]}],
+            "duration_days": 150,
+            "stages": [
+                {"name": "Crown Root", "days": 30},
+                {"name": "Tillering", "days": 60},
+                {"name": "Ripening", "days": 60}
+            ]
+        },
+        "Tomato": {
+            "sowing_windows": [
+                {"season": "Kharif", "months": ["June", "July"]},
+                {"season": "Rabi", "months": ["October"]}
+            ],
+            "duration_days": 60,
+            "stages": [
+                {"name": "Vegetative", "days": 30},
+                {"name": "Harvest", "days": 30}
+            ]
+        }
+    }
+}
+
+
+class TestCalendarIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = CalendarIndex(CALENDAR, "test")
+
+    def _crops(self, month, phase, **kwargs):
+        return [entry["crop"] for entry in self.index.query(parse_month(month), phase=phase, **kwargs)[phase]]
+
+    def test_parse_month(self):
+        """Test numbers, names and abbreviations are accepted"""
+        self.assertEqual(parse_month("6"), 5)
+        self.assertEqual(parse_month("June"), 5)
+        self.assertEqual(parse_month(" jun "), 5)
+        for bad in ("13", "0", "Juneteenth"):
+            with self.assertRaises(ValueError):
+                parse_month(bad)
+
+    def test_phases_wrap_year_end(self):
+        """Test a November sowing grows over the new year and is harvested in spring"""
+        self.assertEqual(self._crops("November", "sowing"), ["Wheat"])
+        self.assertEqual(self._crops("January", "growing"), ["Wheat"])
+        self.assertEqual(self._crops("March", "harvest"), ["Wheat"])
+        self.assertEqual(self._crops("June", "growing"), [])
+
+    def test_sowing_window_spans_harvests(self):
+        """Test each sowing month of a window contributes harvest months"""
+        entry = self.index.query(parse_month("June"), crop="Tomato", phase="sowing")["sowing"][0]
+        self.assertEqual(entry["harvest_months"], ["July", "August"])
+        self.assertEqual(self._crops("July", "harvest"), ["Tomato"])
+        self.assertEqual(entry["stages"], ["Vegetative"])
+
+    def test_crop_and_season_filters(self):
+        """Test filters narrow the slice to one crop and season"""
+        october = self.index.query(parse_month("October"), season="Rabi")
+        self.assertEqual([e["crop"] for e in october["sowing"]], ["Tomato"])
+        self.assertEqual([e["crop"] for e in october["harvest"]], [])
+        self.assertEqual(self._crops("October", "sowing", crop="Wheat"), [])
+        self.assertEqual(self.index.resolve_crop("tomato"), "Tomato")
+        self.assertIsNone(self.index.resolve_season("Zaid"))
+
+    def test_season_crops(self):
+        """Test the season lookup lists every crop sown in it"""
+        self.assertEqual(self.index.season_crops("Kharif"), [{"crop": "Tomato", "sowing_months": ["June", "July"]}])
+        self.assertEqual([c["crop"] for c in self.index.season_crops("Rabi")], ["Wheat", "Tomato"])
+
+
+if __name__ == '__main__':
+    unittest.main()
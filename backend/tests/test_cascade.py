@@ -0,0 +1,145 @@
+"""
+Unit Tests for the Small/Full Model Cascade
+Tests threshold selection, early exit vs escalation and small-model discovery at load time
+"""
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from PIL import Image
+
+from ai.cascade import choose_threshold, small_model_path
+from ai.dataset_config_v2 import MODEL_CONFIG, SERVING_CONFIG
+from ai.inference_engine import InferenceEngine, LoadedModel
+
+NUM_CLASSES = MODEL_CONFIG["num_classes"]
+
+
+class FixedBackend:
+    """Answers class `label` with a fixed confidence and counts the images it sees"""
+
+    def __init__(self, name: str, label: int, confidence: float):
+        self.name = name
+        self.label = label
+        self.confidence = confidence
+        self.images_seen = 0
+
+    def predict(self, batch):
+        self.images_seen += len(batch)
+        probs = np.full((len(batch), NUM_CLASSES), (1 - self.confidence) / (NUM_CLASSES - 1), dtype=np.float32)
+        probs[:, self.label] = self.confidence
+        return probs
+
+    def unload(self):
+        pass
+
+
+def _one_hot_probs(predicted, confidence):
+    probs = np.full((len(predicted), 3), 0.0, dtype=np.float32)
+    probs[np.arange(len(predicted)), predicted] = confidence
+    return probs
+
+
+class TestChooseThreshold(unittest.TestCase):
+
+    def test_lowest_threshold_meeting_target(self):
+        """Test the chosen threshold exits early as often as the target allows"""
+        labels = np.array([0, 1, 2, 0])
+        # The small model is right when confident (0.95, 0.9), wrong when unsure (0.6, 0.5)
+        small = _one_hot_probs(np.array([0, 1, 0, 1]), np.array([0.95, 0.9, 0.6, 0.5]))
+        large = _one_hot_probs(labels, np.ones(4))
+
+        result = choose_threshold(small, large, labels, target_accuracy=1.0)
+        self.assertAlmostEqual(result["threshold"], 0.9, places=5)
+        self.assertEqual(result["accuracy"], 1.0)
+        self.assertEqual(result["escalation_rate"], 0.5)
+        self.assertEqual(result["small_accuracy"], 0.5)
+
+    def test_unreachable_target(self):
+        """Test no threshold is returned when even full escalation misses the target"""
+        labels = np.array([0, 1])
+        small = _one_hot_probs(np.array([1, 0]), np.array([0.9, 0.9]))
+        large = _one_hot_probs(np.array([0, 0]), np.ones(2))
+
+        result = choose_threshold(small, large, labels, target_accuracy=0.9)
+        self.assertIsNone(result["threshold"])
+        self.assertEqual(result["escalation_rate"], 1.0)
+
+
+class TestCascadeRouting(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        buf = io.BytesIO()
+        Image.new("RGB", (300, 300), color=(30, 140, 50)).save(buf, "JPEG")
+        cls.image = buf.getvalue()
+
+    def _engine(self, small, full, threshold=0.8) -> InferenceEngine:
+        engine = InferenceEngine(load=False)
+        engine.active = LoadedModel(backend=full, small_backend=small, cascade_threshold=threshold)
+        engine.ready.set()
+        return engine
+
+    def test_confident_small_model_answers(self):
+        """Test the full model is skipped when the small model is confident"""
+        small, full = FixedBackend("small", 1, 0.95), FixedBackend("full", 2, 0.99)
+        engine = self._engine(small, full)
+        result = engine.predict(self.image)
+
+        self.assertEqual(full.images_seen, 0)
+        self.assertEqual(result["metadata"]["cascade_stage"], "small")
+        self.assertAlmostEqual(result["confidence"], 0.95, places=5)
+        self.assertEqual(engine.cascade_stats, {"small": 1, "full": 0})
+
+    def test_unsure_small_model_escalates(self):
+        """Test rows under the threshold are answered by the full model"""
+        small, full = FixedBackend("small", 1, 0.5), FixedBackend("full", 2, 0.99)
+        engine = self._engine(small, full)
+        results = engine.predict_batch([self.image, self.image])
+
+        self.assertEqual(full.images_seen, 2)
+        self.assertEqual([r["metadata"]["cascade_stage"] for r in results], ["full", "full"])
+        self.assertAlmostEqual(results[0]["confidence"], 0.99, places=5)
+        self.assertEqual(engine.cascade_stats["full"], 2)
+
+
+class TestCascadeLoading(unittest.TestCase):
+
+    def test_small_model_loaded_alongside(self):
+        """Test _load picks up plant_disease_v2_small.h5 and the tuned threshold"""
+        import tensorflow as tf
+
+        def save(path):
+            inputs = tf.keras.Input(shape=MODEL_CONFIG["input_size"])
+            x = tf.keras.layers.GlobalAveragePooling2D()(inputs)
+            tf.keras.Model(inputs, tf.keras.layers.Dense(NUM_CLASSES, activation="softmax")(x)).save(str(path))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            h5_path = Path(tmp) / "plant_disease_v2.h5"
+            save(h5_path)
+            save(small_model_path(h5_path))
+            (Path(tmp) / "model_metadata.json").write_text(json.dumps({"cascade": {"threshold": 0.77}}))
+
+            engine = InferenceEngine(load=False)
+            with mock.patch.dict(SERVING_CONFIG, {"cascade": True, "cascade_threshold": None, "inference_backend": "keras"}):
+                loaded = engine._load(str(h5_path))
+            self.assertIsNotNone(loaded.small_backend)
+            self.assertEqual(loaded.cascade_threshold, 0.77)
+
+            # A configured 0 is a real threshold, not "unset"
+            with mock.patch.dict(SERVING_CONFIG, {"cascade": True, "cascade_threshold": 0.0, "inference_backend": "keras"}):
+                self.assertEqual(engine._load(str(h5_path)).cascade_threshold, 0.0)
+
+            with mock.patch.dict(SERVING_CONFIG, {"cascade": False, "inference_backend": "keras"}):
+                self.assertIsNone(engine._load(str(h5_path)).small_backend)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,8 +9,8 @@ import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from ai.inference_engine import InferenceEngine
-from ai.dataset_config import CLASS_NAMES, MODEL_CONFIG
+from ai.inference_engine import InferenceEngine, ModelNotReady, top_k
+from ai.dataset_config_v2 import CLASS_NAMES, MODEL_CONFIG, get_disease_from_class
 
 
 class TestInferenceEngine(unittest.TestCase):
@@ -24,7 +24,7 @@ class TestInferenceEngine(unittest.TestCase):
         """Test that engine initializes correctly"""
         self.assertIsNotNone(self.engine)
         self.assertIsNotNone(self.engine)
-        # self.assertEqual(len(self.engine.inference_times), 0) # Warmup might populate this
+        # self.assertEqual(self.engine.latency.count("inference"), 0) # Warmup might populate this
     
     def test_model_config(self):
         """Test model configuration is correct"""
@@ -52,6 +52,41 @@ class TestInferenceEngine(unittest.TestCase):
         self.assertTrue(np.all(processed >= 0))
         self.assertTrue(np.all(processed <= 1))
     
+    def test_preprocessing_fills_preallocated_buffer(self):
+        """Test preprocessing writes into a caller-supplied float32 buffer"""
+        from PIL import Image
+        import io
+        
+        img = Image.new('RGB', (4000, 3000), color=(255, 0, 0))
+        byte_io = io.BytesIO()
+        img.save(byte_io, 'JPEG')
+        
+        buffer = np.zeros((1, 224, 224, 3), dtype=np.float32)
+        processed = self.engine.preprocess_image(byte_io.getvalue(), out=buffer)
+        
+        self.assertIs(processed, buffer)
+        self.assertGreater(buffer[0, :, :, 0].mean(), 0.9)
+        self.assertLess(buffer[0, :, :, 2].mean(), 0.1)
+    
+    def test_preprocessing_applies_exif_orientation(self):
+        """Test sideways phone photos are rotated upright"""
+        from PIL import Image
+        import io
+        
+        # Left half black, right half white, stored rotated 90 degrees
+        img = Image.new('RGB', (600, 300), color='black')
+        img.paste((255, 255, 255), (300, 0, 600, 300))
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 CW to display
+        byte_io = io.BytesIO()
+        img.save(byte_io, 'JPEG', exif=exif.tobytes())
+        
+        processed = self.engine.preprocess_image(byte_io.getvalue())[0]
+        
+        # After rotating 90 CW the white half ends up at the bottom
+        self.assertLess(processed[:100].mean(), 0.1)
+        self.assertGreater(processed[-100:].mean(), 0.9)
+    
     def test_prediction_structure(self):
         """Test that prediction returns correct structure"""
         # Create dummy image
@@ -110,10 +145,10 @@ class TestInferenceEngine(unittest.TestCase):
         img.save(byte_io, 'JPEG')
         img_bytes = byte_io.getvalue()
         
-        initial_count = len(self.engine.inference_times)
+        initial_count = self.engine.latency.count("inference")
         self.engine.predict(img_bytes)
         
-        self.assertEqual(len(self.engine.inference_times), initial_count + 1)
+        self.assertEqual(self.engine.latency.count("inference"), initial_count + 1)
     
     def test_get_performance_stats(self):
         """Test performance statistics calculation"""
@@ -137,6 +172,49 @@ class TestInferenceEngine(unittest.TestCase):
         self.assertEqual(info['class_count'], len(CLASS_NAMES))
         self.assertEqual(info['classes'], CLASS_NAMES)
 
+    
+    def test_top_k_matches_full_sort(self):
+        """Test argpartition top-k returns the same classes as a full descending sort"""
+        probs = np.random.default_rng(0).random((16, len(CLASS_NAMES))).astype(np.float32)
+        indices, values = top_k(probs, 3)
+        
+        np.testing.assert_array_equal(indices, np.argsort(-probs, axis=1)[:, :3])
+        np.testing.assert_array_equal(values, np.take_along_axis(probs, indices, axis=1))
+    
+    def test_batch_decoding(self):
+        """Test batch decoding maps each row to its own top class and alternatives"""
+        probs = np.full((2, len(CLASS_NAMES)), 0.001, dtype=np.float32)
+        probs[0, [0, 5, 9]] = [0.7, 0.2, 0.05]
+        probs[1, [3, 1, 2]] = [0.9, 0.06, 0.03]
+        
+        first, second = self.engine._decode_predictions(probs)
+        self.assertEqual(first["disease_key"], get_disease_from_class(CLASS_NAMES[0]))
+        self.assertEqual(first["disease"], first["disease_key"].replace("_", " ").title())
+        self.assertAlmostEqual(first["confidence"], 0.7, places=5)
+        self.assertEqual([alt["disease"] for alt in first["alternatives"]],
+                         [get_disease_from_class(CLASS_NAMES[5]), get_disease_from_class(CLASS_NAMES[9])])
+        self.assertEqual(second["disease_key"], get_disease_from_class(CLASS_NAMES[3]))
+        self.assertIsInstance(second["confidence"], float)
+    
+    def test_deferred_load_gates_predictions(self):
+        """Test an engine created with load=False refuses predictions until loaded"""
+        engine = InferenceEngine(load=False)
+        self.assertEqual(engine.state, "loading")
+        with self.assertRaises(ModelNotReady):
+            engine.predict(b"")
+        
+        engine.load_model()
+        self.assertEqual(engine.state, "ready")
+        self.assertIsNotNone(engine.load_time_ms)
+    
+    def test_import_does_not_load_tensorflow(self):
+        """Test importing the app leaves TensorFlow for the background loader"""
+        import subprocess
+        code = "import sys, main; print('tensorflow' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,6 +2,7 @@
 Unit Tests for Knowledge Engine
 Tests disease information retrieval and mapping logic
 """
+import json
 import unittest
 import sys
 from pathlib import Path
@@ -9,6 +10,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from knowledge.knowledge_engine import KnowledgeEngine
+from schemas.prediction import PredictionResponse
 
 
 class TestKnowledgeEngine(unittest.TestCase):
@@ -91,6 +93,36 @@ class TestKnowledgeEngine(unittest.TestCase):
             # Hindi version should have localized name
             self.assertIn('name_localized', response_hi)
     
+    def test_fragment_matches_schema_serialization(self):
+        """Test a rendered fragment is the same JSON the Pydantic response would produce"""
+        dynamic = {
+            "crop": "Tomato",
+            "confidence": 0.94,
+            "alternatives": [{"disease": "Late_Blight", "confidence": 0.04}],
+            "metadata": {"model_version": "2.0.0", "inference_time_ms": 12.5, "model_architecture": "MobileNetV2"},
+            "cached": False
+        }
+        fragment = self.engine.get_response_fragment("Early_Blight", "en")
+        reference = PredictionResponse(**fragment.fields, **dynamic).model_dump(mode="json")
+        rendered = json.loads(fragment.render(dynamic))
+        
+        # Pydantic fills in unset optional metadata fields; nothing else may differ
+        reference["metadata"] = {k: v for k, v in reference["metadata"].items() if v is not None}
+        self.assertEqual(rendered, reference)
+    
+    def test_uncertain_fragment(self):
+        """Test the low-confidence fragment suppresses treatments and severity"""
+        fragment = self.engine.get_response_fragment("Early_Blight", "en", uncertain=True)
+        self.assertEqual(fragment.fields["severity"], "Low")
+        self.assertTrue(fragment.fields["explanation"].startswith("⚠️ Low Confidence Risk"))
+        self.assertIn("Consult", fragment.fields["recommended_actions"]["immediate"][0])
+    
+    def test_fragment_language_fallback(self):
+        """Test unknown languages use the English fragment and unknown diseases have none"""
+        self.assertIs(self.engine.get_response_fragment("Early_Blight", "xx"),
+                      self.engine.get_response_fragment("Early_Blight", "en"))
+        self.assertIsNone(self.engine.get_response_fragment("Unknown_Disease", "en"))
+    
     def test_unknown_disease(self):
         """Test handling of unknown disease"""
         response = self.engine.map_prediction_to_response(
@@ -0,0 +1,155 @@
+"""
+Unit Tests for the Knowledge File Loader
+Tests change detection, validation, atomic swaps and reload hooks
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from knowledge.knowledge_engine import KnowledgeEngine
+from knowledge.loader import KNOWLEDGE_DIR, KnowledgeLoader
+
+
+class TestKnowledgeLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        for name in ("disease_knowledge.json", "crop_calendar.json", "pest_alerts.json"):
+            shutil.copy(KNOWLEDGE_DIR / name, self.tmp)
+        self.loader = KnowledgeLoader(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _write(self, name: str, data, bump_ns: int = 10**9):
+        """Rewrite a knowledge file and move its mtime forward so the change is seen"""
+        path = Path(self.tmp) / f"{name}.json"
+        stat = path.stat()
+        path.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+
+    def test_initial_load(self):
+        """Test every file is loaded and versioned at construction"""
+        for name in ("disease_knowledge", "crop_calendar", "pest_alerts"):
+            self.assertIsNotNone(self.loader.get(name), name)
+        self.assertEqual(self.loader.get("pest_alerts").version, "unversioned")
+        self.assertEqual(self.loader.reload(), [])
+
+    def test_changed_file_swapped_in(self):
+        """Test an edited file replaces the snapshot and runs its hooks"""
+        seen = []
+        self.loader.subscribe("pest_alerts", seen.append)
+        before = self.loader.get("pest_alerts")
+        alerts = before.data + [{
+            "id": "new", "pest": "Locust", "crop": "Wheat", "severity": "High",
+            "region": "Rajasthan", "date": "2026-10-01", "description": "Swarm sighted"
+        }]
+        self._write("pest_alerts", alerts)
+
+        self.assertEqual(self.loader.reload(), ["pest_alerts"])
+        after = self.loader.get("pest_alerts")
+        self.assertIsNot(after, before)
+        self.assertNotEqual(after.digest, before.digest)
+        self.assertEqual(len(after.data), len(before.data) + 1)
+        self.assertEqual(seen, [after])
+        self.assertIsNotNone(self.loader.get_status()["last_reload"])
+
+    def test_invalid_file_keeps_previous_snapshot(self):
+        """Test broken JSON or schema leaves the old data in place and is reported"""
+        before = self.loader.get("crop_calendar")
+        self._write("crop_calendar", "{not json")
+        self.assertEqual(self.loader.reload(), [])
+        self.assertIs(self.loader.get("crop_calendar"), before)
+        self.assertIsNotNone(self.loader.get_status()["files"]["crop_calendar"]["error"])
+
+        self._write("crop_calendar", {"version": "9"}, bump_ns=2 * 10**9)
+        self.assertEqual(self.loader.reload(), [])
+        self.assertIs(self.loader.get("crop_calendar"), before)
+
+    def test_wrong_types_rejected(self):
+        """Test valid JSON with wrong types is rejected at startup and on reload, not raised"""
+        before = self.loader.get("pest_alerts")
+        alert = dict(before.data[0])
+        for bump, alerts in enumerate(([{**alert, "date": 20240101}], ["not an alert"], [{**alert, "lat": True, "lon": 1}]), 1):
+            self._write("pest_alerts", alerts, bump_ns=bump * 10**9)
+            self.assertEqual(self.loader.reload(), [])
+            self.assertIs(self.loader.get("pest_alerts"), before)
+            self.assertIsNotNone(self.loader.get_status()["files"]["pest_alerts"]["error"])
+
+        self._write("crop_calendar", {"crops": {"Wheat": {"sowing_windows": "Rabi", "stages": [{"days": "30"}]}}})
+        self._write("disease_knowledge", {"diseases": {"Early_Blight": "Fungal"}})
+        fresh = KnowledgeLoader(self.tmp)  # Must not raise at startup either
+        for name in ("pest_alerts", "crop_calendar", "disease_knowledge"):
+            self.assertIsNone(fresh.get(name), name)
+            self.assertIsNotNone(fresh.get_status()["files"][name]["error"], name)
+
+    def test_disease_schema_enforced(self):
+        """Test disease entries the response schema would drop reject the whole file"""
+        before = self.loader.get("disease_knowledge")
+        for bump, (field, value) in enumerate((("severity", "Extreme"), ("recommended_actions", {"immediate": []}),
+                                               ("symptoms", "Spots")), 1):
+            data = json.loads(json.dumps(before.data))
+            data["diseases"]["Early_Blight"][field] = value
+            self._write("disease_knowledge", data, bump_ns=bump * 10**9)
+            self.assertEqual(self.loader.reload(), [])
+            self.assertIs(self.loader.get("disease_knowledge"), before)
+            self.assertIn(field.split("_")[0], self.loader.get_status()["files"]["disease_knowledge"]["error"])
+
+    def test_failing_hook_reported(self):
+        """Test a reload hook failure shows up in the file's status"""
+        def fail(snapshot):
+            raise RuntimeError("index build failed")
+
+        self.loader.subscribe("pest_alerts", fail)
+        self._write("pest_alerts", self.loader.get("pest_alerts").data[:1])
+        self.assertEqual(self.loader.reload(), ["pest_alerts"])
+        self.assertIn("index build failed", self.loader.get_status()["files"]["pest_alerts"]["error"])
+
+    def test_touch_without_change(self):
+        """Test a new mtime with identical content does not count as a reload, and clears a reverted error"""
+        path = Path(self.tmp) / "crop_calendar.json"
+        original = path.read_text(encoding="utf-8")
+        self._write("crop_calendar", original)
+        self.assertEqual(self.loader.reload(), [])
+
+        self._write("crop_calendar", "{bad", bump_ns=2 * 10**9)
+        self.loader.reload()
+        self.assertIsNotNone(self.loader.get_status()["files"]["crop_calendar"]["error"])
+        self._write("crop_calendar", original, bump_ns=3 * 10**9)
+        self.assertEqual(self.loader.reload(), [])
+        self.assertIsNone(self.loader.get_status()["files"]["crop_calendar"]["error"])
+
+        path.rename(path.with_suffix(".bak"))
+        self.loader.reload()
+        self.assertIsNotNone(self.loader.get_status()["files"]["crop_calendar"]["error"])
+        path.with_suffix(".bak").rename(path)  # Same mtime and size as the served snapshot
+        self.assertEqual(self.loader.reload(), [])
+        self.assertIsNone(self.loader.get_status()["files"]["crop_calendar"]["error"])
+
+    def test_knowledge_engine_follows_reload(self):
+        """Test a subscribed engine swaps its database, fragments and revision together"""
+        engine = KnowledgeEngine(load=False)
+        snapshot = self.loader.get("disease_knowledge")
+        engine.apply(snapshot.data, snapshot.digest)
+        self.loader.subscribe("disease_knowledge", lambda s: engine.apply(s.data, s.digest))
+        revision = engine.get_knowledge_revision()
+
+        data = json.loads(json.dumps(snapshot.data))
+        data["diseases"]["Early_Blight"]["severity"] = "Critical"
+        self._write("disease_knowledge", data)
+        self.loader.reload()
+
+        self.assertNotEqual(engine.get_knowledge_revision(), revision)
+        self.assertEqual(engine.get_knowledge_version(), data["version"])
+        self.assertEqual(engine.get_severity("Early_Blight"), "Critical")
+        self.assertEqual(engine.get_response_fragment("Early_Blight").fields["severity"], "Critical")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit Tests for Latency Histograms
+Tests percentile accuracy, fixed memory and sliding windows
+"""
+import unittest
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ai.latency import LatencyTracker, StageHistogram, NUM_BUCKETS, SLOT_SECONDS
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_within_bucket_error(self):
+        """Test reported percentiles are within ~2.2% of the exact ones"""
+        samples = np.random.default_rng(0).lognormal(mean=3.0, sigma=1.0, size=20000)
+        histogram = StageHistogram()
+        for ms in samples:
+            histogram.record(float(ms), now=1000.0)
+
+        stats = histogram.get_stats(now=1000.0)["all_time"]
+        self.assertEqual(stats["count"], len(samples))
+        for name, q in (("p50_ms", 50), ("p90_ms", 90), ("p99_ms", 99), ("p999_ms", 99.9)):
+            exact = np.percentile(samples, q)
+            self.assertLess(abs(stats[name] - exact) / exact, 0.03, name)
+        self.assertAlmostEqual(stats["mean_ms"], samples.mean(), places=2)
+        self.assertAlmostEqual(stats["max_ms"], samples.max(), places=2)
+
+    def test_memory_is_fixed(self):
+        """Test recording more samples does not grow the histogram"""
+        histogram = StageHistogram()
+        for i in range(5000):
+            histogram.record(1.0 + i % 50, now=float(i))
+        self.assertEqual(histogram.counts.shape, (NUM_BUCKETS,))
+        self.assertEqual(histogram.slot_counts.shape[1], NUM_BUCKETS)
+
+    def test_sliding_windows_expire_old_samples(self):
+        """Test samples leave the 1-minute window but stay in the 15-minute one"""
+        histogram = StageHistogram()
+        histogram.record(500.0, now=0.0)
+        for _ in range(10):
+            histogram.record(5.0, now=5 * 60.0)
+
+        stats = histogram.get_stats(now=5 * 60.0)
+        self.assertEqual(stats["last_1m"]["count"], 10)
+        self.assertLess(stats["last_1m"]["p999_ms"], 10)
+        self.assertEqual(stats["last_15m"]["count"], 11)
+        self.assertEqual(stats["all_time"]["count"], 11)
+
+        # After 16 idle minutes everything has left both windows
+        later = histogram.get_stats(now=21 * 60.0 + SLOT_SECONDS)
+        self.assertEqual(later["last_15m"]["count"], 0)
+        self.assertIsNone(later["last_15m"]["p50_ms"])
+
+    def test_tracker_stages(self):
+        """Test the tracker keeps stages apart"""
+        tracker = LatencyTracker(stages=("decode", "forward"))
+        tracker.record("decode", 3.0)
+        tracker.record("forward", 40.0)
+        tracker.record("forward", 42.0)
+        self.assertEqual(tracker.count("decode"), 1)
+        self.assertEqual(tracker.count("forward"), 2)
+        self.assertEqual(set(tracker.get_stats()), {"decode", "forward"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Unit Tests for the LLM Response Cache
+Tests both tiers, persistence across instances, TTL and prompt normalization
+"""
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.llm_cache import LLMCache, confidence_band, fingerprint, normalize_label
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "llm.sqlite3")
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _generate(self, value="Because of concentric rings."):
+        def generate():
+            self.calls += 1
+            time.sleep(0.01)
+            return value
+        return generate
+
+    def test_miss_then_memory_hit(self):
+        """Test the second lookup is served from memory and reports saved latency"""
+        cache = LLMCache(max_entries=8, ttl_seconds=60, path=self.path)
+        value, info = cache.get_or_generate("k", self._generate())
+        self.assertEqual(info["status"], "miss")
+
+        again, info = cache.get_or_generate("k", self._generate())
+        self.assertEqual((again, info["status"], info["tier"]), (value, "hit", "memory"))
+        self.assertGreater(info["saved_ms"], 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.get_stats()["memory_hits"], 1)
+
+    def test_disk_tier_survives_restart(self):
+        """Test a new instance on the same file answers from disk, then memory"""
+        LLMCache(max_entries=8, ttl_seconds=60, path=self.path).get_or_generate("k", self._generate({"a": [1]}))
+
+        restarted = LLMCache(max_entries=8, ttl_seconds=60, path=self.path)
+        value, info = restarted.get_or_generate("k", self._generate())
+        self.assertEqual((value, info["tier"]), ({"a": [1]}, "disk"))
+        self.assertEqual(restarted.get_or_generate("k", self._generate())[1]["tier"], "memory")
+        self.assertEqual(self.calls, 1)
+
+    def test_ttl_expiry(self):
+        """Test expired entries are regenerated in both tiers"""
+        cache = LLMCache(max_entries=8, ttl_seconds=60, path=self.path)
+        cache.get_or_generate("k", self._generate())
+        with mock.patch("services.llm_cache.time.time", return_value=time.time() + 120):
+            self.assertEqual(cache.get_or_generate("k", self._generate())[1]["status"], "miss")
+        self.assertEqual(self.calls, 2)
+
+    def test_failures_not_cached(self):
+        """Test a None result (failed call) is regenerated next time"""
+        cache = LLMCache(max_entries=8, ttl_seconds=60, path="")
+        cache.get_or_generate("k", self._generate(None))
+        cache.get_or_generate("k", self._generate(None))
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_eviction_falls_back_to_disk(self):
+        """Test an entry evicted from memory is still found on disk"""
+        cache = LLMCache(max_entries=1, ttl_seconds=60, path=self.path)
+        cache.get_or_generate("a", self._generate("A"))
+        cache.get_or_generate("b", self._generate("B"))
+        self.assertEqual(cache.get_or_generate("a", self._generate())[1]["tier"], "disk")
+
+    def test_prompt_normalization(self):
+        """Test equivalent inputs map to the same key"""
+        self.assertEqual(normalize_label("Early_Blight"), normalize_label(" early  blight"))
+        self.assertEqual(confidence_band(0.91), confidence_band(0.97))
+        self.assertNotEqual(confidence_band(0.91), confidence_band(0.5))
+        self.assertEqual(fingerprint("x", "m", "\n    a\n\n    b\n"), fingerprint("x", "m", "a\nb"))
+        self.assertNotEqual(fingerprint("x", "m", "a"), fingerprint("y", "m", "a"))
+
+
+class TestLLMCacheAsync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMCache(max_entries=8, ttl_seconds=60, path=str(Path(self.tmp.name) / "llm.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_async_tiers(self):
+        """Test the async path misses, then hits memory, then disk after a restart"""
+        async def generate():
+            return "Because of concentric rings."
+
+        self.assertEqual((await self.cache.get_or_generate_async("k", generate))[1]["status"], "miss")
+        self.assertEqual((await self.cache.get_or_generate_async("k", generate))[1]["tier"], "memory")
+        restarted = LLMCache(max_entries=8, ttl_seconds=60, path=self.cache.path)
+        self.assertEqual((await restarted.get_or_generate_async("k", generate))[1]["tier"], "disk")
+
+    async def test_disk_tier_off_event_loop(self):
+        """Test a slow SQLite tier (held lock) does not stall the event loop"""
+        async def generate():
+            return "Rings."
+
+        await self.cache.get_or_generate_async("cached", generate)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        holder = threading.Thread(target=lambda: (self.cache._db_lock.acquire(), time.sleep(0.3), self.cache._db_lock.release()))
+        holder.start()
+        await asyncio.sleep(0.02)
+
+        started = time.perf_counter()
+        value, info = await self.cache.get_or_generate_async("cached", generate)
+        self.assertEqual((value, info["tier"]), ("Rings.", "memory"))
+        self.assertLess(time.perf_counter() - started, 0.1)  # Memory hits never wait on the disk tier
+
+        await self.cache.get_or_generate_async("new", generate)  # Disk read and write wait for the lock in a thread
+        task.cancel()
+        holder.join()
+        self.assertGreater(ticks, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Unit Tests for the Shared LLM Client
+Runs against the local fake LLM server: round trip, concurrency limit,
+queue-depth metrics, timeouts, overload rejection and a free event loop
+"""
+import asyncio
+import time
+import unittest
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ai.llm_client import HTTPTransport, LLMClient, LLMError, LLMOverloaded, LLMTimeout
+from tests.fake_llm_server import FakeLLMServer
+
+
+class TestLLMClient(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeLLMServer()
+        cls.url = cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.latency_s = 0.0
+        self.server.peak_active = 0
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+
+    def _client(self, **kwargs) -> LLMClient:
+        kwargs.setdefault("max_concurrency", 2)
+        kwargs.setdefault("max_queue", 8)
+        kwargs.setdefault("timeout_s", 5.0)
+        client = LLMClient(HTTPTransport(self.url, model_name=kwargs.pop("model_name", "gemini-2.0-flash")), **kwargs)
+        self.clients.append(client)
+        return client
+
+    async def test_round_trip(self):
+        client = self._client()
+        self.assertEqual(await client.generate("Why early blight?"), "echo: Why early blight?")
+
+        stats = client.get_stats()
+        self.assertTrue(stats["available"])
+        self.assertEqual(stats["transport"], "HTTPTransport")
+        self.assertEqual(stats["total_calls"], 1)
+        self.assertEqual(stats["in_flight"], 0)
+
+    async def test_concurrency_limit(self):
+        self.server.latency_s = 0.1
+        client = self._client(max_concurrency=2)
+
+        depths = []
+
+        async def sample():
+            await asyncio.sleep(0.05)
+            depths.append((client.in_flight, client.waiting))
+
+        results = await asyncio.gather(*(client.generate(f"q{i}") for i in range(6)), sample())
+        self.assertEqual(results[:6], [f"echo: q{i}" for i in range(6)])
+
+        self.assertEqual(self.server.peak_active, 2)
+        self.assertEqual(depths, [(2, 4)])
+        stats = client.get_stats()
+        self.assertEqual(stats["peak_waiting"], 4)
+        self.assertEqual(stats["total_calls"], 6)
+        self.assertEqual(stats["waiting"], 0)
+        self.assertGreater(stats["avg_wait_ms"], 0)
+
+    async def test_timeout(self):
+        self.server.latency_s = 0.5
+        client = self._client()
+
+        with self.assertRaises(LLMTimeout):
+            await client.generate("slow", timeout_s=0.05)
+        self.assertEqual(client.get_stats()["total_timeouts"], 1)
+        self.assertEqual(client.in_flight, 0)
+
+        # The slot was released
+        self.server.latency_s = 0.0
+        self.assertEqual(await client.generate("fast"), "echo: fast")
+
+    async def test_overload_rejected(self):
+        self.server.latency_s = 0.2
+        client = self._client(max_concurrency=1, max_queue=1)
+
+        tasks = [asyncio.create_task(client.generate(f"q{i}")) for i in range(2)]
+        await asyncio.sleep(0.02)
+        with self.assertRaises(LLMOverloaded):
+            await client.generate("one too many")
+        self.assertEqual(await asyncio.gather(*tasks), ["echo: q0", "echo: q1"])
+        self.assertEqual(client.get_stats()["total_rejected"], 1)
+
+    async def test_event_loop_not_blocked(self):
+        self.server.latency_s = 0.3
+        client = self._client()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await client.generate("slow")
+        task.cancel()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+        self.assertGreater(ticks, 10)
+
+    async def test_unavailable_and_server_errors(self):
+        with self.assertRaises(LLMError):
+            await LLMClient(None).generate("no key")
+        self.assertFalse(LLMClient(None).available)
+
+        client = self._client(model_name="missing/model")
+        with self.assertRaises(LLMError):
+            await client.generate("bad path")
+        self.assertEqual(client.get_stats()["total_failures"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
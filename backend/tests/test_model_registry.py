@@ -0,0 +1,147 @@
+"""
+Unit Tests for the Model Registry and Hot-Swap
+Tests version discovery, atomic swaps and draining of in-flight requests
+"""
+import io
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import tensorflow as tf
+from PIL import Image
+
+from ai.dataset_config_v2 import MODEL_CONFIG
+from ai.inference_engine import InferenceEngine
+from ai.model_registry import ModelRegistry, UnknownModelVersion, MODEL_FILENAME
+
+
+def _save_version(root: Path, version: str):
+    """Tiny model with the production input/output shape, plus metadata"""
+    inputs = tf.keras.Input(shape=MODEL_CONFIG["input_size"])
+    x = tf.keras.layers.Conv2D(4, 3, strides=8)(inputs)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(MODEL_CONFIG["num_classes"], activation="softmax")(x)
+    version_dir = root / version
+    version_dir.mkdir(parents=True)
+    tf.keras.Model(inputs, outputs).save(str(version_dir / MODEL_FILENAME))
+    (version_dir / "model_metadata.json").write_text(json.dumps({"version": version, "architecture": "TinyNet"}))
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.root = Path(cls.tmp_dir.name)
+        _save_version(cls.root, "2.1.0")
+        _save_version(cls.root, "2.2.0")
+        (cls.root / "empty").mkdir()
+
+        buf = io.BytesIO()
+        Image.new("RGB", (300, 300), color=(30, 140, 50)).save(buf, "JPEG")
+        cls.image = buf.getvalue()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def _engine(self) -> InferenceEngine:
+        engine = InferenceEngine(model_path=str(self.root / "2.1.0" / MODEL_FILENAME))
+        engine.registry = ModelRegistry(str(self.root))
+        return engine
+
+    def test_list_versions(self):
+        """Test only directories holding a model are listed"""
+        versions = ModelRegistry(str(self.root)).list_versions()
+        self.assertEqual([v["version"] for v in versions], ["2.1.0", "2.2.0"])
+        self.assertEqual(versions[0]["metadata"]["architecture"], "TinyNet")
+
+    def test_rejects_unknown_and_traversal(self):
+        """Test unknown versions and path tricks are rejected"""
+        registry = ModelRegistry(str(self.root))
+        for version in ("9.9.9", "empty", "../2.1.0", ""):
+            with self.assertRaises(UnknownModelVersion):
+                registry.get_model_path(version)
+
+    def test_swap_changes_prediction_metadata(self):
+        """Test predictions report the newly active version"""
+        engine = self._engine()
+        self.assertEqual(engine.predict(self.image)["metadata"]["model_version"], "2.1.0")
+
+        info = engine.swap_model("2.2.0")
+        self.assertEqual(info["previous_version"], "2.1.0")
+        self.assertEqual(engine.model_version, "2.2.0")
+        self.assertEqual(engine.swap_status["state"], "idle")
+        self.assertEqual(engine.predict(self.image)["metadata"]["model_version"], "2.2.0")
+
+    def test_swap_waits_for_in_flight_requests(self):
+        """Test the old model is unloaded only after its requests finish"""
+        engine = self._engine()
+        old = engine.active
+        old.acquire()  # A request still running on the old model
+
+        swap = threading.Thread(target=engine.swap_model, args=("2.2.0",))
+        swap.start()
+        deadline = time.time() + 30
+        while engine.active is old and time.time() < deadline:
+            time.sleep(0.01)
+
+        # New requests already see the new model; the old one is still usable
+        self.assertEqual(engine.model_version, "2.2.0")
+        self.assertEqual(engine.swap_status["state"], "draining")
+        self.assertIsNotNone(old.backend.model)
+
+        old.release()
+        swap.join(timeout=30)
+        self.assertIsNone(old.backend.model)
+        self.assertEqual(engine.swap_status["state"], "idle")
+
+    def test_swap_during_predictions(self):
+        """Test predictions running across a swap never hit an unloaded model"""
+        engine = self._engine()
+        stop = threading.Event()
+        versions, errors = [], []
+
+        def predict_loop():
+            while not stop.is_set():
+                try:
+                    versions.append(engine.predict(self.image)["metadata"]["model_version"])
+                except Exception as e:
+                    errors.append(e)
+
+        workers = [threading.Thread(target=predict_loop) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        try:
+            engine.swap_model("2.2.0")
+            engine.swap_model("2.1.0")
+            time.sleep(0.2)
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join(timeout=30)
+
+        self.assertEqual(errors, [])
+        self.assertIn("2.1.0", versions)
+        self.assertEqual(engine.swap_status["state"], "idle")
+
+    def test_unload_deferred_past_timeout(self):
+        """Test a drain timeout leaves the model loaded until its last request ends"""
+        model = self._engine().active
+        self.assertTrue(model.acquire())
+        self.assertFalse(model.unload(timeout=0.01))
+        self.assertIsNotNone(model.backend.model)
+        self.assertFalse(model.acquire())  # Retired: no new requests
+
+        model.release()
+        self.assertIsNone(model.backend.model)
+
+
+if __name__ == '__main__':
+    unittest.main()
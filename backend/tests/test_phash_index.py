@@ -0,0 +1,68 @@
+"""
+Unit Tests for the Perceptual Hash Index
+Tests near-duplicate matching, radius limits and LRU eviction
+"""
+import unittest
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ai.phash_index import PHashIndex, dhash
+
+
+def _leaf_image(seed: int, size=(320, 240)) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (6, 8, 3), dtype=np.uint8)
+    return Image.fromarray(small).resize(size, Image.BILINEAR)
+
+
+class TestPHashIndex(unittest.TestCase):
+    
+    def test_dhash_survives_recompression_and_rescale(self):
+        """Test a re-sent, re-compressed photo hashes (almost) the same"""
+        original = _leaf_image(1)
+        byte_io = io.BytesIO()
+        original.resize((160, 120)).save(byte_io, 'JPEG', quality=40)
+        resent = Image.open(io.BytesIO(byte_io.getvalue()))
+        
+        distance = (dhash(original) ^ dhash(resent)).bit_count()
+        self.assertLessEqual(distance, 4)
+    
+    def test_lookup_within_radius(self):
+        """Test hashes a few bits apart match and distant ones don't"""
+        index = PHashIndex(radius=4, max_entries=16, max_age_s=60)
+        h = dhash(_leaf_image(2))
+        index.insert(h, {"disease_key": "Early_Blight"})
+        
+        self.assertEqual(index.lookup(h ^ 0b1011)["disease_key"], "Early_Blight")  # 3 bits off
+        self.assertIsNone(index.lookup(h ^ 0b11111)) # 5 bits off
+        self.assertIsNone(index.lookup(dhash(_leaf_image(3))))
+        
+        stats = index.get_stats()
+        self.assertEqual((stats["phash_lookups"], stats["phash_hits"]), (3, 1))
+    
+    def test_lru_eviction(self):
+        """Test the index never holds more than max_entries hashes"""
+        index = PHashIndex(radius=1, max_entries=2, max_age_s=60)
+        index.insert(1 << 10, {"n": 1})
+        index.insert(1 << 30, {"n": 2})
+        index.insert(1 << 50, {"n": 3})
+        
+        self.assertIsNone(index.lookup(1 << 10))
+        self.assertEqual(index.lookup(1 << 50)["n"], 3)
+        self.assertEqual(index.get_stats()["phash_entries"], 2)
+    
+    def test_disabled_index(self):
+        """Test a zero-size index never matches"""
+        index = PHashIndex(radius=4, max_entries=0, max_age_s=60)
+        index.insert(42, {"n": 1})
+        self.assertIsNone(index.lookup(42))
+
+
+if __name__ == '__main__':
+    unittest.main()
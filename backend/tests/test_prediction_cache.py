@@ -0,0 +1,70 @@
+"""
+Unit Tests for the Prediction Cache
+Tests LRU eviction, TTL expiry and version-based invalidation
+"""
+import unittest
+import time
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from services.prediction_cache import PredictionCache
+
+GENERATION = ("2.0.0", "2.1.0")
+
+
+class TestPredictionCache(unittest.TestCase):
+    
+    def test_key_depends_on_bytes_model_and_language(self):
+        """Test the content address covers everything that changes the response"""
+        key = PredictionCache.make_key(b"leaf", "2.0.0", "en")
+        self.assertEqual(key, PredictionCache.make_key(b"leaf", "2.0.0", "en"))
+        self.assertNotEqual(key, PredictionCache.make_key(b"leaf2", "2.0.0", "en"))
+        self.assertNotEqual(key, PredictionCache.make_key(b"leaf", "2.1.0", "en"))
+        self.assertNotEqual(key, PredictionCache.make_key(b"leaf", "2.0.0", "hi"))
+    
+    def test_hit_and_miss(self):
+        """Test stored responses are returned and counted"""
+        cache = PredictionCache(max_entries=4, ttl_seconds=60)
+        key = cache.make_key(b"leaf", "2.0.0", "en")
+        
+        self.assertIsNone(cache.get(key, GENERATION))
+        cache.put(key, GENERATION, {"disease": "Early Blight"})
+        self.assertEqual(cache.get(key, GENERATION), {"disease": "Early Blight"})
+        
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+    
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = PredictionCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", GENERATION, {"n": 1})
+        cache.put("b", GENERATION, {"n": 2})
+        cache.get("a", GENERATION)  # 'b' is now least recent
+        cache.put("c", GENERATION, {"n": 3})
+        
+        self.assertIsNotNone(cache.get("a", GENERATION))
+        self.assertIsNone(cache.get("b", GENERATION))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+    
+    def test_ttl_expiry(self):
+        """Test entries older than the TTL are not served"""
+        cache = PredictionCache(max_entries=2, ttl_seconds=0.01)
+        cache.put("a", GENERATION, {"n": 1})
+        time.sleep(0.02)
+        
+        self.assertIsNone(cache.get("a", GENERATION))
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+    
+    def test_version_change_invalidates(self):
+        """Test a new model or knowledge version clears the cache"""
+        cache = PredictionCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", GENERATION, {"n": 1})
+        
+        self.assertIsNone(cache.get("a", ("2.0.0", "2.2.0")))
+        self.assertEqual(cache.get_stats()["invalidations"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
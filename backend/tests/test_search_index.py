@@ -0,0 +1,94 @@
+"""
+Unit Tests for the Local Search Index
+Tests tokenization, BM25 ranking, typo tolerance and rebuilds on knowledge changes
+"""
+import unittest
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from knowledge.knowledge_engine import get_knowledge_engine
+from knowledge.search_index import SearchIndex, edit_distance, get_search_index, tokenize
+
+DISEASES = {
+    "Early_Blight": {
+        "scientific_name": "Alternaria solani",
+        "crops_affected": ["Tomato", "Potato"],
+        "symptoms": ["Dark brown spots with concentric rings"],
+        "explanation": "Fungal disease that starts on older leaves.",
+        "multilingual": {"hi": {"name": "अगेती झुलसा"}}
+    },
+    "Yellow_Rust": {
+        "scientific_name": "Puccinia striiformis",
+        "crops_affected": ["Wheat"],
+        "symptoms": ["Yellow stripes of pustules"],
+        "explanation": "Fungal disease favoured by cool, moist weather."
+    },
+    "Leaf_Mold": {
+        "scientific_name": "Passalora fulva",
+        "crops_affected": ["Tomato"],
+        "symptoms": ["Pale yellow spots on upper leaf surface"],
+        "explanation": "Thrives in humid greenhouses."
+    }
+}
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = SearchIndex(DISEASES, "test")
+
+    def test_tokenize(self):
+        """Test tokens are lowercased, de-pluralized and stopwords dropped"""
+        self.assertEqual(tokenize("Spots on the Leaves"), ["spot"])
+        self.assertEqual(tokenize("अगेती झुलसा"), ["अगेती", "झुलसा"])
+
+    def test_edit_distance(self):
+        """Test transpositions count as one edit and the limit short-circuits"""
+        self.assertEqual(edit_distance("rings", "rigns", 2), 1)
+        self.assertEqual(edit_distance("blight", "bligt", 2), 1)
+        self.assertEqual(edit_distance("rust", "mold", 1), 2)
+
+    def test_ranks_by_relevance(self):
+        """Test name and scientific-name hits outrank passing mentions"""
+        self.assertEqual(self.index.search("yellow rust")[0][0], "Yellow_Rust")
+        self.assertEqual(self.index.search("alternaria")[0][0], "Early_Blight")
+        self.assertEqual(self.index.search("yellow spots tomato")[0][0], "Leaf_Mold")
+
+    def test_typo_tolerance(self):
+        """Test misspelled terms still find their disease, scored below the exact spelling"""
+        exact = dict(self.index.search("puccinia"))
+        typo = dict(self.index.search("pucinia"))
+        self.assertIn("Yellow_Rust", typo)
+        self.assertLess(typo["Yellow_Rust"], exact["Yellow_Rust"])
+
+    def test_multilingual_names(self):
+        """Test localized names are searchable and displayed"""
+        self.assertEqual(self.index.search("झुलसा")[0][0], "Early_Blight")
+        self.assertEqual(self.index.display_name("Early_Blight", "hi"), "अगेती झुलसा")
+        self.assertEqual(self.index.display_name("Early_Blight", "mr"), "Early Blight")
+
+    def test_no_match(self):
+        """Test unrelated queries return nothing"""
+        self.assertEqual(self.index.search("pizza recipe"), [])
+
+    def test_rebuilt_on_knowledge_reload(self):
+        """Test the shared index follows the knowledge base revision"""
+        knowledge = get_knowledge_engine()
+        index = get_search_index()
+        self.assertIs(get_search_index(), index)
+
+        original = knowledge._state
+        knowledge.apply({"version": knowledge.version, "diseases": knowledge.knowledge_db}, "edited")
+        try:
+            rebuilt = get_search_index()
+            self.assertIsNot(rebuilt, index)
+            self.assertEqual(rebuilt.version, knowledge.get_knowledge_revision())
+        finally:
+            knowledge._state = original
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit Tests for Pre-encoded Static Responses
+Tests encoding negotiation, ETag matching and per-version rebuilds
+"""
+import gzip
+import json
+import unittest
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from starlette.requests import Request
+
+from services.static_responses import StaticPayload, StaticResponseCache, accepted_encodings
+
+CONTENT = {"crops": [{"id": "tomato", "description": "Full support " * 50}], "count": 1}
+
+
+def _request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+class TestStaticPayload(unittest.TestCase):
+
+    def setUp(self):
+        self.payload = StaticPayload(CONTENT, "v1")
+
+    def test_accepted_encodings(self):
+        """Test q-values are honoured and q=0 excludes a coding"""
+        self.assertEqual(accepted_encodings("gzip, deflate;q=0.5, br;q=0"), {"gzip", "deflate"})
+        self.assertEqual(accepted_encodings(""), set())
+
+    def test_gzip_body(self):
+        """Test the stored gzip body decodes to the JSON content"""
+        response = self.payload.respond(_request(accept_encoding="gzip"))
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.body)), CONTENT)
+        self.assertLess(len(response.body), len(self.payload.bodies["identity"]))
+
+    def test_identity_without_accept_encoding(self):
+        """Test clients that accept no coding get plain JSON"""
+        response = self.payload.respond(_request())
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(json.loads(response.body), CONTENT)
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+
+    def test_if_none_match(self):
+        """Test a matching validator (weak or strong, any coding) gets an empty 304 carrying the matched tag"""
+        etag = self.payload.etags["identity"]
+        for header in (etag, f"W/{etag}", f'"other", {etag}'):
+            response = self.payload.respond(_request(accept_encoding="gzip", if_none_match=header))
+            self.assertEqual(response.status_code, 304, header)
+            self.assertEqual(response.body, b"")
+            self.assertEqual(response.headers["etag"], etag)
+
+        both = f'{etag}, {self.payload.etags["gzip"]}'
+        self.assertEqual(self.payload.respond(_request(accept_encoding="gzip", if_none_match=both)).headers["etag"],
+                         self.payload.etags["gzip"])
+        self.assertEqual(self.payload.respond(_request(accept_encoding="gzip", if_none_match="*")).headers["etag"],
+                         self.payload.etags["gzip"])
+
+        response = self.payload.respond(_request(if_none_match='"stale"'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_follows_content(self):
+        """Test changed content gets a new validator"""
+        other = StaticPayload({**CONTENT, "count": 2}, "v2")
+        self.assertNotEqual(other.etags["identity"], self.payload.etags["identity"])
+
+
+class TestStaticResponseCache(unittest.TestCase):
+
+    def test_rebuilt_only_on_version_change(self):
+        """Test the build function runs once per version"""
+        cache = StaticResponseCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return CONTENT
+
+        first = cache.get("crops", "v1", build)
+        self.assertIs(cache.get("crops", "v1", build), first)
+        self.assertIsNot(cache.get("crops", "v2", build), first)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Unit Tests for Adaptive Test-Time Augmentation
+Tests view generation, re-scoring of low-confidence predictions and the latency budget
+"""
+import io
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from PIL import Image
+
+from ai.dataset_config_v2 import MODEL_CONFIG, SERVING_CONFIG
+from ai.inference_engine import InferenceEngine, LoadedModel
+from ai.tta import VIEWS, augment
+
+
+class FirstPassUnsureBackend:
+    """First forward pass is unsure (0.4), every later pass confident (0.95)"""
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, batch):
+        self.calls.append(len(batch))
+        confidence = 0.4 if len(self.calls) == 1 else 0.95
+        probs = np.full((len(batch), MODEL_CONFIG["num_classes"]), (1 - confidence) / (MODEL_CONFIG["num_classes"] - 1), dtype=np.float32)
+        probs[:, 0] = confidence
+        return probs
+
+
+class TestAugment(unittest.TestCase):
+
+    def test_views_shape_and_flip(self):
+        """Test views are laid out per image and the first view is a horizontal flip"""
+        images = np.random.default_rng(0).random((2, *MODEL_CONFIG["input_size"]), dtype=np.float32)
+        views = augment(images, 3)
+
+        self.assertEqual(views.shape, (6, *MODEL_CONFIG["input_size"]))
+        np.testing.assert_array_equal(views[3], images[1][:, ::-1])
+
+    def test_view_count_capped(self):
+        """Test asking for more views than exist returns every view once"""
+        images = np.zeros((1, *MODEL_CONFIG["input_size"]), dtype=np.float32)
+        self.assertEqual(len(augment(images, 99)), len(VIEWS))
+
+
+class TestAdaptiveTTA(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        buf = io.BytesIO()
+        Image.new("RGB", (300, 300), color=(30, 140, 50)).save(buf, "JPEG")
+        cls.image = buf.getvalue()
+
+    def _engine(self, backend) -> InferenceEngine:
+        engine = InferenceEngine(load=False)
+        engine.active = LoadedModel(backend=backend)
+        engine.ready.set()
+        return engine
+
+    def test_low_confidence_rescued(self):
+        """Test an unsure prediction is re-scored in one extra batched pass"""
+        backend = FirstPassUnsureBackend()
+        engine = self._engine(backend)
+        with mock.patch.dict(SERVING_CONFIG, {"adaptive_tta": True, "tta_views": 4, "tta_budget_ms": 1000}):
+            result = engine.predict(self.image)
+
+        self.assertEqual(backend.calls, [1, 4])
+        tta = result["metadata"]["tta"]
+        self.assertEqual(tta["views"], 4)
+        self.assertAlmostEqual(tta["first_pass_confidence"], 0.4, places=5)
+        self.assertTrue(tta["rescued"])
+        self.assertAlmostEqual(result["confidence"], (0.4 + 4 * 0.95) / 5, places=5)
+        self.assertEqual(engine.tta_stats["rescued"], 1)
+
+    def test_skipped_over_budget(self):
+        """Test no extra pass runs when the views would not fit the budget"""
+        backend = FirstPassUnsureBackend()
+        engine = self._engine(backend)
+        with mock.patch.dict(SERVING_CONFIG, {"adaptive_tta": True, "tta_budget_ms": 0}):
+            result = engine.predict(self.image)
+
+        self.assertEqual(backend.calls, [1])
+        self.assertEqual(result["metadata"]["tta"]["views"], 0)
+        self.assertEqual(engine.tta_stats["skipped"], 1)
+
+    def test_disabled_by_default(self):
+        """Test the single-pass path is unchanged when adaptive TTA is off"""
+        backend = FirstPassUnsureBackend()
+        engine = self._engine(backend)
+        with mock.patch.dict(SERVING_CONFIG, {"adaptive_tta": False}):
+            result = engine.predict(self.image)
+
+        self.assertEqual(backend.calls, [1])
+        self.assertIsNone(result["metadata"]["tta"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit Tests for Upload Ingestion
+Tests size caps, header sniffing and zero-copy decoding of upload buffers
+"""
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ai.inference_engine import InferenceEngine
+from services.upload_ingest import UploadRejected, read_upload
+
+
+def _jpeg(size=(640, 480)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color=(40, 160, 60)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def _upload(data: bytes, declare_size: bool = True) -> UploadFile:
+    return UploadFile(io.BytesIO(data), size=len(data) if declare_size else None, filename="leaf.jpg")
+
+
+@pytest.mark.parametrize("declare_size", [True, False])
+async def test_reads_whole_upload(declare_size):
+    data = _jpeg()
+    buffer = await read_upload(_upload(data, declare_size))
+    assert isinstance(buffer, bytearray)
+    assert buffer == data
+
+
+async def test_rejects_declared_oversize_without_reading():
+    upload = _upload(_jpeg())
+    with pytest.raises(UploadRejected) as exc:
+        await read_upload(upload, max_bytes=100)
+    assert exc.value.status_code == 413
+    assert upload.file.tell() == 0
+
+
+async def test_rejects_undeclared_oversize():
+    with pytest.raises(UploadRejected) as exc:
+        await read_upload(_upload(_jpeg(), declare_size=False), max_bytes=100)
+    assert exc.value.status_code == 413
+
+
+async def test_rejects_non_image():
+    with pytest.raises(UploadRejected) as exc:
+        await read_upload(_upload(b"%PDF-1.7 not a leaf" * 100))
+    assert exc.value.status_code == 415
+
+
+async def test_rejects_too_many_pixels_from_header(monkeypatch):
+    from ai.dataset_config_v2 import SERVING_CONFIG
+    monkeypatch.setitem(SERVING_CONFIG, "max_image_pixels", 640 * 480 - 1)
+    with pytest.raises(UploadRejected) as exc:
+        await read_upload(_upload(_jpeg()))
+    assert exc.value.status_code == 413
+
+
+async def test_decompression_bomb_is_too_large(monkeypatch):
+    from ai.dataset_config_v2 import SERVING_CONFIG
+    monkeypatch.setitem(SERVING_CONFIG, "max_image_pixels", 10**9)
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)  # PIL itself refuses the header
+    with pytest.raises(UploadRejected) as exc:
+        await read_upload(_upload(_jpeg()))
+    assert exc.value.status_code == 413
+
+
+async def test_buffer_decodes_like_bytes():
+    data = _jpeg((1200, 900))
+    buffer = await read_upload(_upload(data))
+    engine = InferenceEngine()
+    np.testing.assert_array_equal(engine.preprocess_image(buffer), engine.preprocess_image(data))
+    # The decoder must have released the buffer
+    buffer.extend(b"\0")
@@ -7,8 +7,15 @@ Features:
 - Data augmentation
 - Model evaluation with confusion matrix
 - Dual format export (.h5 + .tflite)
+- Float, dynamic-range and int8 TFLite variants with a comparison report
 - Metadata generation with benchmarks
+
+Usage:
+    python train_model_v2.py [--quantize {float,dynamic,int8}]
+    python train_model_v2.py --export-only --quantize int8   # re-export the saved .h5
+    python train_model_v2.py --small                          # cascade early-exit model
 """
+import argparse
 import os
 import json
 import time
@@ -35,6 +42,8 @@ from ai.dataset_config_v2 import (
     TEST_SPLIT,
     PERFORMANCE_THRESHOLDS
 )
+from ai.backends import compile_forward
+from ai.quantization import QUANTIZATION_MODES, compare_variants, convert_tflite, representative_dataset
 
 # Set random seeds for reproducibility
 np.random.seed(42)
@@ -47,25 +56,34 @@ BATCH_SIZE = MODEL_CONFIG["batch_size"]
 EPOCHS = MODEL_CONFIG["epochs"]
 IMG_SIZE = MODEL_CONFIG["input_size"][:2]
 
+# Cascade early-exit model: narrower MobileNetV2 at a lower working resolution
+SMALL_ALPHA = 0.35
+SMALL_RESOLUTION = 128
+
 
-def create_model(num_classes: int):
+def create_model(num_classes: int, alpha: float = 1.0, resolution: int = None):
     """
     Create MobileNetV2 model with transfer learning
     
     Args:
         num_classes: Number of output classes
+        alpha: MobileNetV2 width multiplier
+        resolution: Working resolution; the model still takes the serving
+            input size and downsamples with a Resizing layer
         
     Returns:
         Compiled Keras model
     """
     print(f"\n{'='*60}")
-    print(f"Creating MobileNetV2 model for {num_classes} classes")
+    print(f"Creating MobileNetV2 model for {num_classes} classes (alpha={alpha}, resolution={resolution or IMG_SIZE[0]})")
     print(f"{'='*60}\n")
     
     # Load pre-trained MobileNetV2
+    base_input_shape = (resolution, resolution, 3) if resolution else MODEL_CONFIG["input_size"]
     base_model = keras.applications.MobileNetV2(
-        input_shape=MODEL_CONFIG["input_size"],
+        input_shape=base_input_shape,
         include_top=False,
+        alpha=alpha,
         weights=MODEL_CONFIG["weights"]
     )
     
@@ -78,6 +96,8 @@ def create_model(num_classes: int):
     # Preprocessing (MobileNetV2 expects [-1, 1])
     # Replaces 'preprocess_input' which caused serialization issues
     x = layers.Rescaling(1./127.5, offset=-1)(inputs)
+    if resolution:
+        x = layers.Resizing(resolution, resolution)(x)
     
     # Base model
     x = base_model(x, training=False)
@@ -87,7 +107,7 @@ def create_model(num_classes: int):
     x = layers.Dropout(0.2)(x)
     outputs = layers.Dense(num_classes, activation='softmax')(x)
     
-    model = keras.Model(inputs, outputs, name="sanjivani_mobilenetv2")
+    model = keras.Model(inputs, outputs, name="sanjivani_mobilenetv2" if alpha == 1.0 and not resolution else "sanjivani_mobilenetv2_small")
     
     # Compile
     model.compile(
@@ -324,15 +344,31 @@ def evaluate_model(model, val_gen):
     return metrics
 
 
+def _time_forward(fn, dummy_input, runs: int = 100):
+    """Warm up then time a forward-pass callable, returning per-call times in ms"""
+    for _ in range(10):
+        _ = fn(dummy_input)
+    
+    times = []
+    for _ in range(runs):
+        start = time.time()
+        _ = fn(dummy_input)
+        times.append((time.time() - start) * 1000)  # Convert to ms
+    return times
+
+
 def benchmark_inference(model):
     """
     Benchmark inference time
     
+    Compares Keras model.predict() against the compiled tf.function
+    forward pass that the serving backend uses (plus XLA where available).
+    
     Args:
         model: Trained model
         
     Returns:
-        avg_time_ms: Average inference time in milliseconds
+        avg_time_ms: Average inference time of the compiled path in milliseconds
     """
     print(f"\n{'='*60}")
     print("Benchmarking inference time")
@@ -341,25 +377,33 @@ def benchmark_inference(model):
     # Create dummy input
     dummy_input = np.random.random((1, *MODEL_CONFIG["input_size"])).astype(np.float32)
     
-    # Warmup
-    for _ in range(10):
-        _ = model.predict(dummy_input, verbose=0)
-    
-    # Benchmark
-    times = []
-    for _ in range(100):
-        start = time.time()
-        _ = model.predict(dummy_input, verbose=0)
-        times.append((time.time() - start) * 1000)  # Convert to ms
-    
-    avg_time = np.mean(times)
-    std_time = np.std(times)
-    
-    print(f"Inference benchmark complete")
-    print(f"   Average: {avg_time:.2f} ms")
-    print(f"   Std Dev: {std_time:.2f} ms")
-    print(f"   Min: {np.min(times):.2f} ms")
-    print(f"   Max: {np.max(times):.2f} ms")
+    forward = compile_forward(model)
+    paths = {
+        "model.predict": lambda x: model.predict(x, verbose=0),
+        "tf.function": lambda x: forward(x).numpy(),
+    }
+    try:
+        xla_forward = compile_forward(model, jit_compile=True)
+        xla_forward(dummy_input)
+        paths["tf.function + XLA"] = lambda x: xla_forward(x).numpy()
+    except Exception as e:
+        print(f"XLA unavailable, skipping: {e}")
+    
+    results = {}
+    for name, fn in paths.items():
+        times = _time_forward(fn, dummy_input)
+        results[name] = times
+        print(f"{name}:")
+        print(f"   Average: {np.mean(times):.2f} ms")
+        print(f"   Std Dev: {np.std(times):.2f} ms")
+        print(f"   Min: {np.min(times):.2f} ms")
+        print(f"   Max: {np.max(times):.2f} ms")
+    
+    baseline = np.mean(results["model.predict"])
+    avg_time = np.mean(results["tf.function"])
+    print(f"\nInference benchmark complete")
+    for name, times in results.items():
+        print(f"   {name:<18} {np.mean(times):8.2f} ms  ({baseline / np.mean(times):.1f}x vs model.predict)")
     
     if avg_time > PERFORMANCE_THRESHOLDS["max_inference_ms"]:
         print(f"\nWARNING: Inference time above target ({PERFORMANCE_THRESHOLDS['max_inference_ms']} ms)")
@@ -369,7 +413,76 @@ def benchmark_inference(model):
     return float(avg_time)
 
 
-def export_model(model, metrics, avg_inference_ms):
+def split_validation_batches(val_gen, calibration_samples: int, eval_samples: int):
+    """
+    Disjoint random calibration and evaluation draws from the validation set
+    
+    The validation generator is unshuffled (sorted by class), so batches
+    are picked in random order to cover every class in both sets.
+    
+    Returns:
+        representative_data callable, eval images, eval labels
+    """
+    order = np.random.default_rng(42).permutation(len(val_gen))
+    batches_needed = int(np.ceil(calibration_samples / val_gen.batch_size))
+    calibration_batches, eval_batches = order[:batches_needed], order[batches_needed:]
+    
+    representative_data = representative_dataset((val_gen[i] for i in calibration_batches), calibration_samples)
+    
+    images, labels = [], []
+    for i in eval_batches:
+        x, y = val_gen[i]
+        images.append(x.astype(np.float32))
+        labels.append(np.argmax(y, axis=1))
+        if sum(len(batch) for batch in images) >= eval_samples:
+            break
+    return representative_data, np.concatenate(images)[:eval_samples], np.concatenate(labels)[:eval_samples]
+
+
+def export_quantized_variants(model, val_gen, model_size_mb, calibration_samples: int = 200, eval_samples: int = 500):
+    """
+    Export float, dynamic-range and full-integer TFLite models and compare them
+    
+    Args:
+        model: Trained model
+        val_gen: Validation data generator (calibration + evaluation data)
+        model_size_mb: Size of the saved .h5
+        
+    Returns:
+        variants: {mode: path}, report: comparison dict for model_metadata.json
+    """
+    print(f"\n{'='*60}")
+    print("Exporting quantized TFLite variants")
+    print(f"{'='*60}\n")
+    
+    representative_data, eval_images, eval_labels = split_validation_batches(val_gen, calibration_samples, eval_samples)
+    print(f"Calibration samples: {representative_data.num_samples}, evaluation samples: {len(eval_images)}")
+    
+    contents, variants = {}, {}
+    for mode in QUANTIZATION_MODES:
+        contents[mode] = convert_tflite(model, mode, representative_data)
+        variants[mode] = os.path.join(MODEL_SAVE_DIR, f"plant_disease_v2.{mode}.tflite")
+        with open(variants[mode], 'wb') as f:
+            f.write(contents[mode])
+        print(f"Saved {mode} .tflite: {variants[mode]} ({len(contents[mode]) / (1024 * 1024):.2f} MB)")
+    
+    comparison = compare_variants(model, contents, eval_images, eval_labels, model_size_mb)
+    
+    print(f"\n{'variant':<16} {'accuracy':>9} {'agree':>7} {'size MB':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    print("-" * 60)
+    for name, row in comparison.items():
+        print(f"{name:<16} {row['accuracy']:9.4f} {row['agreement']:7.4f} {row['size_mb']:8.2f} "
+              f"{row['p50_ms']:8.2f} {row['p99_ms']:8.2f}")
+    
+    report = {
+        "calibration_samples": representative_data.num_samples,
+        "eval_samples": int(len(eval_images)),
+        "variants": comparison
+    }
+    return variants, report
+
+
+def export_model(model, metrics, avg_inference_ms, val_gen=None, quantize: str = "dynamic"):
     """
     Export model in multiple formats with metadata
     
@@ -377,6 +490,10 @@ def export_model(model, metrics, avg_inference_ms):
         model: Trained model
         metrics: Evaluation metrics dict
         avg_inference_ms: Average inference time
+        val_gen: Validation generator; enables int8 calibration and the
+            quantization comparison report
+        quantize: TFLite variant served as plant_disease_v2.tflite
+            ("float", "dynamic" or "int8")
     """
     print(f"\n{'='*60}")
     print("Exporting model")
@@ -392,16 +509,22 @@ def export_model(model, metrics, avg_inference_ms):
     print(f"Saved .h5 model: {h5_path} ({model_size_mb:.2f} MB)")
     
     # 2. Convert to TFLite (edge deployment)
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
-    converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    tflite_model = converter.convert()
+    quantization_report = None
+    if val_gen is not None:
+        variants, quantization_report = export_quantized_variants(model, val_gen, model_size_mb)
+        with open(variants[quantize], 'rb') as f:
+            tflite_model = f.read()
+    else:
+        if quantize == "int8":
+            raise ValueError("int8 export needs the validation generator for calibration")
+        tflite_model = convert_tflite(model, quantize)
     
     tflite_path = os.path.join(MODEL_SAVE_DIR, "plant_disease_v2.tflite")
     with open(tflite_path, 'wb') as f:
         f.write(tflite_model)
     
     tflite_size_mb = os.path.getsize(tflite_path) / (1024 * 1024)
-    print(f"Saved .tflite model: {tflite_path} ({tflite_size_mb:.2f} MB)")
+    print(f"Saved .tflite model ({quantize}): {tflite_path} ({tflite_size_mb:.2f} MB)")
     print(f"   Size reduction: {((model_size_mb - tflite_size_mb) / model_size_mb * 100):.1f}%")
     
     # 3. Save class names
@@ -422,11 +545,14 @@ def export_model(model, metrics, avg_inference_ms):
         "f1_score": metrics["f1_score"],
         "model_size_mb": float(model_size_mb),
         "tflite_size_mb": float(tflite_size_mb),
+        "tflite_quantization": quantize,
         "avg_inference_ms": avg_inference_ms,
         "trained_date": datetime.now().strftime("%Y-%m-%d"),
         "trained_on": "PlantVillage dataset (focused scope)",
         "classes": CLASS_NAMES
     }
+    if quantization_report is not None:
+        metadata["quantization"] = quantization_report
     
     metadata_path = os.path.join(MODEL_SAVE_DIR, "model_metadata.json")
     with open(metadata_path, 'w') as f:
@@ -436,8 +562,35 @@ def export_model(model, metrics, avg_inference_ms):
     return metadata
 
 
+def export_small_model(model, quantize: str = "dynamic"):
+    """
+    Save the cascade early-exit model next to the full one
+    
+    Writes plant_disease_v2_small.h5 and .tflite; run tune_cascade.py
+    afterwards to pick its confidence threshold.
+    """
+    os.makedirs(MODEL_SAVE_DIR, exist_ok=True)
+    h5_path = os.path.join(MODEL_SAVE_DIR, "plant_disease_v2_small.h5")
+    model.save(h5_path)
+    print(f"Saved small .h5 model: {h5_path} ({os.path.getsize(h5_path) / (1024 * 1024):.2f} MB)")
+    
+    tflite_path = os.path.join(MODEL_SAVE_DIR, "plant_disease_v2_small.tflite")
+    with open(tflite_path, 'wb') as f:
+        f.write(convert_tflite(model, quantize if quantize != "int8" else "dynamic"))
+    print(f"Saved small .tflite model: {tflite_path} ({os.path.getsize(tflite_path) / (1024 * 1024):.2f} MB)")
+
+
 def main():
     """Main training pipeline"""
+    parser = argparse.ArgumentParser(description="SANJIVANI 2.0 model training")
+    parser.add_argument("--quantize", choices=QUANTIZATION_MODES, default="dynamic",
+                        help="TFLite variant to serve (all three are exported and compared)")
+    parser.add_argument("--export-only", action="store_true",
+                        help="Skip training and re-export the saved .h5 model")
+    parser.add_argument("--small", action="store_true",
+                        help="Train the cascade early-exit model instead of the full model")
+    args = parser.parse_args()
+    
     print(f"\n{'#'*60}")
     print(f"# SANJIVANI 2.0 - Model Training Pipeline")
     print(f"# Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -450,19 +603,37 @@ def main():
         print(f"   python backend/download_dataset.py")
         return
     
-    # Create model
     num_classes = len(CLASS_NAMES)
-    model, base_model = create_model(num_classes)
     
     # Setup data
     train_gen, val_gen = setup_data_generators(DATASET_DIR)
     
-    # Train model
-    start_time = time.time()
-    history = train_model(model, base_model, train_gen, val_gen)
-    training_time = (time.time() - start_time) / 60  # minutes
+    if args.small:
+        model, base_model = create_model(num_classes, alpha=SMALL_ALPHA, resolution=SMALL_RESOLUTION)
+        start_time = time.time()
+        train_model(model, base_model, train_gen, val_gen)
+        print(f"\nTraining complete in {(time.time() - start_time) / 60:.1f} minutes")
+        # Not evaluate_model(): that would overwrite the full model's confusion matrix
+        val_gen.reset()
+        accuracy = np.mean(np.argmax(model.predict(val_gen, verbose=1), axis=1) == val_gen.classes)
+        export_small_model(model, args.quantize)
+        print(f"\nSmall model accuracy: {accuracy:.4f}")
+        print("Next: python tune_cascade.py --target-accuracy <acc>")
+        return
     
-    print(f"\nTraining complete in {training_time:.1f} minutes")
+    if args.export_only:
+        model = keras.models.load_model(os.path.join(MODEL_SAVE_DIR, "plant_disease_v2.h5"))
+        training_time = 0.0
+    else:
+        # Create model
+        model, base_model = create_model(num_classes)
+        
+        # Train model
+        start_time = time.time()
+        history = train_model(model, base_model, train_gen, val_gen)
+        training_time = (time.time() - start_time) / 60  # minutes
+        
+        print(f"\nTraining complete in {training_time:.1f} minutes")
     
     # Evaluate
     metrics = evaluate_model(model, val_gen)
@@ -471,7 +642,7 @@ def main():
     avg_inference_ms = benchmark_inference(model)
     
     # Export
-    metadata = export_model(model, metrics, avg_inference_ms)
+    metadata = export_model(model, metrics, avg_inference_ms, val_gen=val_gen, quantize=args.quantize)
     
     # Final summary
     print(f"\n{'='*60}")
@@ -482,7 +653,7 @@ def main():
     print(f"Training time: {training_time:.1f} min")
     print(f"Accuracy: {metrics['accuracy']:.4f}")
     print(f"Model size: {metadata['model_size_mb']:.2f} MB (.h5)")
-    print(f"TFLite size: {metadata['tflite_size_mb']:.2f} MB")
+    print(f"TFLite size: {metadata['tflite_size_mb']:.2f} MB ({args.quantize})")
     print(f"Inference: {avg_inference_ms:.2f} ms")
     print(f"\n{'='*60}")
     print(f"SANJIVANI 2.0 model training complete!")
@@ -0,0 +1,93 @@
+"""
+SANJIVANI 2.0 - Cascade Threshold Tuning
+Picks the confidence at which the small model answers alone, from
+validation data, for a target accuracy
+
+Both models are run through the serving backends (the same .tflite or
+.h5 the engine would load), so the threshold matches what is served.
+The result is written to model_metadata.json under "cascade", where the
+engine reads it at load time.
+
+Usage:
+    python tune_cascade.py [--target-accuracy 0.95] [--max-drop 0.005] [--model-dir backend/models] [--dry-run]
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from ai.backends import create_backend
+from ai.cascade import cascade_outcome, choose_threshold, small_model_path
+from train_model_v2 import DATASET_DIR, MODEL_SAVE_DIR, setup_data_generators
+
+
+def collect_probabilities(val_gen, large_path: Path):
+    """Small- and full-model probabilities plus labels over the validation set"""
+    large = create_backend(large_path)
+    small = create_backend(small_model_path(large_path))
+    large.load()
+    small.load()
+    print(f"Full model:  {large.model_path} ({large.name})")
+    print(f"Small model: {small.model_path} ({small.name})")
+
+    small_probs, large_probs, labels = [], [], []
+    for i in range(len(val_gen)):
+        images, one_hot = val_gen[i]
+        images = images.astype(np.float32)
+        small_probs.append(small.predict(images))
+        large_probs.append(large.predict(images))
+        labels.append(np.argmax(one_hot, axis=1))
+    return np.concatenate(small_probs), np.concatenate(large_probs), np.concatenate(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the cascade early-exit threshold")
+    parser.add_argument("--target-accuracy", type=float, default=None,
+                        help="Minimum cascade accuracy (default: full-model accuracy minus --max-drop)")
+    parser.add_argument("--max-drop", type=float, default=0.005,
+                        help="Accuracy the cascade may lose against the full model")
+    parser.add_argument("--model-dir", default=MODEL_SAVE_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Report only, don't update model_metadata.json")
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print("Cascade threshold tuning")
+    print(f"{'='*60}\n")
+
+    large_path = Path(args.model_dir) / "plant_disease_v2.h5"
+    _, val_gen = setup_data_generators(DATASET_DIR)
+    small_probs, large_probs, labels = collect_probabilities(val_gen, large_path)
+
+    print(f"\n{'threshold':>10} {'accuracy':>9} {'escalated':>10}")
+    print("-" * 31)
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.98, 0.99):
+        row = cascade_outcome(small_probs, large_probs, labels, threshold)
+        print(f"{threshold:10.2f} {row['accuracy']:9.4f} {row['escalation_rate']:10.1%}")
+
+    result = choose_threshold(small_probs, large_probs, labels, args.target_accuracy, args.max_drop)
+    print(f"\nSmall model accuracy: {result['small_accuracy']:.4f}")
+    print(f"Full model accuracy:  {result['large_accuracy']:.4f}")
+    print(f"Target accuracy:      {result['target_accuracy']:.4f}")
+    if result["threshold"] is None:
+        print("No early-exit threshold meets the target; the small model would never answer")
+    else:
+        print(f"Chosen threshold:     {result['threshold']:.4f} "
+              f"(accuracy {result['accuracy']:.4f}, {result['escalation_rate']:.1%} escalated)")
+
+    if args.dry_run:
+        return
+
+    metadata_path = Path(args.model_dir) / "model_metadata.json"
+    metadata = {}
+    if metadata_path.exists():
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+    metadata["cascade"] = result
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    print(f"\nSaved cascade threshold to {metadata_path}")
+
+
+if __name__ == "__main__":
+    main()